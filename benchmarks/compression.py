@@ -0,0 +1,152 @@
+# Write and read throughput over a slow link with payload compression off and
+# on, for text and for incompressible data.
+#
+# Starts user_server.py as a subprocess and puts a relay in front of it that
+# holds each direction to the given link speed. Passthrough then writes a
+# file and reads it back cold, once offering no codecs and once offering
+# every codec this side has. Reports the time taken, the bytes the payloads
+# took on the wire against their size, and the CPU time the client and the
+# server spent compressing and decompressing them, from their counters.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.compression [file MiB] [link Mbit/s]
+
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+import users_pb2
+import users_pb2_grpc
+from benchmarks.suite import login, startServer
+from channels import openChannel
+from compress import CODECS
+from passthrough import Passthrough
+from sessions import TokenInterceptor
+
+# bytes forwarded between sleeps, so the link is paced smoothly
+RELAY_BURST = 16 * 1024
+# the calls carrying write and read payloads, whose message sizes the server
+# counts as they are on the wire
+WRITE_METHODS = ('fileWrite', 'fileWriteStream', 'compound')
+READ_METHODS = ('fileRead', 'fileReadStream', 'compound')
+
+
+def relay(address, mbits):
+    # a localhost address forwarding to `address` at `mbits` per direction
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(16)
+    host, port = address.rsplit(':', 1)
+    rate = mbits * 1e6 / 8
+
+    def pump(source, sink):
+        try:
+            while True:
+                data = source.recv(RELAY_BURST)
+                if not data:
+                    break
+                sink.sendall(data)
+                time.sleep(len(data) / rate)
+        except OSError:
+            pass
+        finally:
+            sink.close()
+
+    def accept():
+        while True:
+            client, _ = listener.accept()
+            server = socket.create_connection((host, int(port)))
+            for source, sink in ((client, server), (server, client)):
+                threading.Thread(target=pump, args=(source, sink), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return '127.0.0.1:%d' % listener.getsockname()[1]
+
+def textData(size):
+    # the repository's own sources, repeated
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sources = b''.join(open(os.path.join(root, name), 'rb').read()
+        for name in sorted(os.listdir(root)) if name.endswith('.py'))
+    return (sources * (size // len(sources) + 1))[:size]
+
+def payloadBytes(stats):
+    methods = dict((m.name.rsplit('/', 1)[-1], m) for m in stats.methods)
+    return sum(methods[name].bytesIn for name in WRITE_METHODS if name in methods) + \
+        sum(methods[name].bytesOut for name in READ_METHODS if name in methods)
+
+def run(address, token, export, data, codecs):
+    channel = openChannel(address)
+    stub = users_pb2_grpc.UsersStub(grpc.intercept_channel(channel, TokenInterceptor(token)))
+    before = stub.getStats(users_pb2.StatsRequest())
+    fs = Passthrough(export, stub, watch=False, codecs=codecs, dedup=0)
+    path = '/payload-%d' % len(codecs)
+
+    start = time.perf_counter()
+    fh = fs.create(path, 0o644)
+    for offset in range(0, len(data), 128 * 1024):
+        fs.write(path, data[offset:offset + 128 * 1024], offset, fh)
+    fs.release(path, fh)
+    wrote = time.perf_counter() - start
+
+    reader = Passthrough(export, stub, watch=False, codecs=codecs)
+    start = time.perf_counter()
+    fh = reader.open(path, os.O_RDONLY)
+    chunks, offset = [], 0
+    while offset < len(data):
+        chunk = reader.read(path, 128 * 1024, offset, fh)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        offset += len(chunk)
+    reader.release(path, fh)
+    read = time.perf_counter() - start
+    if b''.join(chunks) != data:
+        raise RuntimeError("read back different data")
+    fs.unlink(path)
+
+    after = stub.getStats(users_pb2.StatsRequest())
+    channel.close()
+    client = [fs.compressor.stats(), reader.compressor.stats()]
+    server = after.compression
+    # the file went up once and came back once
+    wire = payloadBytes(after) - payloadBytes(before)
+    return {
+        "codecs": list(codecs),
+        "write_s": round(wrote, 3),
+        "read_s": round(read, 3),
+        "payload_bytes": 2 * len(data),
+        "wire_bytes": wire,
+        "saved_pct": round(100.0 * (2 * len(data) - wire) / (2 * len(data)), 1) or 0.0,
+        "client_cpu_s": round(sum(s['compress_seconds'] + s['decompress_seconds'] for s in client), 4),
+        "server_cpu_s": round(server.compressSeconds + server.decompressSeconds
+            - before.compression.compressSeconds - before.compression.decompressSeconds, 4),
+    }
+
+def main():
+    size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 8 * 1024 * 1024
+    mbits = float(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    workdir = tempfile.mkdtemp()
+    export = os.path.join(workdir, 'export')
+    os.makedirs(export)
+    address, stop, _ = startServer('subprocess', False, workdir)
+    try:
+        token = login(address)
+        slow = relay(address, mbits)
+        results = {}
+        for kind, data in (('text', textData(size)), ('random', os.urandom(size))):
+            results[kind] = [run(slow, token, export, data, codecs) for codecs in ((), CODECS)]
+    finally:
+        stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"file_bytes": size, "link_mbits": mbits, "results": results}, indent=2))
+
+if __name__ == '__main__':
+    main()
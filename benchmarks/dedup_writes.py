@@ -0,0 +1,103 @@
+# Bytes uploaded and time taken when big files are saved again with small
+# edits, with deduplicated writes off and on.
+#
+# Drives Passthrough directly against an in-process server. Each file is
+# written once, then saved `saves` more times, each time with a few short
+# insertions at random places: half the saves overwrite the file in place
+# (open, truncate, write, as `cp` does) and half write a temporary file and
+# rename it over the old one, as editors do.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.dedup_writes [files] [file MiB] [saves]
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import passthrough
+from benchmarks.suite import StubPool, login, startServer
+from sessions import TokenInterceptor
+
+WRITE_SIZE = 128 * 1024
+EDITS = 4
+
+
+def edit(data, rng):
+    for _ in range(EDITS):
+        at = rng.randrange(len(data))
+        data = data[:at] + os.urandom(rng.randrange(1, 64)) + data[at:]
+    return data
+
+def save(fs, path, data, in_place):
+    # in_place is None to create the file
+    if in_place is None:
+        fh = fs.create(path, 0o644)
+        target = path
+    elif in_place:
+        fh = fs.open(path, os.O_WRONLY)
+        fs.truncate(path, 0, fh)
+        target = path
+    else:
+        target = path + '.swp'
+        fh = fs.create(target, 0o644)
+    for offset in range(0, len(data), WRITE_SIZE):
+        fs.write(target, data[offset:offset + WRITE_SIZE], offset, fh)
+    fs.release(target, fh)
+    if in_place is False:
+        fs.rename(target, path)
+
+def run(address, token, export, files, size, saves, dedup):
+    pool = StubPool(address, interceptors=[TokenInterceptor(token)])
+    fs = passthrough.Passthrough(export, pool, dedup=dedup)
+    rng = random.Random(4000)
+    contents = {'/file%d' % i: os.urandom(size) for i in range(files)}
+    written = 0
+    start = time.perf_counter()
+    for path, data in contents.items():
+        save(fs, path, data, None)
+        written += len(data)
+    for n in range(saves):
+        for path in contents:
+            contents[path] = edit(contents[path], rng)
+            save(fs, path, contents[path], n % 2 == 0)
+            written += len(contents[path])
+    wall = time.perf_counter() - start
+
+    for path, data in contents.items():
+        with open(os.path.join(export, path.lstrip('/')), 'rb') as f:
+            if f.read() != data:
+                raise RuntimeError("%s has the wrong contents" % path)
+        fs.unlink(path)
+    sent = fs.dedup_stats['sent'] + written - fs.dedup_stats['bytes']
+    return {
+        "dedup": dedup > 0,
+        "written_mib": round(written / 2 ** 20, 1),
+        "sent_mib": round(sent / 2 ** 20, 1),
+        "seconds": round(wall, 2),
+        "mib_per_sec": round(written / wall / 2 ** 20, 1),
+    }
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    size = int(float(sys.argv[2]) * 2 ** 20) if len(sys.argv) > 2 else 16 * 2 ** 20
+    saves = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    workdir = tempfile.mkdtemp()
+    export = os.path.join(workdir, 'export')
+    os.mkdir(export)
+    address, stop, _ = startServer('inprocess', False, workdir)
+    try:
+        token = login(address)
+        results = [run(address, token, export, files, size, saves, dedup)
+            for dedup in (0, passthrough.DEDUP_MIN_SIZE)]
+    finally:
+        stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"files": files, "file_mib": size // 2 ** 20, "saves": saves, "results": results}, indent=2))
+
+if __name__ == '__main__':
+    main()
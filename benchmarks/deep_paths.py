@@ -0,0 +1,99 @@
+# Server latency of path-based calls on small files deep in a tree, with
+# the directory descriptor cache off and on.
+#
+# Starts user_server.py as a subprocess twice: once with --dir-cache-size 0
+# (the kernel walks every component of the full path on every call) and once
+# with the default cache (calls resolve the last component relative to a
+# cached descriptor of its directory). Each run does getattr and
+# open/read/release on random files at the bottom of several deep branches
+# and reports the server's own mean time per call from getStats, which
+# leaves out the network, along with the client's p50 and p99.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.deep_paths [depth] [files per leaf] [operations]
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import grpc
+
+import users_pb2
+import users_pb2_grpc
+from benchmarks.suite import login, percentile, startServer
+from channels import openChannel
+from dirfds import DIR_CACHE_SIZE
+from sessions import TokenInterceptor
+
+BRANCHES = 8
+FILE_SIZE = 512
+METHODS = ('fsGetAttr', 'fileOpen', 'fileRead', 'fileRelease')
+
+
+def buildTree(export, depth, files):
+    paths = []
+    for branch in range(BRANCHES):
+        leaf = os.path.join(export, *['b%d-level%d' % (branch, level) for level in range(depth)])
+        os.makedirs(leaf)
+        for i in range(files):
+            path = os.path.join(leaf, 'file%d.py' % i)
+            with open(path, 'wb') as f:
+                f.write(os.urandom(FILE_SIZE))
+            paths.append(path)
+    return paths
+
+def run(workdir, paths, operations, cache_size):
+    address, stop, _ = startServer('subprocess', False, workdir, ['--dir-cache-size', str(cache_size)])
+    try:
+        token = login(address)
+        channel = openChannel(address)
+        stub = users_pb2_grpc.UsersStub(grpc.intercept_channel(channel, TokenInterceptor(token)))
+        rng = random.Random(4000)
+        latencies = {'getattr': [], 'open_read_release': []}
+        for n in range(operations):
+            path = rng.choice(paths)
+            start = time.perf_counter()
+            if n % 2:
+                stub.fsGetAttr(users_pb2.GetAttrRequest(path=path))
+                latencies['getattr'].append(time.perf_counter() - start)
+            else:
+                fh = stub.fileOpen(users_pb2.OpenRequest(path=path, flags=os.O_RDONLY)).fh
+                stub.fileRead(users_pb2.ReadRequest(fh=fh, offset=0, length=FILE_SIZE))
+                stub.fileRelease(users_pb2.ReleaseRequest(fh=fh))
+                latencies['open_read_release'].append(time.perf_counter() - start)
+        stats = stub.getStats(users_pb2.StatsRequest())
+        channel.close()
+    finally:
+        stop()
+
+    server = dict((m.name.rsplit('/', 1)[-1], m) for m in stats.methods)
+    result = {"dir_cache_size": cache_size}
+    for name in METHODS:
+        method = server[name]
+        result[name + "_server_us"] = round(method.seconds / method.calls * 1e6, 1)
+    for name, samples in sorted(latencies.items()):
+        samples.sort()
+        result[name + "_p50_us"] = round(percentile(samples, 0.5) * 1e6, 1)
+        result[name + "_p99_us"] = round(percentile(samples, 0.99) * 1e6, 1)
+    return result
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    operations = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+    workdir = tempfile.mkdtemp()
+    try:
+        paths = buildTree(os.path.join(workdir, 'export'), depth, files)
+        results = [run(workdir, paths, operations, size) for size in (0, DIR_CACHE_SIZE)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"depth": depth, "files": len(paths), "operations": operations, "results": results},
+        indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# Compares the cost of the old JSON-in-protobuf replies with the typed replies
+# for the two hottest filesystem RPCs, fsGetAttr and fileWrite.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.encoding [iterations]
+
+from concurrent import futures
+import json
+import os
+import sys
+import tempfile
+import time
+
+import grpc
+
+import users_pb2
+from user_server import statToAttr
+
+ATTR_KEYS = ('st_atime', 'st_ctime', 'st_gid', 'st_mode', 'st_mtime', 'st_nlink', 'st_size', 'st_uid')
+
+
+# Old encoding: what the server and Passthrough used to do
+# =========================================================
+def oldGetAttr(request, context):
+    st = os.lstat(request.path)
+    data = dict((key, getattr(st, key)) for key in ATTR_KEYS)
+    return users_pb2.JsonReply(data=json.dumps(data))
+
+def oldWrite(request, context):
+    return users_pb2.JsonReply(data=json.dumps(len(request.buf)))
+
+def oldDecodeAttr(reply):
+    return json.loads(reply.data)
+
+def oldDecodeWrite(reply):
+    return json.loads(reply.data)
+
+
+# New encoding: typed replies
+# ===========================
+def newGetAttr(request, context):
+    return users_pb2.StatReply(attr=statToAttr(os.lstat(request.path)))
+
+def newWrite(request, context):
+    return users_pb2.WriteReply(size=len(request.buf))
+
+def newDecodeAttr(reply):
+    return dict((key, getattr(reply.attr, key)) for key in ATTR_KEYS)
+
+def newDecodeWrite(reply):
+    return reply.size
+
+
+def handler(func, request_type, reply_type):
+    return grpc.unary_unary_rpc_method_handler(func,
+        request_deserializer=request_type.FromString,
+        response_serializer=reply_type.SerializeToString)
+
+def startServer():
+    handlers = {
+        'oldGetAttr': handler(oldGetAttr, users_pb2.GetAttrRequest, users_pb2.JsonReply),
+        'newGetAttr': handler(newGetAttr, users_pb2.GetAttrRequest, users_pb2.StatReply),
+        'oldWrite': handler(oldWrite, users_pb2.WriteRequest, users_pb2.JsonReply),
+        'newWrite': handler(newWrite, users_pb2.WriteRequest, users_pb2.WriteReply),
+    }
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler('bench.Encoding', handlers),))
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    return server, port
+
+def timeCalls(call, request, decode, iterations):
+    # warm up the channel and the code paths first
+    for _ in range(100):
+        decode(call(request))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(call(request))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def timeCodec(reply, reply_type, decode, iterations):
+    # serialization only, no network: encode on the "server", decode on the "client"
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(reply_type.FromString(reply.SerializeToString()))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    with tempfile.NamedTemporaryFile() as f:
+        getattr_request = users_pb2.GetAttrRequest(path=f.name)
+        write_request = users_pb2.WriteRequest(path=f.name, buf=b'x' * 4096)
+
+        print("%-10s %-8s %12s %12s" % ("rpc", "encoding", "codec (us)", "call (us)"))
+
+        server, port = startServer()
+        with grpc.insecure_channel('localhost:%d' % port) as channel:
+            cases = [
+                ('getattr', 'json', 'oldGetAttr', oldGetAttr, getattr_request, users_pb2.JsonReply, oldDecodeAttr),
+                ('getattr', 'typed', 'newGetAttr', newGetAttr, getattr_request, users_pb2.StatReply, newDecodeAttr),
+                ('write', 'json', 'oldWrite', oldWrite, write_request, users_pb2.JsonReply, oldDecodeWrite),
+                ('write', 'typed', 'newWrite', newWrite, write_request, users_pb2.WriteReply, newDecodeWrite),
+            ]
+            for rpc, encoding, method, func, request, reply_type, decode in cases:
+                call = channel.unary_unary('/bench.Encoding/' + method,
+                    request_serializer=type(request).SerializeToString,
+                    response_deserializer=reply_type.FromString)
+                codec = timeCodec(func(request, None), reply_type, decode, iterations)
+                latency = timeCalls(call, request, decode, iterations)
+                print("%-10s %-8s %12.2f %12.2f" % (rpc, encoding, codec, latency))
+        server.stop(None)
+
+if __name__ == '__main__':
+    main()
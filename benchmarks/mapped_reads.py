@@ -0,0 +1,131 @@
+# Server CPU and memory while many clients read the same big files.
+#
+# Starts user_server.py as a subprocess twice: once with --mmap-budget 0
+# (every read is a pread into a fresh buffer) and once with the default
+# budget (reads are sliced out of one shared mapping per file). In each run
+# `readers` threads stream whole files sequentially in 1 MiB windows, and the
+# server's CPU time and resident memory are sampled from /proc. Anonymous
+# memory is what the server allocates for buffers; file-backed memory is page
+# cache mapped into it, which the kernel shares and can drop at will.
+#
+# Run from the repository root after ./compile.sh (Linux only):
+#   python -m benchmarks.mapped_reads [readers] [file MiB] [passes]
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+import users_pb2
+import users_pb2_grpc
+from benchmarks.suite import login, startServer
+from channels import openChannel
+from sessions import TokenInterceptor
+
+FILES = 2
+WINDOW = 1024 * 1024
+SAMPLE_INTERVAL = 0.05
+
+
+def cpuSeconds(pid):
+    # user + system time of a process, from /proc/<pid>/stat
+    with open('/proc/%d/stat' % pid) as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+def memory(pid):
+    # RssAnon and RssFile of a process in bytes
+    out = {}
+    with open('/proc/%d/status' % pid) as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('RssAnon', 'RssFile'):
+                out[key] = int(value.split()[0]) * 1024
+    return out
+
+def readAll(stub, path, size, passes):
+    fh = stub.fileOpen(users_pb2.OpenRequest(path=path, flags=os.O_RDONLY)).fh
+    total = 0
+    for _ in range(passes):
+        for offset in range(0, size, WINDOW):
+            for reply in stub.fileReadStream(users_pb2.ReadRequest(fh=fh, offset=offset, length=WINDOW)):
+                total += len(reply.data)
+    stub.fileRelease(users_pb2.ReleaseRequest(fh=fh))
+    return total
+
+def run(workdir, paths, size, readers, passes, budget):
+    address, stop, process = startServer('subprocess', False, workdir,
+        ['--export', workdir, '--mmap-budget', str(budget)])
+    try:
+        token = login(address)
+        channels = [openChannel(address) for _ in range(readers)]
+        stubs = [users_pb2_grpc.UsersStub(grpc.intercept_channel(c, TokenInterceptor(token))) for c in channels]
+        # one warm-up read so the page cache holds the files in both runs
+        readAll(stubs[0], paths[0], size, 1)
+
+        peak = {'RssAnon': 0, 'RssFile': 0}
+        done = threading.Event()
+        def sample():
+            while not done.wait(SAMPLE_INTERVAL):
+                for key, value in memory(process.pid).items():
+                    peak[key] = max(peak[key], value)
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+
+        read = []
+        threads = [threading.Thread(target=lambda i=i: read.append(readAll(stubs[i], paths[i % len(paths)], size, passes)))
+            for i in range(readers)]
+        cpu, start = cpuSeconds(process.pid), time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+        cpu = cpuSeconds(process.pid) - cpu
+        done.set()
+        sampler.join()
+        for channel in channels:
+            channel.close()
+    finally:
+        stop()
+
+    total = sum(read)
+    return {
+        "mmap_budget_mib": budget,
+        "bytes": total,
+        "mib_per_sec": round(total / wall / 2 ** 20, 1),
+        "server_cpu_seconds": round(cpu, 2),
+        "server_cpu_ms_per_mib": round(cpu * 1000 / (total / 2 ** 20), 3),
+        "peak_rss_anon_mib": round(peak['RssAnon'] / 2 ** 20, 1),
+        "peak_rss_file_mib": round(peak['RssFile'] / 2 ** 20, 1),
+    }
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    size = int(float(sys.argv[2]) * 2 ** 20) if len(sys.argv) > 2 else 64 * 2 ** 20
+    passes = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    workdir = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(FILES):
+            path = os.path.join(workdir, 'big%d' % i)
+            with open(path, 'wb') as f:
+                for _ in range(0, size, WINDOW):
+                    f.write(os.urandom(WINDOW))
+            paths.append(path)
+        size = os.path.getsize(paths[0])
+
+        results = [run(workdir, paths, size, readers, passes, budget) for budget in (0, 1024)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"readers": readers, "file_mib": size // 2 ** 20, "passes": passes, "results": results},
+        indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# Load generator comparing the thread-pool and asyncio (--aio) server modes.
+# Starts user_server.py as a subprocess in each mode and drives it with many
+# concurrent clients doing a mix of getattr, 4 KiB reads and 4 KiB writes,
+# then reports throughput and p50/p99 latency per mode.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.server_modes [clients] [seconds]
+
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import grpc
+
+import users_pb2
+import users_pb2_grpc
+from sessions import TOKEN_METADATA_KEY
+
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'user_server.py')
+CHANNELS = 8
+FILE_SIZE = 1024 * 1024
+IO_SIZE = 4096
+# share of getattr / read / write operations
+MIX = (('getattr', 0.5), ('read', 0.3), ('write', 0.2))
+
+
+def freePort():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+def pickOp(rnd):
+    x = rnd.random()
+    for op, share in MIX:
+        if x < share:
+            return op
+        x -= share
+    return MIX[-1][0]
+
+async def client(stub, metadata, path, deadline, latencies, seed):
+    rnd = random.Random(seed)
+    fh = (await stub.fileOpen(users_pb2.OpenRequest(path=path, flags=os.O_RDWR), metadata=metadata)).fh
+    payload = os.urandom(IO_SIZE)
+    while time.perf_counter() < deadline:
+        op = pickOp(rnd)
+        offset = rnd.randrange(0, FILE_SIZE - IO_SIZE)
+        start = time.perf_counter()
+        if op == 'getattr':
+            await stub.fsGetAttr(users_pb2.GetAttrRequest(path=path), metadata=metadata)
+        elif op == 'read':
+            await stub.fileRead(users_pb2.ReadRequest(fh=fh, offset=offset, length=IO_SIZE), metadata=metadata)
+        else:
+            await stub.fileWrite(users_pb2.WriteRequest(fh=fh, offset=offset, buf=payload), metadata=metadata)
+        latencies[op].append(time.perf_counter() - start)
+    await stub.fileRelease(users_pb2.ReleaseRequest(fh=fh), metadata=metadata)
+
+async def load(address, token, root, clients, seconds):
+    metadata = ((TOKEN_METADATA_KEY, token),)
+    channels = [grpc.aio.insecure_channel(address) for _ in range(CHANNELS)]
+    stubs = [users_pb2_grpc.UsersStub(channel) for channel in channels]
+    latencies = dict((op, []) for op, _ in MIX)
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*[client(stubs[i % CHANNELS], metadata, os.path.join(root, 'f%d' % (i % 64)),
+        deadline, latencies, i) for i in range(clients)])
+    elapsed = time.perf_counter() - start
+
+    for channel in channels:
+        await channel.close()
+    return latencies, elapsed
+
+def startServer(mode, port, workdir, root):
+    args = [sys.executable, SERVER, '127.0.0.1', '--port', str(port), '--export', root]
+    if mode == 'aio':
+        args.append('--aio')
+    server = subprocess.Popen(args, cwd=workdir)
+
+    address = '127.0.0.1:%d' % port
+    with grpc.insecure_channel(address) as channel:
+        grpc.channel_ready_future(channel).result(timeout=30)
+        stub = users_pb2_grpc.UsersStub(channel)
+        stub.createUserAccount(users_pb2.CreateUserRequest(username='bench', password='bench'))
+        token = stub.loginUserAccount(users_pb2.LoginUserRequest(username='bench', password='bench')).token
+    return server, address, token
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("%-8s %-8s %10s %10s %10s" % ("mode", "op", "ops/s", "p50 (ms)", "p99 (ms)"))
+    for mode in ('threads', 'aio'):
+        workdir = tempfile.mkdtemp()
+        root = os.path.join(workdir, 'export')
+        os.mkdir(root)
+        for i in range(64):
+            with open(os.path.join(root, 'f%d' % i), 'wb') as f:
+                f.write(os.urandom(FILE_SIZE))
+
+        server, address, token = startServer(mode, freePort(), workdir, root)
+        try:
+            latencies, elapsed = asyncio.run(load(address, token, root, clients, seconds))
+        finally:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(workdir)
+
+        everything = sorted(sum(latencies.values(), []))
+        for op, samples in sorted(latencies.items()) + [('all', everything)]:
+            samples.sort()
+            print("%-8s %-8s %10.0f %10.2f %10.2f" % (mode, op, len(samples) / elapsed,
+                percentile(samples, 0.5) * 1000, percentile(samples, 0.99) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# Aggregate throughput of a namespace sharded over 1, 2 and 4 servers.
+#
+# Starts that many user_server.py subprocesses on localhost ports, each
+# exporting its own directory, and mounts them as one namespace through
+# ShardedStub. Client processes then drive Passthrough in separate top-level
+# directories, so the load spreads over the shards, each thread creating,
+# writing, stat-ing, reading and deleting small files. Reports operations
+# per second over all clients; it only grows with the shard count when the
+# machine has spare cores for the extra servers.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.sharded [client processes] [threads each] [seconds]
+
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import users_pb2
+from benchmarks.suite import PASSWORD, USERNAME, freePort, startServer
+from passthrough import Passthrough
+from shards import ShardedStub, shardOf
+
+SHARD_COUNTS = (1, 2, 4)
+# the namespace the shards are mounted as
+VIRTUAL_ROOT = '/sharded'
+FILE_SIZE = 4096
+
+
+def client(addresses, token, top, threads, seconds, results):
+    stub = ShardedStub.connect(addresses, VIRTUAL_ROOT, token)
+    fs = Passthrough(VIRTUAL_ROOT, stub)
+    payload = os.urandom(FILE_SIZE)
+    counts = [0] * threads
+
+    def worker(n):
+        deadline = time.perf_counter() + seconds
+        i = 0
+        while time.perf_counter() < deadline:
+            path = '/%s/t%d-%d' % (top, n, i)
+            fh = fs.create(path, 0o644)
+            fs.write(path, payload, 0, fh)
+            fs.release(path, fh)
+            fs.getattr(path)
+            fh = fs.open(path, os.O_RDONLY)
+            fs.read(path, FILE_SIZE, 0, fh)
+            fs.release(path, fh)
+            fs.unlink(path)
+            counts[n] += 7
+            i += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    stub.close()
+    results.put(sum(counts))
+
+def topNames(processes, count):
+    # one top-level directory per client process, named so that they are
+    # dealt out to the shards in turn
+    names, n = [], 0
+    while len(names) < processes:
+        name = 'client%d' % n
+        if shardOf(name, count) == len(names) % count:
+            names.append(name)
+        n += 1
+    return names
+
+def run(count, processes, threads, seconds):
+    workdir = tempfile.mkdtemp()
+    ports = [freePort() for _ in range(count)]
+    addresses = ['127.0.0.1:%d' % port for port in ports]
+    stops = []
+    try:
+        for i, port in enumerate(ports):
+            shard_dir = os.path.join(workdir, 'shard%d' % i)
+            export = os.path.join(shard_dir, 'export')
+            os.makedirs(export)
+            _, stop, _ = startServer('subprocess', False, shard_dir,
+                ['--export', export, '--shards', ','.join(addresses)], port)
+            stops.append(stop)
+
+        stub = ShardedStub.connect(addresses, VIRTUAL_ROOT)
+        stub.createUserAccount(users_pb2.CreateUserRequest(username=USERNAME, password=PASSWORD))
+        token = stub.loginUserAccount(users_pb2.LoginUserRequest(username=USERNAME, password=PASSWORD)).token
+        stub.close()
+        stub = ShardedStub.connect(addresses, VIRTUAL_ROOT, token)
+        fs = Passthrough(VIRTUAL_ROOT, stub)
+        tops = topNames(processes, count)
+        for top in tops:
+            fs.mkdir('/' + top, 0o755)
+        stub.close()
+
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client, args=(addresses, token, top, threads, seconds, results))
+            for top in tops]
+        for p in clients:
+            p.start()
+        ops = sum(results.get() for _ in clients)
+        for p in clients:
+            p.join()
+    finally:
+        for stop in stops:
+            stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"shards": count, "ops": ops, "ops_per_sec": round(ops / seconds)}
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    results = [run(count, processes, threads, seconds) for count in SHARD_COUNTS]
+    print(json.dumps({"client_processes": processes, "threads": threads, "cpus": os.cpu_count(),
+        "results": results}, indent=2))
+
+if __name__ == '__main__':
+    main()
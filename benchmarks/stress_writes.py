@@ -0,0 +1,119 @@
+# Concurrency stress test for the server's write path. Many writers hit the
+# server at once, each on its own file and all together on one shared file
+# (disjoint regions, through separate handles). Every file is then checked
+# byte for byte and the aggregate throughput is reported. Exits non-zero if
+# any data is wrong.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.stress_writes [writers] [MiB per writer]
+
+from concurrent import futures
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+import users_pb2
+import users_pb2_grpc
+from user_server import Users, addUsersServicer
+from userstore import JournalUserStore
+
+WRITE_SIZE = 64 * 1024
+
+
+def pattern(writer, size):
+    # deterministic, writer-specific data so mixed-up writes are caught
+    out = bytearray()
+    counter = 0
+    while len(out) < size:
+        out += hashlib.sha256(b'%d:%d' % (writer, counter)).digest()
+        counter += 1
+    return bytes(out[:size])
+
+def writeRegion(stub, path, data, base, create):
+    if create:
+        fh = stub.fileCreate(users_pb2.CreateRequest(path=path, mode=0o644)).fh
+    else:
+        fh = stub.fileOpen(users_pb2.OpenRequest(path=path, flags=os.O_WRONLY)).fh
+    for offset in range(0, len(data), WRITE_SIZE):
+        reply = stub.fileWrite(users_pb2.WriteRequest(buf=data[offset:offset + WRITE_SIZE],
+            offset=base + offset, fh=fh))
+        if reply.err:
+            raise OSError(reply.err, os.strerror(reply.err))
+    stub.fileRelease(users_pb2.ReleaseRequest(fh=fh))
+
+def runPhase(stubs, jobs):
+    errors = []
+    def worker(i, job):
+        try:
+            job(stubs[i % len(stubs)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i, job)) for i, job in enumerate(jobs)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, errors
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_writer = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 4 * 1024 * 1024
+
+    # the export and the user store both live in a scratch directory
+    workdir = tempfile.mkdtemp()
+    root = os.path.join(workdir, 'export')
+    os.mkdir(root)
+    store = JournalUserStore(os.path.join(workdir, 'userDB.journal'), legacy=None)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    addUsersServicer(Users(store=store, root=root), server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+
+    channels = [grpc.insecure_channel('localhost:%d' % port) for _ in range(4)]
+    stubs = [users_pb2_grpc.UsersStub(channel) for channel in channels]
+    data = [pattern(i, per_writer) for i in range(writers)]
+    failed = False
+
+    try:
+        # distinct files
+        paths = [os.path.join(root, 'writer%d' % i) for i in range(writers)]
+        jobs = [lambda stub, i=i: writeRegion(stub, paths[i], data[i], 0, True) for i in range(writers)]
+        elapsed, errors = runPhase(stubs, jobs)
+        bad = [p for i, p in enumerate(paths) if open(p, 'rb').read() != data[i]]
+        failed |= report('distinct files', writers * per_writer, elapsed, errors, bad)
+
+        # one shared file, each writer owning a region
+        shared = os.path.join(root, 'shared')
+        open(shared, 'wb').close()
+        jobs = [lambda stub, i=i: writeRegion(stub, shared, data[i], i * per_writer, False) for i in range(writers)]
+        elapsed, errors = runPhase(stubs, jobs)
+        contents = open(shared, 'rb').read()
+        bad = [i for i in range(writers) if contents[i * per_writer:(i + 1) * per_writer] != data[i]]
+        failed |= report('shared file', writers * per_writer, elapsed, errors, bad)
+    finally:
+        for channel in channels:
+            channel.close()
+        server.stop(None)
+        store.close()
+        shutil.rmtree(workdir)
+
+    sys.exit(1 if failed else 0)
+
+def report(name, total, elapsed, errors, bad):
+    status = 'ok' if not errors and not bad else 'FAILED (%d errors, %d corrupt)' % (len(errors), len(bad))
+    print("%-15s %8.1f MiB/s  %s" % (name, total / elapsed / (1024 * 1024), status))
+    for e in errors[:5]:
+        print("   ", repr(e))
+    return bool(errors or bad)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,422 @@
+# Benchmark suite for the remote filesystem and the auth service.
+#
+# Starts a server against a temporary export root, either in this process or
+# as a user_server.py subprocess, logs in, and drives Passthrough directly
+# (no kernel mount needed). With --mount the same workloads run through a
+# real FUSE mount instead. Results are printed as JSON, with ops/s and latency
+# percentiles per operation, so two versions can be compared run against run.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m benchmarks.suite [--workloads metadata,smallfile,...] [--scale N]
+#       [--server inprocess|subprocess] [--aio] [--mount PATH] [--output FILE]
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+import users_pb2
+import users_pb2_grpc
+from channels import StubPool, openChannel
+from sessions import TokenInterceptor
+
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'user_server.py')
+WORKLOADS = ('metadata', 'imports', 'smallfile', 'sequential', 'random4k', 'login')
+USERNAME = 'bench'
+PASSWORD = 'bench-password'
+
+
+class Recorder(object):
+    # collects per-operation latencies for one workload
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def time(self, op, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.add(op, time.perf_counter() - start)
+        return result
+
+    def add(self, op, seconds):
+        with self.lock:
+            self.samples.setdefault(op, []).append(seconds)
+
+    def summary(self, wall=None):
+        out = {}
+        for op, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            total = wall or sum(samples)
+            out[op] = {
+                "ops": len(samples),
+                "ops_per_sec": round(len(samples) / total, 1) if total else None,
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+                "p90_ms": round(percentile(samples, 0.90) * 1000, 3),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+            }
+        return out
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+# Drivers: the same workloads against Passthrough or a mounted path
+# ================================================================
+class PassthroughDriver(object):
+    def __init__(self, fs):
+        self.fs = fs
+
+    def stat(self, path):
+        return self.fs.getattr(path)
+
+    def listdir(self, path):
+        return [name for name in self.fs.readdir(path, None) if name not in ('.', '..')]
+
+    def mkdir(self, path):
+        self.fs.mkdir(path, 0o755)
+
+    def create(self, path):
+        return self.fs.create(path, 0o644)
+
+    def open(self, path, flags):
+        return self.fs.open(path, flags)
+
+    def pread(self, path, fh, length, offset):
+        return self.fs.read(path, length, offset, fh)
+
+    def pwrite(self, path, fh, data, offset):
+        return self.fs.write(path, data, offset, fh)
+
+    def close(self, path, fh):
+        self.fs.flush(path, fh)
+        self.fs.release(path, fh)
+
+    def unlink(self, path):
+        self.fs.unlink(path)
+
+    def rmtree(self, path):
+        for name in self.listdir(path):
+            child = path + '/' + name
+            if self.stat(child)['st_mode'] & 0o040000:
+                self.rmtree(child)
+            else:
+                self.unlink(child)
+        self.fs.rmdir(path)
+
+class MountDriver(object):
+    def __init__(self, mountpoint):
+        self.mountpoint = mountpoint
+
+    def _path(self, path):
+        return os.path.join(self.mountpoint, path.lstrip('/'))
+
+    def stat(self, path):
+        return os.lstat(self._path(path))
+
+    def listdir(self, path):
+        return os.listdir(self._path(path))
+
+    def mkdir(self, path):
+        os.mkdir(self._path(path), 0o755)
+
+    def create(self, path):
+        return os.open(self._path(path), os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    def open(self, path, flags):
+        return os.open(self._path(path), flags)
+
+    def pread(self, path, fh, length, offset):
+        return os.pread(fh, length, offset)
+
+    def pwrite(self, path, fh, data, offset):
+        return os.pwrite(fh, data, offset)
+
+    def close(self, path, fh):
+        os.close(fh)
+
+    def unlink(self, path):
+        os.unlink(self._path(path))
+
+    def rmtree(self, path):
+        shutil.rmtree(self._path(path))
+
+
+# Workloads
+# =========
+def metadataWorkload(driver, scale, rec):
+    # stat/readdir over a tree of dirs x files, walked a few times
+    dirs, files = 20 * scale, 100
+    driver.mkdir('/meta')
+    for d in range(dirs):
+        driver.mkdir('/meta/d%d' % d)
+        for f in range(files):
+            driver.close('/meta/d%d/f%d' % (d, f), driver.create('/meta/d%d/f%d' % (d, f)))
+
+    for _ in range(3):
+        for d in range(dirs):
+            directory = '/meta/d%d' % d
+            for name in rec.time('readdir', driver.listdir, directory):
+                rec.time('stat', driver.stat, directory + '/' + name)
+        # misses, as when a shell searches $PATH
+        for d in range(dirs):
+            start = time.perf_counter()
+            try:
+                driver.stat('/meta/d%d/missing' % d)
+            except OSError:
+                pass
+            rec.add('stat_missing', time.perf_counter() - start)
+    driver.rmtree('/meta')
+
+def importsWorkload(driver, scale, rec):
+    # the lookups of Python imports: every module is looked for under each
+    # name an import tries, in each search path entry before the one holding it
+    entries, modules = 8, 50 * scale
+    suffixes = ('/__init__.py', '.cpython-311-x86_64-linux-gnu.so', '.abi3.so', '.so', '.py', '.pyc')
+    driver.mkdir('/imports')
+    for e in range(entries):
+        driver.mkdir('/imports/p%d' % e)
+    for m in range(modules):
+        path = '/imports/p%d/mod%d.py' % (m % entries, m)
+        driver.close(path, driver.create(path))
+
+    # imported again as by separate interpreters
+    for _ in range(3):
+        for m in range(modules):
+            for e in range(m % entries + 1):
+                for suffix in suffixes:
+                    start = time.perf_counter()
+                    try:
+                        driver.stat('/imports/p%d/mod%d%s' % (e, m, suffix))
+                        found = True
+                    except OSError:
+                        found = False
+                    rec.add('stat_found' if found else 'stat_missing', time.perf_counter() - start)
+                    if found:
+                        break
+    driver.rmtree('/imports')
+
+def smallfileWorkload(driver, scale, rec):
+    # create + 4 KiB write + close, then unlink
+    count = 1000 * scale
+    data = os.urandom(4096)
+    driver.mkdir('/small')
+    for i in range(count):
+        path = '/small/f%d' % i
+        start = time.perf_counter()
+        fh = driver.create(path)
+        driver.pwrite(path, fh, data, 0)
+        driver.close(path, fh)
+        rec.add('create_write_close', time.perf_counter() - start)
+    for i in range(count):
+        rec.time('unlink', driver.unlink, '/small/f%d' % i)
+    driver.rmtree('/small')
+
+def sequentialWorkload(driver, scale, rec):
+    # large file written and read back front to back in 128 KiB requests
+    size, chunk = 64 * 1024 * 1024 * scale, 128 * 1024
+    data = os.urandom(chunk)
+    path = '/sequential'
+
+    start = time.perf_counter()
+    fh = driver.create(path)
+    for offset in range(0, size, chunk):
+        rec.time('write_128k', driver.pwrite, path, fh, data, offset)
+    rec.time('close_after_write', driver.close, path, fh)
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fh = driver.open(path, os.O_RDONLY)
+    offset = 0
+    while True:
+        got = rec.time('read_128k', driver.pread, path, fh, chunk, offset)
+        if not got:
+            break
+        offset += len(got)
+    driver.close(path, fh)
+    read_time = time.perf_counter() - start
+    driver.unlink(path)
+    return {"write_MiB_per_sec": round(size / write_time / 2 ** 20, 1),
+            "read_MiB_per_sec": round(offset / read_time / 2 ** 20, 1)}
+
+def random4kWorkload(driver, scale, rec):
+    # random 4 KiB reads and writes over a 16 MiB file
+    size, ops = 16 * 1024 * 1024, 2000 * scale
+    rnd = random.Random(4000)
+    data = os.urandom(4096)
+    path = '/random'
+
+    fh = driver.create(path)
+    for offset in range(0, size, 1024 * 1024):
+        driver.pwrite(path, fh, os.urandom(1024 * 1024), offset)
+    driver.close(path, fh)
+
+    fh = driver.open(path, os.O_RDWR)
+    for _ in range(ops):
+        offset = rnd.randrange(0, size // 4096) * 4096
+        if rnd.random() < 0.7:
+            rec.time('read_4k', driver.pread, path, fh, 4096, offset)
+        else:
+            rec.time('write_4k', driver.pwrite, path, fh, data, offset)
+    rec.time('close_after_random', driver.close, path, fh)
+    driver.unlink(path)
+
+def loginWorkload(address, scale, rec):
+    # many concurrent logins, as after a server restart
+    threads, per_thread = 32, 4 * scale
+    rejected = []
+    channel = openChannel(address)
+    stub = users_pb2_grpc.UsersStub(channel)
+
+    def worker():
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            try:
+                stub.loginUserAccount(users_pb2.LoginUserRequest(username=USERNAME, password=PASSWORD))
+                rec.add('login', time.perf_counter() - start)
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.RESOURCE_EXHAUSTED:
+                    raise
+                rec.add('login_rejected', time.perf_counter() - start)
+                rejected.append(1)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    wall = time.perf_counter() - start
+    channel.close()
+    return {"wall_seconds": round(wall, 3), "accepted_per_sec": round(len(rec.samples.get('login', ())) / wall, 1),
+            "rejected": len(rejected)}
+
+
+# Server setup
+# ============
+def freePort():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def startServer(kind, aio, workdir, options=(), port=None):
+    # returns (address, stop function, server process or None); the server
+    # exports workdir/export, and `options` are extra user_server.py
+    # arguments for a subprocess server
+    port = port or freePort()
+    address = '127.0.0.1:%d' % port
+    export = os.path.join(workdir, 'export')
+    process = None
+    if kind == 'subprocess':
+        args = [sys.executable, SERVER, '127.0.0.1', '--port', str(port), '--export', export]
+        args += ['--aio'] if aio else []
+        process = subprocess.Popen(args + list(options), cwd=workdir)
+        def stop():
+            process.terminate()
+            process.wait()
+    else:
+        # the user store is created in the working directory, which is
+        # workdir only while the server is built
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            import user_server
+            from sessions import SessionManager
+            server, _ = user_server.createServer(address, sessions=SessionManager(), root=export)
+        finally:
+            os.chdir(cwd)
+        server.start()
+        def stop():
+            server.stop(None)
+
+    with openChannel(address) as channel:
+        grpc.channel_ready_future(channel).result(timeout=30)
+    return address, stop, process
+
+def login(address):
+    with openChannel(address) as channel:
+        stub = users_pb2_grpc.UsersStub(channel)
+        stub.createUserAccount(users_pb2.CreateUserRequest(username=USERNAME, password=PASSWORD))
+        reply = stub.loginUserAccount(users_pb2.LoginUserRequest(username=USERNAME, password=PASSWORD))
+    if not reply.success:
+        raise RuntimeError("benchmark login failed")
+    return reply.token
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workloads', default=','.join(WORKLOADS))
+    parser.add_argument('--scale', type=int, default=1, help='multiplies every workload size')
+    parser.add_argument('--server', choices=('inprocess', 'subprocess'), default='inprocess')
+    parser.add_argument('--aio', action='store_true', help='run the subprocess server with --aio')
+    parser.add_argument('--mount', help='run the file workloads through this FUSE mountpoint instead')
+    parser.add_argument('--output', help='write the JSON results here as well as to stdout')
+    args = parser.parse_args()
+    if args.aio and args.server != 'subprocess':
+        parser.error('--aio needs --server subprocess')
+
+    workdir = tempfile.mkdtemp()
+    export = os.path.join(workdir, 'export')
+    os.mkdir(export)
+    address, stop, _ = startServer(args.server, args.aio, workdir)
+    pool = None
+    results = {}
+    try:
+        token = login(address)
+        if args.mount:
+            driver = MountDriver(args.mount)
+        else:
+            import passthrough
+            pool = StubPool(address, interceptors=[TokenInterceptor(token)])
+            driver = PassthroughDriver(passthrough.Passthrough(export, pool))
+
+        for name in args.workloads.split(','):
+            rec = Recorder()
+            wall = None
+            start = time.perf_counter()
+            if name == 'metadata':
+                extra = metadataWorkload(driver, args.scale, rec)
+            elif name == 'imports':
+                extra = importsWorkload(driver, args.scale, rec)
+            elif name == 'smallfile':
+                extra = smallfileWorkload(driver, args.scale, rec)
+            elif name == 'sequential':
+                extra = sequentialWorkload(driver, args.scale, rec)
+            elif name == 'random4k':
+                extra = random4kWorkload(driver, args.scale, rec)
+            elif name == 'login':
+                extra = loginWorkload(address, args.scale, rec)
+                # concurrent calls: rates are over wall time, not summed latency
+                wall = extra["wall_seconds"]
+            else:
+                parser.error('unknown workload: %s' % name)
+            results[name] = {"seconds": round(time.perf_counter() - start, 3), "ops": rec.summary(wall)}
+            if extra:
+                results[name].update(extra)
+    finally:
+        if pool is not None:
+            pool.close()
+        stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "config": {"server": args.server, "aio": args.aio, "mount": args.mount, "scale": args.scale,
+            "python": sys.version.split()[0], "time": time.strftime('%Y-%m-%dT%H:%M:%S')},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
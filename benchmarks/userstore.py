@@ -0,0 +1,116 @@
+# Login/create throughput of the user stores at different user counts,
+# compared with the old approach of re-reading and rewriting userDB.json on
+# every request. Passwords are pre-hashed so bcrypt does not hide the store
+# cost: a "login" is a lookup plus a record update, as in loginUserAccount.
+#
+# Run from the repository root:
+#   python -m benchmarks.userstore [users ...]     (default 10000 100000 1000000)
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from userstore import JournalUserStore, SqliteUserStore
+
+HASH = "$2b$12$" + "x" * 53
+OPS = 2000
+# the legacy store is O(users) per request, so it gets fewer operations and
+# is skipped for large user counts
+LEGACY_OPS = 20
+LEGACY_MAX_USERS = 100000
+
+
+def record(i):
+    return {"password": HASH, "token": "t%d" % i, "login_time": 0}
+
+def populateJournal(path, users):
+    with open(path, "w") as f:
+        for i in range(users):
+            f.write(json.dumps({"name": "user%d" % i, "user": record(i)}) + "\n")
+
+def populateSqlite(path, users):
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE users (username TEXT PRIMARY KEY, data TEXT NOT NULL)")
+    db.executemany("INSERT INTO users VALUES (?, ?)",
+        (("user%d" % i, json.dumps(record(i))) for i in range(users)))
+    db.commit()
+    db.close()
+
+def populateLegacy(path, users):
+    with open(path, "w") as f:
+        json.dump(dict(("user%d" % i, record(i)) for i in range(users)), f)
+
+
+# the old Users.fetchUserFromDB/saveUserToDB
+class LegacyStore(object):
+    def __init__(self, path):
+        self.path = path
+
+    def get(self, username):
+        with open(self.path) as f:
+            return json.load(f).get(username)
+
+    def put(self, username, user):
+        with open(self.path) as f:
+            entries = json.load(f)
+        entries[username] = user
+        with open(self.path, "w") as f:
+            json.dump(entries, f)
+
+    def add(self, username, user):
+        if self.get(username) is not None:
+            return False
+        self.put(username, user)
+        return True
+
+    def close(self):
+        pass
+
+
+def measure(store, users, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        name = "user%d" % ((i * 7919) % users)
+        user = store.get(name)
+        user["login_time"] = time.time()
+        store.put(name, user)
+    login = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(ops):
+        store.add("new%d" % i, {"password": HASH})
+    create = ops / (time.perf_counter() - start)
+    return login, create
+
+def run(name, users, populate, open_store, path, ops):
+    populate(path, users)
+    start = time.perf_counter()
+    store = open_store(path)
+    load = time.perf_counter() - start
+    login, create = measure(store, users, ops)
+    store.close()
+    print("%-8s %9d %10.2f %12.0f %12.0f" % (name, users, load, login, create))
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    print("%-8s %9s %10s %12s %12s" % ("store", "users", "load (s)", "login/s", "create/s"))
+
+    for users in sizes:
+        workdir = tempfile.mkdtemp()
+        try:
+            run("journal", users, populateJournal,
+                lambda path: JournalUserStore(path, legacy=None), os.path.join(workdir, "users.journal"), OPS)
+            run("sqlite", users, populateSqlite,
+                SqliteUserStore, os.path.join(workdir, "users.sqlite"), OPS)
+            if users <= LEGACY_MAX_USERS:
+                run("legacy", users, populateLegacy,
+                    LegacyStore, os.path.join(workdir, "userDB.json"), LEGACY_OPS)
+        finally:
+            shutil.rmtree(workdir)
+
+if __name__ == '__main__':
+    main()
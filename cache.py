@@ -0,0 +1,284 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache(object):
+    """Bounded LRU map whose entries expire `ttl` seconds after they are stored.
+
+    Safe to share between threads. `hits` and `misses` count lookups so the
+    caller can tell how many round trips the cache saved.
+    """
+
+    def __init__(self, max_entries=4096, ttl=1.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        # like get, but neither counted nor moved to the recent end
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return default
+            return entry[0]
+
+    def put(self, key, value):
+        # a zero ttl or size turns the cache off
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix):
+        # drops `prefix` itself and everything below it, for directory renames/removals
+        subtree = prefix.rstrip("/") + "/"
+        with self._lock:
+            for key in [k for k in self._data if k == prefix or k.startswith(subtree)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class BlockCache(object):
+    """LRU cache of file contents in fixed-size blocks, bounded by total bytes.
+
+    Blocks are keyed by (path, block index) and stored as bytearrays; lookups
+    hand out memoryviews so the read path copies data only once. A block
+    shorter than `block_size` ends at end of file.
+
+    Blocks written with an `owner` (the client file handle) are dirty and stay
+    in memory until taken with `take_dirty`. If a dirty block has to be evicted
+    first, it is passed to `writer(path, index, data, owner)` by the call that
+    evicted it, after that call has let go of the cache's lock, so other
+    threads are not held up by the write. Until the writer returns, the block
+    is still served to readers, and `take_dirty` for its owner waits for it.
+    If the writer raises, the block is dirty again, and the owner's flush
+    sends it and reports the error.
+    """
+
+    def __init__(self, max_bytes, block_size=128 * 1024, writer=None):
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.writer = writer
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._dirty = {}
+        self._index = {}
+        self._versions = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        # evicted dirty blocks being written back: (path, index) -> their
+        # [data, owner] entries, oldest first, and owner -> how many it has
+        self._writing = {}
+        self._writing_owners = {}
+        self._written = threading.Condition(self._lock)
+
+    def get(self, path, index):
+        with self._lock:
+            block = self._blocks.get((path, index))
+            if block is None:
+                writing = self._writing.get((path, index))
+                if writing is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                return memoryview(writing[-1][0])
+            self._blocks.move_to_end((path, index))
+            self.hits += 1
+            return memoryview(block)
+
+    def put(self, path, index, data):
+        # stores a block fetched from the server; never replaces unsent data
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            key = (path, index)
+            if key in self._dirty or key in self._writing:
+                return
+            self._store(key, bytearray(data))
+            evicted = self._evict()
+        self._write_back(evicted)
+
+    def write(self, path, offset, buf, owner=None):
+        # patches cached blocks with data the client wrote. With an owner the
+        # blocks become dirty, so the caller must have loaded any partially
+        # covered block first; if one has been evicted since, nothing is
+        # written and False is returned. Without an owner, blocks that are not
+        # cached are skipped.
+        bs = self.block_size
+        with self._lock:
+            if owner is not None:
+                for pos in (offset, offset + len(buf)):
+                    key = (path, pos // bs)
+                    if pos % bs and key not in self._blocks and key not in self._writing:
+                        return False
+            first = offset // bs
+            # a short block before the write no longer ends at end of file
+            for index in list(self._index.get(path, ())):
+                if index < first and len(self._blocks[(path, index)]) < bs and (path, index) not in self._dirty:
+                    self._drop((path, index))
+
+            pos, end = offset, offset + len(buf)
+            while pos < end:
+                index = pos // bs
+                start = pos - index * bs
+                piece = buf[pos - offset:min(end, (index + 1) * bs) - offset]
+                key = (path, index)
+                block = self._blocks.get(key)
+                if block is None and key in self._writing:
+                    # the block's contents are still being written back
+                    block = bytearray(self._writing[key][-1][0])
+                    self._store(key, block)
+                elif block is None and owner is not None:
+                    block = bytearray()
+                    self._store(key, block)
+                if block is not None:
+                    if start + len(piece) > len(block):
+                        # resizing a bytearray fails while a reader holds a view
+                        # of it, so grow a copy instead
+                        block = block + bytes(start + len(piece) - len(block))
+                        self._store(key, block)
+                    block[start:start + len(piece)] = piece
+                    self._blocks.move_to_end(key)
+                    if owner is not None:
+                        self._dirty[key] = owner
+                pos += len(piece)
+            evicted = self._evict()
+        self._write_back(evicted)
+        return True
+
+    def has_dirty(self, path):
+        with self._lock:
+            return any(key[0] == path for key in self._dirty) or any(key[0] == path for key in self._writing)
+
+    def take_dirty(self, owner):
+        # returns [(path, index, data)] for the owner's dirty blocks, now clean,
+        # once the ones evicted earlier have been written back
+        with self._written:
+            self._written.wait_for(lambda: owner not in self._writing_owners)
+            keys = sorted(key for key, o in self._dirty.items() if o == owner)
+            for key in keys:
+                del self._dirty[key]
+            return [(path, index, bytes(self._blocks[(path, index)])) for path, index in keys]
+
+    def invalidate(self, path, dirty=False):
+        # drops the file's clean blocks, and unsent ones too when `dirty` is set
+        with self._lock:
+            for index in list(self._index.get(path, ())):
+                if dirty or (path, index) not in self._dirty:
+                    self._drop((path, index))
+            self._versions.pop(path, None)
+
+    def validate(self, path, version):
+        # close-to-open consistency: keep the blocks only if the file's
+        # (mtime, size) is the one they were cached under
+        with self._lock:
+            if self._versions.get(path) != version:
+                self.invalidate(path)
+            self._versions[path] = version
+
+    def set_version(self, path, version):
+        with self._lock:
+            self._versions[path] = version
+
+    def stats(self):
+        with self._lock:
+            return {"blocks": len(self._blocks), "bytes": self._bytes, "dirty": len(self._dirty),
+                "hits": self.hits, "misses": self.misses}
+
+    def _store(self, key, block):
+        old = self._blocks.get(key)
+        if old is not None:
+            self._bytes -= len(old)
+        self._blocks[key] = block
+        self._blocks.move_to_end(key)
+        self._bytes += len(block)
+        self._index.setdefault(key[0], set()).add(key[1])
+
+    def _drop(self, key):
+        block = self._blocks.pop(key)
+        self._bytes -= len(block)
+        self._dirty.pop(key, None)
+        indexes = self._index[key[0]]
+        indexes.discard(key[1])
+        if not indexes:
+            del self._index[key[0]]
+
+    def _evict(self):
+        # drops blocks past the budget, least recently used first; returns
+        # the dirty ones among them for the caller to pass to _write_back
+        evicted = []
+        while self._bytes > self.max_bytes and self._blocks:
+            key = next(iter(self._blocks))
+            owner = self._dirty.get(key)
+            data = bytes(self._blocks[key])
+            self._drop(key)
+            if owner is not None:
+                entry = [data, owner]
+                self._writing.setdefault(key, []).append(entry)
+                self._writing_owners[owner] = self._writing_owners.get(owner, 0) + 1
+                evicted.append((key, entry))
+        return evicted
+
+    def _write_back(self, evicted):
+        # called without the lock held; writes of the same block go out in
+        # the order they were evicted
+        for key, entry in evicted:
+            data, owner = entry
+            with self._written:
+                self._written.wait_for(lambda: self._writing[key][0] is entry)
+            try:
+                self.writer(key[0], key[1], data, owner)
+                failed = False
+            except Exception:
+                failed = True
+            with self._written:
+                entries = self._writing[key]
+                entries.pop(0)
+                if not entries:
+                    del self._writing[key]
+                    if failed:
+                        # a block written since already holds these contents
+                        if key not in self._blocks:
+                            self._store(key, bytearray(data))
+                        self._dirty.setdefault(key, owner)
+                self._writing_owners[owner] -= 1
+                if not self._writing_owners[owner]:
+                    del self._writing_owners[owner]
+                self._written.notify_all()
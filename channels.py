@@ -0,0 +1,59 @@
+import itertools
+
+import grpc
+
+import users_pb2_grpc
+
+# number of channels a client spreads its calls over; each channel is one
+# HTTP/2 connection with its own flow-control window and I/O
+CHANNEL_POOL_SIZE = 4
+# large enough for a full readahead window or write run in one message
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+# ping idle connections so dead servers are noticed and NATs keep the mapping
+KEEPALIVE_TIME_MS = 30000
+KEEPALIVE_TIMEOUT_MS = 10000
+# e.g. grpc.Compression.Gzip for slow links; None sends messages as they are
+CHANNEL_COMPRESSION = None
+
+CHANNEL_OPTIONS = [
+    ('grpc.max_send_message_length', MAX_MESSAGE_SIZE),
+    ('grpc.max_receive_message_length', MAX_MESSAGE_SIZE),
+    ('grpc.keepalive_time_ms', KEEPALIVE_TIME_MS),
+    ('grpc.keepalive_timeout_ms', KEEPALIVE_TIMEOUT_MS),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+]
+
+# the server must accept the clients' keepalive pings and message sizes
+SERVER_OPTIONS = [
+    ('grpc.max_send_message_length', MAX_MESSAGE_SIZE),
+    ('grpc.max_receive_message_length', MAX_MESSAGE_SIZE),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', KEEPALIVE_TIME_MS // 2),
+]
+
+
+def openChannel(address, compression=CHANNEL_COMPRESSION):
+    return grpc.insecure_channel(address, options=CHANNEL_OPTIONS, compression=compression)
+
+
+class StubPool(object):
+    """A drop-in replacement for UsersStub backed by several channels.
+
+    Each RPC attribute lookup picks the next channel round-robin, so calls
+    from many FUSE threads are spread over separate connections. Safe to
+    share between threads.
+    """
+
+    def __init__(self, address, size=CHANNEL_POOL_SIZE, interceptors=(), compression=CHANNEL_COMPRESSION):
+        self.channels = [openChannel(address, compression) for _ in range(size)]
+        self.stubs = [users_pb2_grpc.UsersStub(grpc.intercept_channel(channel, *interceptors))
+            for channel in self.channels]
+        self._next = itertools.count()
+
+    def __getattr__(self, name):
+        return getattr(self.stubs[next(self._next) % len(self.stubs)], name)
+
+    def close(self):
+        for channel in self.channels:
+            channel.close()
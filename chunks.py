@@ -0,0 +1,231 @@
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import stat
+import threading
+
+log = logging.getLogger(__name__)
+
+# content-defined chunk sizes: a boundary is only taken this far past the
+# last one, and forced if none turns up; boundaries are ~64 KiB apart beyond
+# the minimum, so chunks average ~80 KiB
+CHUNK_MIN_SIZE = 16 * 1024
+CHUNK_MAX_SIZE = 256 * 1024
+# bytes scanned for boundaries at a time
+CHUNK_SCAN_SIZE = 1024 * 1024
+# chunk locations the server remembers; whole files are forgotten least
+# recently used first past this
+CHUNK_INDEX_SIZE = 256 * 1024
+# files are read without blocking on a FIFO that took a file's name
+CHUNK_OPEN_FLAGS = os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC
+
+# Boundaries
+# ==========
+# Every byte is mixed with the 15 before it by byte permutations and XORs of
+# the whole buffer held as one big integer, so the work runs in C rather
+# than a Python loop per byte. A boundary follows two mixed bytes that are
+# both zero, which depends only on the 17 bytes there: an edit moves the
+# boundaries near it and no others.
+_MIX = [bytes(sorted(range(256), key=lambda b: hashlib.sha256(bytes((level, b))).digest()))
+    for level in range(5)]
+_SHIFTS = (8, 16, 32, 64)
+_WINDOW = 16
+
+
+def _candidates(buf, start):
+    # offsets into `buf` that a boundary may fall after, from `start` on
+    n = len(buf)
+    lanes = buf.translate(_MIX[0])
+    for level, shift in enumerate(_SHIFTS):
+        x = int.from_bytes(lanes, "big")
+        lanes = (x ^ (x >> shift)).to_bytes(n, "big").translate(_MIX[level + 1])
+    pos = lanes.find(b"\0\0", start)
+    while pos != -1:
+        yield pos + 2
+        pos = lanes.find(b"\0\0", pos + 1)
+
+def iterChunks(read):
+    # splits the stream read by read(n) into content-defined chunks
+    pending = bytearray()
+    # absolute offsets of pending[0] and of the end of what has been read
+    first, scanned = 0, 0
+    tail = b""
+    while True:
+        segment = read(CHUNK_SCAN_SIZE)
+        if not segment:
+            break
+        # the previous segment's last bytes complete the first windows, and
+        # boundaries found there already are not looked for again
+        buf = tail + segment
+        origin = scanned - len(tail)
+        pending += segment
+        scanned += len(segment)
+        cut = 0
+        for end in _candidates(buf, _WINDOW - 1 if tail else 0):
+            end += origin - first
+            while end - cut > CHUNK_MAX_SIZE:
+                yield bytes(pending[cut:cut + CHUNK_MAX_SIZE])
+                cut += CHUNK_MAX_SIZE
+            if end - cut >= CHUNK_MIN_SIZE:
+                yield bytes(pending[cut:end])
+                cut = end
+        while len(pending) - cut > CHUNK_MAX_SIZE:
+            yield bytes(pending[cut:cut + CHUNK_MAX_SIZE])
+            cut += CHUNK_MAX_SIZE
+        del pending[:cut]
+        first += cut
+        tail = buf[-_WINDOW:]
+    if pending:
+        yield bytes(pending)
+
+def chunkHash(data):
+    return hashlib.sha256(data).digest()
+
+
+# Server index
+# ============
+class IndexedFile(object):
+    def __init__(self, version, chunks):
+        # (dev, ino, mtime_ns, size) when chunked, and [(hash, offset, size)]
+        self.version = version
+        self.chunks = chunks
+
+
+def fileVersion(st):
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class ChunkIndex(object):
+    """Remembers where the server has seen each chunk, by hash.
+
+    Files are chunked when a client asks about them and when a deduplicated
+    write assembles them, so a new version of a file can reuse the chunks of
+    the old one, or of any other indexed file. Entries are not trusted: a
+    chunk is read back and its hash checked before use, and a file that
+    changed since it was chunked just fails that check. Renames move a
+    file's entries, which keeps an editor's save-to-temp-and-rename cycle
+    deduplicating against the previous save.
+    """
+
+    def __init__(self, max_chunks=CHUNK_INDEX_SIZE, opener=os.open):
+        self.max_chunks = max_chunks
+        # opener(path, flags) opens files to chunk and to read chunks from
+        self.opener = opener
+        # path -> IndexedFile, least recently used first
+        self._files = OrderedDict()
+        # hash -> (path, offset)
+        self._chunks = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.stale = 0
+
+    def index(self, path):
+        # chunks the file at `path` unless this version of it is indexed already
+        try:
+            fd = self.opener(path, CHUNK_OPEN_FLAGS)
+        except OSError:
+            return
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                return
+            version = fileVersion(st)
+            with self._lock:
+                indexed = self._files.get(path)
+                if indexed is not None and indexed.version == version:
+                    self._files.move_to_end(path)
+                    return
+
+            chunks, offset, scanned = [], 0, 0
+
+            def read(n):
+                nonlocal scanned
+                data = os.pread(fd, n, scanned)
+                scanned += len(data)
+                return data
+
+            try:
+                for data in iterChunks(read):
+                    chunks.append((chunkHash(data), offset, len(data)))
+                    offset += len(data)
+            except OSError as e:
+                log.debug("cannot index %s: %s", path, e)
+                return
+        finally:
+            os.close(fd)
+        self.add(path, version, chunks)
+
+    def add(self, path, version, chunks):
+        with self._lock:
+            self._remove(path)
+            self._files[path] = IndexedFile(version, chunks)
+            for digest, offset, _ in chunks:
+                self._chunks[digest] = (path, offset)
+            self._count += len(chunks)
+            while self._count > self.max_chunks and len(self._files) > 1:
+                self._remove(next(iter(self._files)))
+
+    def has(self, digest):
+        with self._lock:
+            return digest in self._chunks
+
+    def read(self, digest, size):
+        # the chunk's data, or None if it is no longer where it was seen
+        with self._lock:
+            location = self._chunks.get(digest)
+        if location is None:
+            return None
+        path, offset = location
+        try:
+            fd = self.opener(path, CHUNK_OPEN_FLAGS)
+            try:
+                data = os.pread(fd, size, offset)
+            finally:
+                os.close(fd)
+        except OSError:
+            data = b""
+        if len(data) != size or chunkHash(data) != digest:
+            self.stale += 1
+            return None
+        self.reused += 1
+        return data
+
+    def renamed(self, old, new):
+        # moves the entries of `old`, and of everything below it, to `new`
+        below = old.rstrip("/") + "/"
+        with self._lock:
+            self._remove(new, subtree=True)
+            moved = [p for p in self._files if p == old or p.startswith(below)]
+            for path in moved:
+                indexed = self._files.pop(path)
+                self._remove_chunks(path, indexed)
+                path = new + path[len(old):]
+                self._files[path] = indexed
+                for digest, offset, _ in indexed.chunks:
+                    self._chunks[digest] = (path, offset)
+
+    def forget(self, path, subtree=False):
+        with self._lock:
+            self._remove(path, subtree)
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._files), "chunks": len(self._chunks), "reused": self.reused,
+                "stale": self.stale}
+
+    def _remove(self, path, subtree=False):
+        below = path.rstrip("/") + "/"
+        paths = [p for p in self._files if p == path or p.startswith(below)] if subtree else [path]
+        for path in paths:
+            indexed = self._files.pop(path, None)
+            if indexed is not None:
+                self._remove_chunks(path, indexed)
+                self._count -= len(indexed.chunks)
+
+    def _remove_chunks(self, path, indexed):
+        # hashes last seen in another file keep pointing there
+        for digest, _, _ in indexed.chunks:
+            if self._chunks.get(digest, (None,))[0] == path:
+                del self._chunks[digest]
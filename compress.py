@@ -0,0 +1,136 @@
+import errno
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from channels import MAX_MESSAGE_SIZE
+
+# payload codecs, as sent in ReadRequest/ReadReply/WriteRequest.codec
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+# the codecs this side can use, most preferred first; zstd needs the
+# optional zstandard package
+CODECS = ((CODEC_ZSTD,) if zstandard is not None else ()) + (CODEC_ZLIB,)
+# payloads smaller than this are sent as they are: the bytes saved would not
+# pay for the CPU, nor for the codec's own framing
+COMPRESS_MIN_SIZE = 8 * 1024
+# a payload larger than a few samples is judged by compressing this many
+# bytes from its middle first, so already-compressed data (images, archives,
+# media) costs one small sample instead of a full pass
+COMPRESS_SAMPLE_SIZE = 4 * 1024
+# the sample, and then the whole payload, must shrink at least to this
+# fraction of its size, or the payload is sent as it is
+COMPRESS_MAX_RATIO = 0.8
+# fast levels: on a link slow enough to gain from compression at all, the
+# first level already takes most of what text gives up
+ZLIB_LEVEL = 1
+ZSTD_LEVEL = 1
+
+# what a corrupt payload raises
+_ERRORS = (zlib.error, ValueError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def _invalid(message):
+    return OSError(errno.EINVAL, message)
+
+
+class Compressor(object):
+    """Adaptive compression of fileRead and fileWrite payloads.
+
+    compress() decides per payload whether to use the negotiated codec at
+    all: small payloads and ones whose sample does not shrink enough go out
+    as they are. Both directions are counted, so stats() shows the bytes
+    saved on the wire against the CPU time spent on them.
+    """
+
+    def __init__(self, codecs=CODECS):
+        self.codecs = tuple(codecs)
+        # zstd contexts are not thread-safe; each thread gets its own
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("compressed", "decompressed", "small", "incompressible",
+            "raw_bytes", "wire_bytes", "compress_seconds", "decompress_seconds"), 0)
+
+    def choose(self, offered):
+        # the first of `offered` this side can use, or CODEC_NONE
+        for codec in offered:
+            if codec in self.codecs:
+                return codec
+        return CODEC_NONE
+
+    def compress(self, data, codec):
+        # (codec used, payload) for sending `data` with `codec` negotiated
+        if codec == CODEC_NONE or codec not in self.codecs:
+            return CODEC_NONE, data
+        size = len(data)
+        if size < COMPRESS_MIN_SIZE:
+            self._count(small=1, raw_bytes=size, wire_bytes=size)
+            return CODEC_NONE, data
+        start = time.thread_time()
+        payload = None
+        if size > 4 * COMPRESS_SAMPLE_SIZE:
+            middle = (size - COMPRESS_SAMPLE_SIZE) // 2
+            sample = data[middle:middle + COMPRESS_SAMPLE_SIZE]
+            if len(self._compress(codec, sample)) > COMPRESS_MAX_RATIO * COMPRESS_SAMPLE_SIZE:
+                payload = data
+        if payload is None:
+            payload = self._compress(codec, data)
+            if len(payload) > COMPRESS_MAX_RATIO * size:
+                payload = data
+        seconds = time.thread_time() - start
+        if payload is data:
+            self._count(incompressible=1, raw_bytes=size, wire_bytes=size, compress_seconds=seconds)
+            return CODEC_NONE, data
+        self._count(compressed=1, raw_bytes=size, wire_bytes=len(payload), compress_seconds=seconds)
+        return codec, payload
+
+    def decompress(self, codec, data, limit=MAX_MESSAGE_SIZE):
+        # the payload `data` sent with `codec`; EINVAL for an unknown codec,
+        # a corrupt payload, or one expanding past `limit` bytes
+        if codec == CODEC_NONE:
+            return data
+        if codec not in self.codecs:
+            raise _invalid("unsupported codec %d" % codec)
+        start = time.thread_time()
+        try:
+            if codec == CODEC_ZSTD:
+                raw = self._zstd()[1].decompress(data, max_output_size=limit)
+            else:
+                inflate = zlib.decompressobj()
+                raw = inflate.decompress(data, limit)
+                if inflate.unconsumed_tail or not inflate.eof:
+                    raise _invalid("payload truncated or too large")
+        except _ERRORS as e:
+            raise _invalid("corrupt payload: %s" % e)
+        self._count(decompressed=1, raw_bytes=len(raw), wire_bytes=len(data),
+            decompress_seconds=time.thread_time() - start)
+        return raw
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["saved_bytes"] = stats["raw_bytes"] - stats["wire_bytes"]
+        return stats
+
+    def _compress(self, codec, data):
+        if codec == CODEC_ZSTD:
+            return self._zstd()[0].compress(data)
+        return zlib.compress(data, ZLIB_LEVEL)
+
+    def _zstd(self):
+        # this thread's (compressor, decompressor)
+        contexts = getattr(self._local, "zstd", None)
+        if contexts is None:
+            contexts = self._local.zstd = (zstandard.ZstdCompressor(level=ZSTD_LEVEL), zstandard.ZstdDecompressor())
+        return contexts
+
+    def _count(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self._stats[key] += value
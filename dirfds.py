@@ -0,0 +1,207 @@
+from collections import OrderedDict
+import errno
+import os
+import threading
+import time
+
+# most directory descriptors kept open; the least recently used are closed
+# past this, and with 0 every call hands the kernel the whole path
+DIR_CACHE_SIZE = 1024
+# how long a cached descriptor is trusted to still be at its path, in
+# seconds; the server's own renames and rmdirs drop it at once, so this only
+# bounds how long a directory moved behind the server's back (and not seen
+# through --inotify) keeps being used
+DIR_CACHE_TTL = 5.0
+# directories below the root are opened one component at a time without
+# following symlinks
+DIR_FLAGS = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC
+
+
+class _Directory(object):
+    def __init__(self, fd, expires):
+        self.fd = fd
+        self.expires = expires
+        # calls resolving through the descriptor; it is only closed when idle
+        self.users = 0
+        # dropped from the cache while a call was still using it
+        self.closed = False
+
+
+class DirectoryCache(object):
+    """Open descriptors of directories below the export root, by path.
+
+    Handlers get the descriptor of a path's parent and the last component,
+    and use the *at() form of each syscall, so the kernel looks up one name
+    instead of walking the whole path on every call. Paths outside the root
+    are refused with EACCES, and directories are opened a component at a
+    time without following symlinks, so neither `..` nor a symlink leads out
+    of the export. A directory's descriptor, and those below it, are dropped
+    when it is renamed or removed.
+    """
+
+    def __init__(self, root, size=DIR_CACHE_SIZE, ttl=DIR_CACHE_TTL):
+        self.root = os.path.abspath(root)
+        self.size = size
+        self.ttl = ttl
+        # cached directories are keyed by their normalized absolute path,
+        # without a trailing slash, so the root '/' is ''
+        self._top = self.root.rstrip("/")
+        # path -> _Directory, least recently used first
+        self._dirs = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def check(self, path):
+        # `path` normalized, or EACCES if it is outside the root
+        if "/." in path or "//" in path or path.endswith("/"):
+            path = os.path.normpath(path)
+        if path.startswith(self._top + "/") or path == self.root:
+            return path
+        raise OSError(errno.EACCES, os.strerror(errno.EACCES))
+
+    def call(self, func, path, *args, **kwargs):
+        # func(name, *args, dir_fd=..., **kwargs) for the last component of
+        # `path` in its parent directory
+        if not self.size:
+            self.check(path)
+            return func(path, *args, **kwargs)
+        directory, name = self._acquire_parent(path)
+        try:
+            return func(name, *args, dir_fd=directory.fd, **kwargs)
+        finally:
+            self._release(directory)
+
+    def call_pair(self, func, source, target, **kwargs):
+        # the same for two paths, as rename and link take them
+        if not self.size:
+            self.check(source)
+            self.check(target)
+            return func(source, target, **kwargs)
+        first, source_name = self._acquire_parent(source)
+        try:
+            second, target_name = self._acquire_parent(target)
+            try:
+                return func(source_name, target_name, src_dir_fd=first.fd, dst_dir_fd=second.fd, **kwargs)
+            finally:
+                self._release(second)
+        finally:
+            self._release(first)
+
+    def open(self, path, flags, mode=0o777):
+        # a new descriptor for the caller to close; a symlink is not followed
+        return self.call(os.open, path, flags | os.O_NOFOLLOW, mode)
+
+    def forget(self, path):
+        # drops the descriptors of `path` and of every directory below it
+        try:
+            key = self.check(path).rstrip("/")
+        except OSError:
+            return
+        below = key + "/"
+        with self._lock:
+            stale = [k for k in self._dirs if k == key or k.startswith(below)]
+            fds = [self._retire(self._dirs.pop(k)) for k in stale]
+        for fd in fds:
+            if fd is not None:
+                os.close(fd)
+
+    def clear(self):
+        self.forget(self.root)
+
+    def stats(self):
+        with self._lock:
+            return {"dirs": len(self._dirs), "hits": self.hits, "misses": self.misses}
+
+    def _acquire_parent(self, path):
+        # (parent directory, last component); the root is its own parent
+        parent, _, name = path.rpartition("/")
+        if name and name != "." and name != "..":
+            # only normalized paths below the root are ever cached, so a hit
+            # needs no other check
+            directory = self._cached(parent)
+            if directory is not None:
+                return directory, name
+        path = self.check(path)
+        if path == self.root:
+            return self._acquire(self._top), "."
+        parent, _, name = path.rpartition("/")
+        return self._acquire(parent), name
+
+    def _cached(self, key):
+        # the live cached directory at `key` marked in use, or None
+        now = time.monotonic()
+        with self._lock:
+            directory = self._dirs.get(key)
+            if directory is None or directory.expires <= now:
+                return None
+            directory.users += 1
+            self._dirs.move_to_end(key)
+            self.hits += 1
+            return directory
+
+    def _acquire(self, key):
+        # the directory at `key`, marked in use until _release(); whatever
+        # is missing between it and the nearest cached directory above it is
+        # opened and cached on the way down
+        directory = self._cached(key)
+        if directory is not None:
+            return directory
+        with self._lock:
+            self.misses += 1
+        found = key
+        while found != self._top:
+            found = found.rpartition("/")[0]
+            directory = self._cached(found)
+            if directory is not None:
+                break
+        if directory is None:
+            # the root itself may be a symlink
+            directory = self._insert(self._top, os.open(self.root, DIR_FLAGS & ~os.O_NOFOLLOW))
+        while found != key:
+            end = key.find("/", len(found) + 1)
+            if end == -1:
+                end = len(key)
+            try:
+                fd = os.open(key[len(found) + 1:end], DIR_FLAGS, dir_fd=directory.fd)
+            finally:
+                self._release(directory)
+            found = key[:end]
+            directory = self._insert(found, fd)
+        return directory
+
+    def _insert(self, key, fd):
+        # caches a newly opened directory and returns it in use; an expired
+        # entry, or one another call opened meanwhile, is replaced
+        directory = _Directory(fd, time.monotonic() + self.ttl)
+        directory.users = 1
+        fds = []
+        with self._lock:
+            old = self._dirs.pop(key, None)
+            if old is not None:
+                fds.append(self._retire(old))
+            self._dirs[key] = directory
+            while len(self._dirs) > self.size:
+                fds.append(self._retire(self._dirs.popitem(last=False)[1]))
+        for old_fd in fds:
+            if old_fd is not None:
+                os.close(old_fd)
+        return directory
+
+    def _release(self, directory):
+        with self._lock:
+            directory.users -= 1
+            fd = None
+            if directory.closed and not directory.users:
+                fd, directory.fd = directory.fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def _retire(self, directory):
+        # marks a directory dropped from the cache; returns its descriptor for
+        # the caller to close, or None while it is in use (_release closes it)
+        directory.closed = True
+        if directory.users:
+            return None
+        fd, directory.fd = directory.fd, None
+        return fd
@@ -0,0 +1,243 @@
+from collections import deque
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import threading
+import time
+
+import users_pb2
+
+log = logging.getLogger(__name__)
+
+# events a watcher may fall behind by before its queue is dropped and it is
+# told to forget everything it has cached
+WATCH_QUEUE_SIZE = 1024
+# inotify reports the server's own changes a second time; events for paths
+# an RPC changed this recently are not passed on again
+INOTIFY_ECHO_WINDOW = 1.0
+
+
+def _inside(path, prefix):
+    return not prefix or path == prefix or path.startswith(prefix.rstrip("/") + "/")
+
+
+class Subscription(object):
+    # one watcher's queue of pending ChangeEvents
+    def __init__(self, prefix, owner, size=WATCH_QUEUE_SIZE, notify=None):
+        self.prefix = prefix
+        self.owner = owner
+        self.size = size
+        self.closed = False
+        self._events = deque()
+        self._ready = threading.Condition()
+        # called after each push and on close, for waiters that cannot block
+        # on the condition (the asyncio server's event loop)
+        self._notify = notify
+
+    def matches(self, event):
+        return _inside(event.path, self.prefix) or (event.newPath and _inside(event.newPath, self.prefix))
+
+    def push(self, event):
+        with self._ready:
+            last = self._events[-1] if self._events else None
+            if last is not None and not last.overflow and (last.op, last.path, last.newPath) == \
+                    (event.op, event.path, event.newPath):
+                # a run of writes to one file needs only its latest state
+                self._events[-1] = event
+            elif len(self._events) >= self.size:
+                self._events.clear()
+                self._events.append(users_pb2.ChangeEvent(overflow=True))
+            else:
+                self._events.append(event)
+            self._ready.notify()
+        if self._notify is not None:
+            self._notify()
+
+    def next(self, timeout):
+        # the next event, or None after `timeout` seconds or once closed
+        with self._ready:
+            self._ready.wait_for(lambda: self._events or self.closed, timeout)
+            return self._events.popleft() if self._events else None
+
+    def pop(self):
+        # the next event without waiting, or None
+        with self._ready:
+            return self._events.popleft() if self._events else None
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+        if self._notify is not None:
+            self._notify()
+
+
+class ChangeFeed(object):
+    """Fans out changes made to the export to every watching client.
+
+    Handlers publish after each successful mutation. Nothing is done, not
+    even a stat, unless someone is watching. Each event carries the path's
+    mtime and size after the change. A client is not sent its own changes,
+    which it has already applied to its caches. Callbacks registered with
+    `on_publish` see every change, watched or not.
+    """
+
+    def __init__(self, queue_size=WATCH_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        # path -> time an RPC last changed it, to drop inotify's echo
+        self._recent = {}
+        self._listeners = []
+
+    def on_publish(self, callback):
+        # callback(op, path, new_path) runs in the publishing thread
+        self._listeners.append(callback)
+
+    def subscribe(self, prefix, owner=None, notify=None):
+        subscription = Subscription(prefix, owner, self.queue_size, notify)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def close_owner(self, owner):
+        # ends the watches of a session that has ended
+        with self._lock:
+            ended = [s for s in self._subscriptions if s.owner == owner]
+        for subscription in ended:
+            self.unsubscribe(subscription)
+
+    def publish(self, op, path, new_path="", origin=None, external=False):
+        for callback in self._listeners:
+            callback(op, path, new_path)
+        with self._lock:
+            if not self._subscriptions:
+                return
+            if external:
+                if time.monotonic() - self._recent.get(path, 0) < INOTIFY_ECHO_WINDOW:
+                    return
+            else:
+                self._remember(path)
+                if new_path:
+                    self._remember(new_path)
+            targets = [s for s in self._subscriptions if origin is None or s.owner != origin]
+        if not targets:
+            return
+
+        try:
+            st = os.lstat(new_path or path)
+            mtime, size = st.st_mtime, st.st_size
+        except OSError:
+            mtime, size = 0, 0
+        event = users_pb2.ChangeEvent(op=op, path=path, newPath=new_path, mtime=mtime, size=size)
+        for subscription in targets:
+            if subscription.matches(event):
+                subscription.push(event)
+
+    def overflow(self):
+        # something was missed (e.g. inotify overflowed); everyone starts over
+        event = users_pb2.ChangeEvent(overflow=True)
+        with self._lock:
+            targets = list(self._subscriptions)
+        for subscription in targets:
+            subscription.push(event)
+
+    def _remember(self, path):
+        now = time.monotonic()
+        self._recent[path] = now
+        if len(self._recent) > 4096:
+            self._recent = dict((p, t) for p, t in self._recent.items() if now - t < INOTIFY_ECHO_WINDOW)
+
+
+# Out-of-band changes
+# ===================
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher(object):
+    """Publishes changes made to the export behind the server's back.
+
+    Uses Linux inotify through libc, with one watch per directory, so edits
+    made directly on the server reach watching clients too. Watches are
+    added as directories appear. If the kernel queue overflows, every
+    watcher is told to drop its caches.
+    """
+
+    def __init__(self, root, feed):
+        self.root = root
+        self.feed = feed
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # watch descriptor -> directory path
+        self._dirs = {}
+
+    def start(self):
+        self._add_tree(self.root)
+        threading.Thread(target=self._loop, name="inotify", daemon=True).start()
+
+    def _add(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            log.warning("cannot watch %s: %s", directory, os.strerror(ctypes.get_errno()))
+            return
+        self._dirs[wd] = directory
+
+    def _add_tree(self, top):
+        self._add(top)
+        for directory, subdirs, _ in os.walk(top):
+            for name in subdirs:
+                self._add(os.path.join(directory, name))
+
+    def _loop(self):
+        while True:
+            data = os.read(self._fd, 64 * 1024)
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+                name = data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b"\0")
+                pos += EVENT_HEADER.size + length
+                self._handle(wd, mask, os.fsdecode(name))
+
+    def _handle(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.feed.overflow()
+            return
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None:
+            return
+
+        path = os.path.join(directory, name) if name else directory
+        is_dir = mask & IN_ISDIR
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            if is_dir:
+                self._add_tree(path)
+            self.feed.publish("mkdir" if is_dir else "create", path, external=True)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self.feed.publish("rmdir" if is_dir else "unlink", path, external=True)
+        elif mask & IN_MODIFY:
+            self.feed.publish("write", path, external=True)
+        elif mask & IN_ATTRIB:
+            self.feed.publish("setattr", path, external=True)
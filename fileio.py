@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+
+import users_pb2
+
+# a rewrite spool is kept in memory up to this size, then in a temporary file
+SPOOL_MEMORY_SIZE = 8 * 1024 * 1024
+
+# compound operations that return a new handle
+OPENING_OPS = ("open", "create")
+
+
+class OpenFile(object):
+    """Client-side state for one open file handle.
+
+    Tracks whether the handle is being read sequentially (so the caller can
+    read ahead) and holds the run of adjacent writes that has not been sent to
+    the server yet, or the spooled contents of a whole-file rewrite. The
+    caller does the RPCs; this class only decides what is buffered. The
+    write buffers are guarded by a lock that is never held across an RPC,
+    so FUSE threads sharing a handle cannot deadlock on it.
+    """
+
+    def __init__(self, full_path):
+        self.full_path = full_path
+        self.lock = threading.Lock()
+
+        # where a sequential reader would read next, and whether this handle
+        # has written anything since it was opened
+        self.next_offset = None
+        self.wrote = False
+
+        # pending writes: one contiguous extent starting at dirty_offset
+        self.dirty_offset = 0
+        self.dirty = bytearray()
+
+        # the whole file, for small files read in full when opened; the
+        # server handle is already released and reads are served from here
+        self.data = None
+
+        # a rewrite of the whole file from the start (after create, or a
+        # truncate to nothing that has not been sent) is spooled here and
+        # sent deduplicated once done; truncate_pending means the server's
+        # copy still has the old contents
+        self.rewrite = False
+        self.truncate_pending = False
+        self.spool = None
+        self.spool_size = 0
+
+    # Reads
+    # =====
+
+    def is_sequential(self, offset):
+        return offset == self.next_offset
+
+    def consumed(self, offset, length):
+        self.next_offset = offset + length
+
+    # Writes
+    # ======
+
+    def append(self, offset, buf, limit):
+        # adds the write to the pending run if it extends it without growing it
+        # past `limit`; returns False if the caller must send it some other way
+        with self.lock:
+            if not self.dirty:
+                if len(buf) > limit:
+                    return False
+                self.dirty_offset = offset
+            elif offset != self.dirty_offset + len(self.dirty) or len(self.dirty) + len(buf) > limit:
+                return False
+            self.dirty += buf
+            return True
+
+    def take_dirty(self):
+        # hands the pending run to the caller for sending and clears it
+        with self.lock:
+            offset, data = self.dirty_offset, bytes(self.dirty)
+            self.dirty = bytearray()
+            return offset, data
+
+    # Rewrites
+    # ========
+
+    def start_rewrite(self, truncate_pending=False):
+        with self.lock:
+            self.rewrite = True
+            self.truncate_pending = truncate_pending
+
+    def spool_write(self, offset, buf, limit):
+        # adds the write to the rewrite spool if it continues it and keeps it
+        # within `limit` bytes; returns False if the rewrite must end
+        with self.lock:
+            if not self.rewrite or offset != self.spool_size or self.spool_size + len(buf) > limit:
+                return False
+            if self.spool is None:
+                self.spool = tempfile.SpooledTemporaryFile(SPOOL_MEMORY_SIZE)
+            self.spool.write(buf)
+            self.spool_size += len(buf)
+            return True
+
+    def take_spool(self):
+        # ends the rewrite; returns the spool (or None), its size and whether
+        # the truncate it stood in for is still to be sent. Only one caller
+        # gets the spool and the pending truncate; any other gets nothing.
+        with self.lock:
+            spool, size, truncate_pending = self.spool, self.spool_size, self.truncate_pending
+            self.rewrite = self.truncate_pending = False
+            self.spool, self.spool_size = None, 0
+            return spool, size, truncate_pending
+
+
+# Compound calls
+# ==============
+
+def compoundCall(stub, *ops):
+    # runs CompoundOps in one round trip and returns their replies, raising
+    # OSError if one failed. A handle opened by an op before the failure and
+    # not yet released is released, so a failed call leaves nothing open.
+    reply = stub.compound(users_pb2.CompoundRequest(ops=ops))
+    if reply.err:
+        raise OSError(reply.err, os.strerror(reply.err))
+    results = [getattr(result, result.WhichOneof("result")) for result in reply.results]
+    if not results or not results[-1].err:
+        return results
+
+    fh = 0
+    for op, result in zip(ops, results):
+        name = op.WhichOneof("op")
+        if name in OPENING_OPS and not result.err:
+            fh = result.fh
+        elif name == "release" and op.release.fh in (0, fh):
+            # released, or failed releasing; either way it is not ours any more
+            fh = 0
+    if fh:
+        stub.fileRelease(users_pb2.ReleaseRequest(fh=fh))
+    err = results[-1].err
+    raise OSError(err, os.strerror(err))
+
+def readSmallFile(stub, path, limit, compressor=None, codec=0):
+    # the attributes and contents of a file of at most `limit` bytes, fetched
+    # with getattr, open, read and release in one round trip; None if the file
+    # turns out to be larger. The contents may come compressed with `codec`
+    # if `compressor` is given to decompress them.
+    attr, _, read, _ = compoundCall(stub,
+        users_pb2.CompoundOp(getattr=users_pb2.GetAttrRequest(path=path)),
+        users_pb2.CompoundOp(open=users_pb2.OpenRequest(path=path, flags=os.O_RDONLY)),
+        users_pb2.CompoundOp(read=users_pb2.ReadRequest(length=limit + 1, codec=codec if compressor else 0)),
+        users_pb2.CompoundOp(release=users_pb2.ReleaseRequest()))
+    data = compressor.decompress(read.codec, read.data) if read.codec else read.data
+    if len(data) > limit:
+        return None
+    return attr.attr, data
@@ -0,0 +1,268 @@
+from collections import OrderedDict
+import errno
+import logging
+import os
+import secrets
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# most file descriptors the handle table keeps open; past this the least
+# recently used handles are closed and reopened by path on their next use
+MAX_OPEN_FDS = 1024
+# handles unused for this long have their descriptor closed, in seconds
+HANDLE_IDLE_TIMEOUT = 120
+# how often idle descriptors are reaped
+REAP_INTERVAL = 30
+
+# handle IDs are random numbers of this many bits; the bits above are left
+# for a sharded client to record which server a handle came from
+HANDLE_ID_BITS = 56
+
+# flags that must not be applied again when a handle is reopened
+REOPEN_STRIP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_TRUNC
+
+
+class Handle(object):
+    def __init__(self, handle_id, path, flags, owner, fd):
+        self.id = handle_id
+        self.path = path
+        self.flags = flags & ~REOPEN_STRIP_FLAGS
+        self.owner = owner
+        self.fd = fd
+        st = os.fstat(fd)
+        # identifies the file, so a reopen cannot land on a different one
+        self.key = (st.st_dev, st.st_ino)
+        self.last_used = time.monotonic()
+        # calls currently using the descriptor; it is only closed when idle
+        self.busy = 0
+        # descriptors holding an flock lose it when closed, so they stay open
+        self.locked = False
+        # released by the client while a call was still using it
+        self.closed = False
+
+
+class HandleTable(object):
+    """Server-side table of open files, keyed by opaque handle IDs.
+
+    Clients never see raw descriptors. Each handle belongs to the session
+    that opened it and is refused to anyone else. At most `max_fds`
+    descriptors are open at once: idle ones past that, or unused for
+    `idle_timeout` seconds, are closed and transparently reopened by path
+    (with the file identity checked) the next time the handle is used.
+    All handles of a session are closed when it ends.
+    """
+
+    def __init__(self, max_fds=MAX_OPEN_FDS, idle_timeout=HANDLE_IDLE_TIMEOUT, reap_interval=REAP_INTERVAL,
+            opener=os.open):
+        self.max_fds = max_fds
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        # opener(path, flags, mode) opens files and reopens evicted ones
+        self.opener = opener
+        self._handles = {}
+        # handles with an open descriptor, least recently used first
+        self._open = OrderedDict()
+        self._by_owner = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.reopens = 0
+        self.evictions = 0
+
+    def open(self, path, flags, mode=0o777, owner=None):
+        # opens `path` and returns a new handle ID
+        self._make_room()
+        fd = self.opener(path, flags, mode)
+        try:
+            handle = Handle(None, path, flags, owner, fd)
+        except:
+            os.close(fd)
+            raise
+        with self._lock:
+            handle.id = self._new_id()
+            self._handles[handle.id] = handle
+            self._open[handle.id] = handle
+            self._by_owner.setdefault(owner, set()).add(handle.id)
+        return handle.id
+
+    def acquire(self, handle_id, owner=None):
+        # returns the handle with an open descriptor, marked busy until release()
+        with self._lock:
+            handle = self._handles.get(handle_id)
+            if handle is None or handle.owner != owner:
+                raise OSError(errno.EBADF, os.strerror(errno.EBADF))
+            handle.busy += 1
+            handle.last_used = time.monotonic()
+            if handle.fd is not None:
+                self._open.move_to_end(handle_id)
+                return handle
+
+        try:
+            self._reopen(handle)
+        except:
+            self.release(handle)
+            raise
+        return handle
+
+    def release(self, handle):
+        with self._lock:
+            handle.busy -= 1
+            fd = None
+            if handle.closed and not handle.busy:
+                fd, handle.fd = handle.fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def use(self, handle_id, owner=None):
+        return _Using(self, handle_id, owner)
+
+    def close(self, handle_id, owner=None):
+        with self._lock:
+            handle = self._handles.get(handle_id)
+            if handle is None or handle.owner != owner:
+                raise OSError(errno.EBADF, os.strerror(errno.EBADF))
+            fd = self._forget(handle)
+        if fd is not None:
+            os.close(fd)
+
+    def close_owner(self, owner):
+        # closes every handle of a session that has ended
+        with self._lock:
+            handles = [self._handles[i] for i in self._by_owner.get(owner, ())]
+            fds = [self._forget(handle) for handle in handles]
+        for fd in fds:
+            if fd is not None:
+                os.close(fd)
+        if handles:
+            log.info("closed %d handles of an ended session", len(handles))
+
+    def replace(self, handle, source):
+        # renames the file `source` over the handle's file and points the
+        # handle at it; the caller must be the handle's only user
+        fd = os.open(source, handle.flags)
+        try:
+            with self._lock:
+                if handle.busy != 1 or handle.locked:
+                    raise OSError(errno.EBUSY, os.strerror(errno.EBUSY))
+                os.rename(source, handle.path)
+                old, handle.fd = handle.fd, fd
+                st = os.fstat(fd)
+                handle.key = (st.st_dev, st.st_ino)
+        except:
+            os.close(fd)
+            raise
+        os.close(old)
+
+    def set_locked(self, handle, locked):
+        with self._lock:
+            handle.locked = locked
+
+    def reap(self):
+        # closes descriptors unused for idle_timeout seconds; the handles stay valid
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [h for h in self._open.values() if h.last_used < deadline and self._closable(h)]
+            fds = [self._detach(handle) for handle in idle]
+        for fd in fds:
+            os.close(fd)
+        return len(fds)
+
+    def start(self):
+        threading.Thread(target=self._reap_loop, name="handle-reaper", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def stats(self):
+        with self._lock:
+            return {"handles": len(self._handles), "open_fds": len(self._open),
+                "reopens": self.reopens, "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._handles)
+
+    def _new_id(self):
+        # random IDs, so handles cannot be guessed; 0 is never used
+        while True:
+            handle_id = secrets.randbits(HANDLE_ID_BITS)
+            if handle_id and handle_id not in self._handles:
+                return handle_id
+
+    def _closable(self, handle):
+        return not handle.busy and not handle.locked
+
+    def _detach(self, handle):
+        # takes the descriptor off an open handle; the caller closes it
+        del self._open[handle.id]
+        fd, handle.fd = handle.fd, None
+        return fd
+
+    def _forget(self, handle):
+        # removes a closed handle; returns its descriptor for the caller to
+        # close, or None if it is shut or still in use (release() closes it then)
+        del self._handles[handle.id]
+        self._open.pop(handle.id, None)
+        ids = self._by_owner[handle.owner]
+        ids.discard(handle.id)
+        if not ids:
+            del self._by_owner[handle.owner]
+
+        handle.closed = True
+        if handle.busy:
+            return None
+        fd, handle.fd = handle.fd, None
+        return fd
+
+    def _make_room(self):
+        # closes least recently used idle descriptors until one more fits
+        with self._lock:
+            fds = []
+            for handle in list(self._open.values()):
+                if len(self._open) < self.max_fds:
+                    break
+                if self._closable(handle):
+                    fds.append(self._detach(handle))
+            self.evictions += len(fds)
+        for fd in fds:
+            os.close(fd)
+
+    def _reopen(self, handle):
+        self._make_room()
+        fd = self.opener(handle.path, handle.flags, 0o777)
+        st = os.fstat(fd)
+        if (st.st_dev, st.st_ino) != handle.key:
+            # renamed, replaced or deleted since it was opened
+            os.close(fd)
+            raise OSError(errno.ESTALE, os.strerror(errno.ESTALE))
+
+        with self._lock:
+            if handle.fd is None and handle.id in self._handles:
+                handle.fd = fd
+                self._open[handle.id] = handle
+                self.reopens += 1
+                fd = None
+        if fd is not None:
+            # another call reopened it first, or it was closed meanwhile
+            os.close(fd)
+            if handle.fd is None:
+                raise OSError(errno.EBADF, os.strerror(errno.EBADF))
+
+    def _reap_loop(self):
+        while not self._stopped.wait(self.reap_interval):
+            self.reap()
+
+
+class _Using(object):
+    # `with table.use(handle_id, owner) as handle:` keeps handle.fd open for the block
+    def __init__(self, table, handle_id, owner):
+        self.table = table
+        self.handle_id = handle_id
+        self.owner = owner
+
+    def __enter__(self):
+        self.handle = self.table.acquire(self.handle_id, self.owner)
+        return self.handle
+
+    def __exit__(self, *exc):
+        self.table.release(self.handle)
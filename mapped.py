@@ -0,0 +1,160 @@
+from collections import OrderedDict
+import logging
+import mmap
+import os
+import threading
+
+import users_pb2
+
+log = logging.getLogger(__name__)
+
+# files at least this large are read through a shared memory mapping; smaller
+# ones are cheaper to pread
+MMAP_MIN_SIZE = 4 * 1024 * 1024
+# most bytes mapped at once; least recently used mappings are dropped past
+# this, and files larger than it are never mapped
+MMAP_BUDGET = 1024 * 1024 * 1024
+
+# wire tags of ReadReply.data (field 1, length-delimited) and ReadReply.codec
+# (field 3, varint)
+READ_DATA_TAG = b"\x0a"
+READ_CODEC_TAG = b"\x18"
+
+
+class Mapping(object):
+    def __init__(self, mm, size):
+        self.mm = mm
+        self.size = size
+
+
+class MappedFiles(object):
+    """Read-only memory mappings of large files, keyed by inode.
+
+    Every handle on a file shares one mapping, so many readers of the same
+    big file cost no more memory than one, and each read is one copy out of
+    the page cache without a syscall. A mapping whose file has changed size
+    is replaced.
+
+    A copy from beyond the end of a file that shrank since its size was
+    checked raises SIGBUS, so callers must hold off anything that can shrink
+    the file while read() runs; the server does this with its inode locks.
+    A file truncated behind the server's back can still do it.
+    """
+
+    def __init__(self, budget=MMAP_BUDGET, min_size=MMAP_MIN_SIZE):
+        self.budget = budget
+        self.min_size = min_size
+        # (dev, ino) -> Mapping, least recently used first
+        self._maps = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.maps = 0
+        self.hits = 0
+
+    def read(self, handle, length, offset):
+        # up to `length` bytes at `offset`, or None if the file should be
+        # read with pread instead
+        size = os.fstat(handle.fd).st_size
+        if size < self.min_size or size > self.budget:
+            return None
+
+        mapping = self._get(handle.key, size)
+        if mapping is None:
+            mapping = self._map(handle, size)
+            if mapping is None:
+                return None
+        return mapping.mm[min(offset, size):min(offset + length, size)]
+
+    def stats(self):
+        with self._lock:
+            return {"mappings": len(self._maps), "bytes": self._bytes, "maps": self.maps, "hits": self.hits}
+
+    def _get(self, key, size):
+        with self._lock:
+            mapping = self._maps.get(key)
+            if mapping is None:
+                return None
+            if mapping.size != size:
+                self._drop(key)
+                return None
+            self._maps.move_to_end(key)
+            self.hits += 1
+            return mapping
+
+    def _map(self, handle, size):
+        try:
+            mm = mmap.mmap(handle.fd, size, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            # e.g. opened write-only; pread reports the error properly
+            log.debug("cannot map %s: %s", handle.path, e)
+            return None
+
+        mapping = Mapping(mm, size)
+        with self._lock:
+            if handle.key in self._maps:
+                self._drop(handle.key)
+            self._maps[handle.key] = mapping
+            self._bytes += size
+            self.maps += 1
+            while self._bytes > self.budget:
+                self._drop(next(iter(self._maps)))
+        return mapping
+
+    def _drop(self, key):
+        # a read copying out of it keeps the mmap alive; it is unmapped after
+        mapping = self._maps.pop(key)
+        self._bytes -= mapping.size
+
+
+class ReadChunk(object):
+    """A successful ReadReply whose data is sent without protobuf copying it.
+
+    The data is bytes from pread or copied out of a mapping, possibly
+    compressed with `codec`. serializeReadReply joins the wire header, the
+    data and the codec field, which is the only copy made before gRPC takes
+    the message.
+    """
+    err = 0
+
+    def __init__(self, data, codec=0):
+        self.view = data
+        self.codec = codec
+
+    @property
+    def data(self):
+        return bytes(self.view)
+
+    def message(self):
+        # as a real ReadReply, for callers that need one (e.g. compound)
+        return users_pb2.ReadReply(data=self.data, codec=self.codec)
+
+    def header(self):
+        if not len(self.view):
+            return b""
+        return READ_DATA_TAG + _varint(len(self.view))
+
+    def trailer(self):
+        if not self.codec:
+            return b""
+        return READ_CODEC_TAG + _varint(self.codec)
+
+    def ByteSize(self):
+        return len(self.header()) + len(self.view) + len(self.trailer())
+
+    def SerializeToString(self):
+        if not len(self.view):
+            return self.trailer()
+        return b"".join((self.header(), self.view, self.trailer()))
+
+
+def serializeReadReply(reply):
+    # response serializer for methods replying with ReadReply or ReadChunk
+    return reply.SerializeToString()
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
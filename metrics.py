@@ -0,0 +1,376 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import grpc
+
+log = logging.getLogger(__name__)
+
+# upper bounds of the latency histogram buckets, in seconds; one more bucket
+# counts everything slower than the last bound
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# how often a metrics file is rewritten, in seconds
+DUMP_INTERVAL = 60
+
+
+class MethodStats(object):
+    def __init__(self):
+        self.calls = 0
+        # calls that raised or were aborted
+        self.errors = 0
+        # calls answered with a filesystem errno
+        self.errnos = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class Metrics(object):
+    """Per-method call counts, errors, message bytes and latency histograms.
+
+    Recording is a few additions under a lock, cheap enough to leave on for
+    every call. The same class is used for server RPCs, client RPCs and FUSE
+    operations.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, seconds, failed=False, err=0, bytes_in=0, bytes_out=0):
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = MethodStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.errnos += bool(err)
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.seconds += seconds
+            stats.buckets[bucket] += 1
+
+    def methods(self):
+        # (name, copy of MethodStats) pairs, busiest first
+        with self._lock:
+            items = []
+            for name, stats in self._methods.items():
+                copy = MethodStats()
+                copy.__dict__.update(stats.__dict__, buckets=list(stats.buckets))
+                items.append((name, copy))
+        return sorted(items, key=lambda item: -item[1].calls)
+
+    def snapshot(self):
+        out = {}
+        for name, stats in self.methods():
+            out[name] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "errnos": stats.errnos,
+                "bytes_in": stats.bytes_in,
+                "bytes_out": stats.bytes_out,
+                "mean_ms": round(stats.seconds / stats.calls * 1000, 3),
+                "p50_ms": estimatePercentile(stats.buckets, 0.50) * 1000,
+                "p99_ms": estimatePercentile(stats.buckets, 0.99) * 1000,
+                "buckets": stats.buckets,
+            }
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._methods = {}
+            self.started = time.time()
+
+
+def estimatePercentile(buckets, p, bounds=LATENCY_BUCKETS):
+    # upper bound of the bucket holding the p-th call; calls past the last
+    # bound report twice that bound
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    seen = 0
+    for bucket, count in enumerate(buckets):
+        seen += count
+        if seen >= total * p:
+            return bounds[bucket] if bucket < len(bounds) else bounds[-1] * 2
+    return bounds[-1] * 2
+
+def dumpMetrics(path, **groups):
+    # writes {"time": ..., group: snapshot, ...} as JSON, replacing `path` atomically
+    report = {"time": time.strftime('%Y-%m-%dT%H:%M:%S')}
+    for name, metrics in groups.items():
+        report[name] = metrics.snapshot()
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+def startDumping(path, interval=DUMP_INTERVAL, **groups):
+    # rewrites the metrics file every `interval` seconds until the returned event is set
+    stopped = threading.Event()
+
+    def loop():
+        while not stopped.wait(interval):
+            try:
+                dumpMetrics(path, **groups)
+            except OSError as e:
+                log.warning("could not write metrics to %s: %s", path, e)
+
+    threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+    return stopped
+
+
+# Interceptors
+# ============
+def _size(message):
+    return message.ByteSize() if message is not None else 0
+
+def _errno(message):
+    return getattr(message, "err", 0) if message is not None else 0
+
+def _instrument(handler, method, metrics):
+    # a handler of the same shape as `handler` that records each call
+    if handler is None:
+        return None
+
+    def finish(start, failed, err, bytes_in, bytes_out):
+        seconds = time.perf_counter() - start
+        metrics.record(method, seconds, failed, err, bytes_in, bytes_out)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s %.3fms in=%d out=%d err=%d%s", method, seconds * 1000, bytes_in, bytes_out,
+                err, " failed" if failed else "")
+
+    def counted(requests, sizes):
+        for request in requests:
+            sizes.append(request.ByteSize())
+            yield request
+
+    if handler.request_streaming and handler.response_streaming:
+        def call(request_iterator, context):
+            start, sizes, err, out, failed = time.perf_counter(), [], 0, 0, True
+            try:
+                for reply in handler.stream_stream(counted(request_iterator, sizes), context):
+                    out += reply.ByteSize()
+                    err = err or _errno(reply)
+                    yield reply
+                failed = False
+            finally:
+                finish(start, failed, err, sum(sizes), out)
+        return grpc.stream_stream_rpc_method_handler(call,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+    if handler.request_streaming:
+        def call(request_iterator, context):
+            start, sizes, reply = time.perf_counter(), [], None
+            try:
+                reply = handler.stream_unary(counted(request_iterator, sizes), context)
+                return reply
+            finally:
+                finish(start, reply is None, _errno(reply), sum(sizes), _size(reply))
+        return grpc.stream_unary_rpc_method_handler(call,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+    if handler.response_streaming:
+        def call(request, context):
+            start, err, out, failed = time.perf_counter(), 0, 0, True
+            try:
+                for reply in handler.unary_stream(request, context):
+                    out += reply.ByteSize()
+                    err = err or _errno(reply)
+                    yield reply
+                failed = False
+            finally:
+                finish(start, failed, err, request.ByteSize(), out)
+        return grpc.unary_stream_rpc_method_handler(call,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+    def call(request, context):
+        start, reply = time.perf_counter(), None
+        try:
+            reply = handler.unary_unary(request, context)
+            return reply
+        finally:
+            finish(start, reply is None, _errno(reply), request.ByteSize(), _size(reply))
+    return grpc.unary_unary_rpc_method_handler(call,
+        request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+def _instrumentAsync(handler, method, metrics):
+    # _instrument for grpc.aio handlers, whose behaviours are coroutines and
+    # async generators
+    if handler is None:
+        return None
+
+    def finish(start, failed, err, bytes_in, bytes_out):
+        seconds = time.perf_counter() - start
+        metrics.record(method, seconds, failed, err, bytes_in, bytes_out)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s %.3fms in=%d out=%d err=%d%s", method, seconds * 1000, bytes_in, bytes_out,
+                err, " failed" if failed else "")
+
+    async def counted(requests, sizes):
+        async for request in requests:
+            sizes.append(request.ByteSize())
+            yield request
+
+    if handler.request_streaming and handler.response_streaming:
+        async def call(request_iterator, context):
+            start, sizes, err, out, failed = time.perf_counter(), [], 0, 0, True
+            try:
+                async for reply in handler.stream_stream(counted(request_iterator, sizes), context):
+                    out += reply.ByteSize()
+                    err = err or _errno(reply)
+                    yield reply
+                failed = False
+            finally:
+                finish(start, failed, err, sum(sizes), out)
+        return grpc.stream_stream_rpc_method_handler(call,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+    if handler.request_streaming:
+        async def call(request_iterator, context):
+            start, sizes, reply = time.perf_counter(), [], None
+            try:
+                reply = await handler.stream_unary(counted(request_iterator, sizes), context)
+                return reply
+            finally:
+                finish(start, reply is None, _errno(reply), sum(sizes), _size(reply))
+        return grpc.stream_unary_rpc_method_handler(call,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+    if handler.response_streaming:
+        async def call(request, context):
+            start, err, out, failed = time.perf_counter(), 0, 0, True
+            try:
+                async for reply in handler.unary_stream(request, context):
+                    out += reply.ByteSize()
+                    err = err or _errno(reply)
+                    yield reply
+                failed = False
+            finally:
+                finish(start, failed, err, request.ByteSize(), out)
+        return grpc.unary_stream_rpc_method_handler(call,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+    async def call(request, context):
+        start, reply = time.perf_counter(), None
+        try:
+            reply = await handler.unary_unary(request, context)
+            return reply
+        finally:
+            finish(start, reply is None, _errno(reply), request.ByteSize(), _size(reply))
+    return grpc.unary_unary_rpc_method_handler(call,
+        request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    # records every call; install it first so rejected calls are counted too
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        return _instrument(continuation(handler_call_details), method, self.metrics)
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    # MetricsInterceptor for grpc.aio servers
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        return _instrumentAsync(await continuation(handler_call_details), method, self.metrics)
+
+
+class ClientMetricsInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor,
+        grpc.StreamUnaryClientInterceptor, grpc.StreamStreamClientInterceptor):
+    """Client side: records latency, status and bytes of every call on the channel.
+
+    Unary calls are timed to their reply and streaming calls to the end of
+    the stream, so the numbers include network time the server cannot see.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def _record(self, details, start, failed, err, bytes_in, bytes_out):
+        method = details.method.rsplit("/", 1)[-1]
+        if isinstance(method, bytes):
+            method = method.decode()
+        self.metrics.record(method, time.perf_counter() - start, failed, err, bytes_in, bytes_out)
+
+    def _unary(self, details, start, call, bytes_out):
+        # blocking stubs have already finished the call when continuation returns
+        try:
+            reply = call.result()
+        except grpc.RpcError:
+            self._record(details, start, True, 0, 0, bytes_out)
+        else:
+            self._record(details, start, False, _errno(reply), _size(reply), bytes_out)
+        return call
+
+    def _stream(self, details, start, call, sizes):
+        def replies():
+            err, received, failed = 0, 0, True
+            try:
+                for reply in call:
+                    received += reply.ByteSize()
+                    err = err or _errno(reply)
+                    yield reply
+                failed = False
+            finally:
+                self._record(details, start, failed, err, received, sum(sizes))
+        return _CountedStream(call, replies())
+
+    def _counted(self, requests, sizes):
+        for request in requests:
+            sizes.append(request.ByteSize())
+            yield request
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        start = time.perf_counter()
+        return self._unary(client_call_details, start, continuation(client_call_details, request), request.ByteSize())
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        start = time.perf_counter()
+        return self._stream(client_call_details, start, continuation(client_call_details, request), [request.ByteSize()])
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        start, sizes = time.perf_counter(), []
+        call = continuation(client_call_details, self._counted(request_iterator, sizes))
+        try:
+            reply = call.result()
+        except grpc.RpcError:
+            self._record(client_call_details, start, True, 0, 0, sum(sizes))
+        else:
+            self._record(client_call_details, start, False, _errno(reply), _size(reply), sum(sizes))
+        return call
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        start, sizes = time.perf_counter(), []
+        call = continuation(client_call_details, self._counted(request_iterator, sizes))
+        return self._stream(client_call_details, start, call, sizes)
+
+
+class _CountedStream(object):
+    # iterates the counting generator; everything else (cancel, code, ...) goes to the call
+    def __init__(self, call, replies):
+        self._call = call
+        self._replies = replies
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._replies)
+
+    def __getattr__(self, name):
+        return getattr(self._call, name)
@@ -7,16 +7,156 @@ import os
 import sys
 import json
 import errno
+import itertools
+import logging
+import stat
+import threading
+import time
 
+import grpc
 import users_pb2
 import datetime
-
-IS_DEBUG = True
+from cache import BlockCache, TTLCache
+from chunks import chunkHash, iterChunks
+from compress import CODEC_NONE, CODECS, Compressor
+from fileio import OpenFile, compoundCall, readSmallFile
+from metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+ATTR_FIELDS = ('st_atime', 'st_ctime', 'st_gid', 'st_mode', 'st_mtime', 'st_nlink', 'st_size', 'st_uid')
+STATVFS_FIELDS = ('f_bavail', 'f_bfree', 'f_blocks', 'f_bsize', 'f_favail', 'f_ffree', 'f_files',
+    'f_flag', 'f_frsize', 'f_namemax')
+
+# client-side metadata cache: how long getattr/readdir/access answers are
+# trusted, and how many paths each cache holds
+ATTR_CACHE_TTL = 1.0
+ATTR_CACHE_SIZE = 8192
+
+# paths the server said do not exist are answered with ENOENT locally for
+# this long, unless the client creates them or their parent directory's
+# mtime is seen to change (a zero ttl or size turns it off)
+NEGATIVE_CACHE_TTL = 1.0
+NEGATIVE_CACHE_SIZE = 8192
+
+# bytes fetched ahead once a handle is read sequentially, the largest run of
+# adjacent writes held back before it is sent, and the chunk size used when
+# streaming that run to the server (0 turns readahead/coalescing off)
+READAHEAD_WINDOW = 1024 * 1024
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# client-side cache of file contents, checked against the server's mtime/size
+# on every open; readahead fills it, so a zero budget also turns readahead off.
+# With write-back, writes stay in the cache until flush/release/fsync.
+BLOCK_CACHE_SIZE = 64 * 1024 * 1024
+BLOCK_SIZE = 128 * 1024
+WRITE_BACK = False
+
+# read-only opens of files no larger than this (by their cached attributes)
+# fetch the whole file with one compound getattr+open+read+release call and
+# serve reads from memory (0 turns it off)
+SMALL_FILE_SIZE = 64 * 1024
+# handles for those files are local; server handles are always below this
+LOCAL_HANDLE_BASE = 1 << 63
+# pending writes no larger than STREAM_CHUNK_SIZE are sent together with the
+# flush or release that follows them, up to this many bytes or ops per call
+COMPOUND_WRITE_SIZE = 1024 * 1024
+COMPOUND_WRITE_OPS = 32
+
+# a handle that rewrites a file from the start (after create, or after
+# truncating it to nothing) spools its writes; if they come to at least
+# DEDUP_MIN_SIZE bytes, only the chunks the server does not already have are
+# uploaded and the server swaps in the new file. Rewrites growing past
+# DEDUP_MAX_SIZE are sent as ordinary writes (a zero minimum turns it off).
+DEDUP_MIN_SIZE = 1024 * 1024
+DEDUP_MAX_SIZE = 1024 * 1024 * 1024
+
+# once mounted, follow the server's change events and, while the stream is up,
+# trust cached metadata for WATCHED_CACHE_TTL seconds instead of cache_ttl
+WATCH_CHANGES = True
+WATCHED_CACHE_TTL = 30.0
+# payload codecs offered to the server, most preferred first; reads and
+# writes are then compressed with the first it can also use, when they are
+# large and compressible enough (empty turns compression off)
+PAYLOAD_CODECS = CODECS
+# seconds between attempts to re-subscribe after the stream breaks
+WATCH_RETRY_INTERVAL = 5.0
+# answers to a watch meaning the server has no room for another watcher, or
+# no watch at all; the mount then relies on cache_ttl without retrying
+WATCH_REFUSED_CODES = (grpc.StatusCode.RESOURCE_EXHAUSTED, grpc.StatusCode.UNIMPLEMENTED,
+    grpc.StatusCode.UNAUTHENTICATED)
+# once mounted, the session is refreshed this many times per session TTL the
+# server reports, so a mount left idle is not logged out; until the first
+# refresh answers, it is retried every SESSION_RETRY_INTERVAL seconds
+SESSION_REFRESHES_PER_TTL = 3
+SESSION_RETRY_INTERVAL = 5.0
+# events after which cached file contents are stale too
+DATA_CHANGE_OPS = ("write", "create", "unlink", "rename")
 
 class Passthrough(Operations):
-    def __init__(self, root, stub):
+    def __init__(self, root, stub, cache_ttl=ATTR_CACHE_TTL, cache_size=ATTR_CACHE_SIZE,
+            readahead=READAHEAD_WINDOW, write_buffer=WRITE_BUFFER_SIZE,
+            block_cache=BLOCK_CACHE_SIZE, write_back=WRITE_BACK, metrics=None, watch=WATCH_CHANGES,
+            small_file=SMALL_FILE_SIZE, dedup=DEDUP_MIN_SIZE, negative_ttl=NEGATIVE_CACHE_TTL,
+            negative_size=NEGATIVE_CACHE_SIZE, codecs=PAYLOAD_CODECS):
         self.root = root
         self.stub = stub
+        self.cache_ttl = cache_ttl
+        self.attr_cache = TTLCache(cache_size, cache_ttl)
+        self.dir_cache = TTLCache(cache_size, cache_ttl)
+        self.access_cache = TTLCache(cache_size, cache_ttl)
+        # path -> (the parent's st_mtime when the path was found missing, if known)
+        self.missing_cache = TTLCache(negative_size, negative_ttl)
+        self.block_cache = BlockCache(block_cache, BLOCK_SIZE, writer=self._write_back)
+        self.write_back = write_back and block_cache > 0
+        self.readahead = readahead
+        self.write_buffer = write_buffer
+        self.small_file = small_file
+        self.dedup_min = dedup
+        # rewrites sent deduplicated, their bytes, and the bytes uploaded
+        self.dedup_stats = {"files": 0, "bytes": 0, "sent": 0}
+        self._dedup_lock = threading.Lock()
+        # read and write payloads; the codec is negotiated on first use
+        self.compressor = Compressor(codecs)
+        self._codec = None
+        # fh -> OpenFile
+        self.files = {}
+        self._local_handles = itertools.count(LOCAL_HANDLE_BASE)
+        # latency and errno counts per FUSE operation
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.watch = watch
+        self._watch_call = None
+        self._stop_watching = threading.Event()
+        self._unmounted = threading.Event()
+
+    def __call__(self, op, *args):
+        # fusepy dispatches every operation through here
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s %s", op, ", ".join(_describe(arg) for arg in args))
+        if not hasattr(self, op):
+            raise FuseOSError(errno.EFAULT)
+
+        start = time.perf_counter()
+        try:
+            try:
+                result = getattr(self, op)(*args)
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNAUTHENTICATED:
+                    raise
+                # the session is gone: the server restarted, or the mount was
+                # suspended for longer than a session lasts
+                log.error("%s refused: %s", op, e.details())
+                raise FuseOSError(errno.EACCES)
+        except FuseOSError as e:
+            self.metrics.record(op, time.perf_counter() - start, err=e.errno)
+            raise
+        except:
+            self.metrics.record(op, time.perf_counter() - start, failed=True)
+            log.exception("%s failed", op)
+            raise
+        self.metrics.record(op, time.perf_counter() - start)
+        return result
 
     # Helpers
     # =======
@@ -24,54 +164,452 @@ class Passthrough(Operations):
     def _full_path(self, partial):
         if partial.startswith("/"):
             partial = partial[1:]
-        path = os.path.join(self.root, partial)
+        # the root itself without a trailing slash, so it matches os.path.dirname
+        # of its children in the caches
+        path = os.path.join(self.root, partial) if partial else self.root
         return path
 
+    def _check(self, response):
+        # typed replies carry the server's errno, which FUSE passes straight on
+        if response.err:
+            raise FuseOSError(response.err)
+        return response
+
+    def _payload_codec(self):
+        # servers without negotiateCodecs are sent everything uncompressed
+        if self._codec is None:
+            codec = CODEC_NONE
+            if self.compressor.codecs:
+                try:
+                    reply = self.stub.negotiateCodecs(users_pb2.CodecsRequest(codecs=self.compressor.codecs))
+                    codec = self.compressor.choose(reply.codecs)
+                except grpc.RpcError as e:
+                    if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                        raise
+            self._codec = codec
+        return self._codec
+
+    def _read_request(self, length, offset, fh):
+        return users_pb2.ReadRequest(length=length, offset=offset, fh=fh, codec=self._payload_codec())
+
+    def _read_data(self, response):
+        # a ReadReply's data, checked and decompressed
+        self._check(response)
+        try:
+            return self.compressor.decompress(response.codec, response.data)
+        except OSError as e:
+            raise FuseOSError(e.errno)
+
+    def _write_request(self, data, offset, fh, **fields):
+        codec, buf = self.compressor.compress(data, self._payload_codec())
+        return users_pb2.WriteRequest(buf=buf, codec=codec, offset=offset, fh=fh, **fields)
+
+    def _compound(self, *ops):
+        try:
+            return compoundCall(self.stub, *ops)
+        except OSError as e:
+            raise FuseOSError(e.errno)
+
+    def _is_local(self, fh):
+        return fh is not None and fh >= LOCAL_HANDLE_BASE
+
+    def _attrs(self, attr):
+        return dict((key, getattr(attr, key)) for key in ATTR_FIELDS)
+
+    def _invalidate(self, full_path, parent=True, subtree=False):
+        # forget cached metadata for a path we just changed; creating or removing
+        # an entry also changes the parent's listing and mtime
+        for cache in (self.attr_cache, self.dir_cache, self.access_cache, self.missing_cache):
+            if subtree:
+                cache.invalidate_prefix(full_path)
+            else:
+                cache.invalidate(full_path)
+
+        if parent:
+            parent_path = os.path.dirname(full_path)
+            self.attr_cache.invalidate(parent_path)
+            self.dir_cache.invalidate(parent_path)
+
+    def _open_file(self, fh):
+        # handles opened outside open/create (or before a remount) get fresh state
+        of = self.files.get(fh)
+        if of is None:
+            of = self.files.setdefault(fh, OpenFile(None))
+        return of
+
+    def _write_chunks(self, fh, offset, data):
+        view = memoryview(data)
+        for start in range(0, len(data), STREAM_CHUNK_SIZE):
+            yield self._write_request(bytes(view[start:start + STREAM_CHUNK_SIZE]), offset + start, fh)
+
+    def _send(self, fh, offset, data):
+        if len(data) <= STREAM_CHUNK_SIZE:
+            self._check(self.stub.fileWrite(self._write_request(data, offset, fh)))
+        else:
+            self._check(self.stub.fileWriteStream(self._write_chunks(fh, offset, data)))
+
+    def _write_back(self, path, index, data, fh):
+        # a dirty block pushed out of the block cache before its handle was
+        # flushed; if this fails the cache keeps it dirty for the flush
+        try:
+            self._send(fh, index * BLOCK_SIZE, data)
+        except (FuseOSError, grpc.RpcError) as e:
+            log.warning("write-back of %s block %d failed, left for the flush: %s", path, index, e)
+            raise
+
+    def _take_writes(self, of, fh):
+        # the handle's coalesced writes and dirty blocks as (offset, data) runs
+        runs = []
+        offset, data = of.take_dirty()
+        if data:
+            runs.append((offset, data))
+
+        # adjacent dirty blocks go out as one run
+        run_offset, run = None, []
+        for path, index, data in self.block_cache.take_dirty(fh):
+            offset = index * BLOCK_SIZE
+            if run and offset != run_offset + sum(len(d) for d in run):
+                runs.append((run_offset, b''.join(run)))
+                run = []
+            if not run:
+                run_offset = offset
+            run.append(data)
+        if run:
+            runs.append((run_offset, b''.join(run)))
+        return runs
+
+    def _flush_writes(self, fh, *then):
+        # sends the handle's coalesced writes and dirty blocks, followed by the
+        # compound ops `then` (whose replies are returned); small runs share
+        # a compound call with them. Errors from earlier write() calls surface here.
+        of = self.files.get(fh)
+        if of is None:
+            return self._compound(*then) if then else []
+        if of.rewrite:
+            self._end_rewrite(of, fh)
+
+        ops, size = [], 0
+        for offset, data in self._take_writes(of, fh):
+            if len(data) > STREAM_CHUNK_SIZE or size + len(data) > COMPOUND_WRITE_SIZE \
+                    or len(ops) >= COMPOUND_WRITE_OPS:
+                if ops:
+                    self._compound(*ops)
+                ops, size = [], 0
+            if len(data) > STREAM_CHUNK_SIZE:
+                self._send(fh, offset, data)
+            else:
+                ops.append(users_pb2.CompoundOp(write=self._write_request(data, offset, fh)))
+                size += len(data)
+        results = self._compound(*(ops + list(then))) if ops or then else []
+
+        if of.full_path:
+            self._invalidate(of.full_path, parent=False)
+        return results[len(ops):]
+
+    def _end_rewrite(self, of, fh):
+        # sends a spooled rewrite: deduplicated if it is large enough, else as
+        # ordinary writes after the truncate it stood in for
+        spool, size, truncate_pending = of.take_spool()
+        try:
+            if size >= self.dedup_min:
+                try:
+                    self._dedup_write(of, fh, spool, size)
+                    return
+                except FuseOSError as e:
+                    if e.errno not in (errno.ESTALE, errno.EBUSY):
+                        raise
+                    log.info("deduplicated write of %s failed (%s), sending it whole", of.full_path,
+                        errno.errorcode[e.errno])
+
+            if truncate_pending:
+                self._check(self.stub.fileTruncate(users_pb2.TruncateRequest(length=0, fh=fh)))
+            offset = 0
+            while offset < size:
+                spool.seek(offset)
+                data = spool.read(WRITE_BUFFER_SIZE)
+                if not of.append(offset, data, self.write_buffer):
+                    self._send(fh, offset, data)
+                offset += len(data)
+        finally:
+            if spool is not None:
+                spool.close()
+            # blocks another handle read meanwhile are of the old contents
+            self.block_cache.invalidate(of.full_path)
+
+    def _dedup_write(self, of, fh, spool, size):
+        spool.seek(0)
+        chunks, offset = [], 0
+        for data in iterChunks(spool.read):
+            chunks.append((chunkHash(data), offset, len(data)))
+            offset += len(data)
+        hashes = [digest for digest, _, _ in chunks]
+        query = users_pb2.ChunkQueryRequest(path=of.full_path, hashes=hashes)
+        missing = list(self._check(self.stub.chunkQuery(query)).missing)
+
+        def requests():
+            yield users_pb2.ChunkWriteRequest(fh=fh, hashes=hashes, sizes=[length for _, _, length in chunks])
+            for index in missing:
+                _, offset, length = chunks[index]
+                spool.seek(offset)
+                yield users_pb2.ChunkWriteRequest(index=index, data=spool.read(length))
+        self._check(self.stub.chunkWrite(requests()))
+
+        with self._dedup_lock:
+            self.dedup_stats["files"] += 1
+            self.dedup_stats["bytes"] += size
+            self.dedup_stats["sent"] += sum(chunks[index][2] for index in missing)
+        self._invalidate(of.full_path, parent=False)
+
+    def _rewrite_size(self, full_path):
+        # a file being rewritten is as long as its spool, whatever the server says
+        for of in list(self.files.values()):
+            if of.rewrite and of.full_path == full_path:
+                return of.spool_size
+        return None
+
+    def _has_dirty(self, full_path):
+        if self.block_cache.has_dirty(full_path):
+            return True
+        return any(of.dirty and of.full_path == full_path for of in list(self.files.values()))
+
+    def _flush_path(self, full_path):
+        # anything asking the server about a file must see our buffered writes
+        if not self._has_dirty(full_path):
+            return
+        for fh, of in list(self.files.items()):
+            if of.full_path == full_path:
+                self._flush_writes(fh)
+
+    def _fetch_blocks(self, of, fh, index, end, sequential):
+        # loads blocks from `index` up to byte `end` into the block cache, plus
+        # the readahead window if the handle is being read sequentially
+        self._flush_path(of.full_path)
+        start = index * BLOCK_SIZE
+        length = -(-(end - start) // BLOCK_SIZE) * BLOCK_SIZE
+        if sequential:
+            length = max(length, self.readahead)
+
+        if length > BLOCK_SIZE:
+            chunks = []
+            for response in self.stub.fileReadStream(self._read_request(length, start, fh)):
+                chunks.append(self._read_data(response))
+            data = b''.join(chunks)
+        else:
+            data = self._read_data(self.stub.fileRead(self._read_request(length, start, fh)))
+
+        view = memoryview(data)
+        for pos in range(0, len(data), BLOCK_SIZE):
+            self.block_cache.put(of.full_path, index + pos // BLOCK_SIZE, view[pos:pos + BLOCK_SIZE])
+        if len(data) < length and len(data) % BLOCK_SIZE == 0:
+            # end of file falls on a block boundary; record it with an empty block
+            self.block_cache.put(of.full_path, index + len(data) // BLOCK_SIZE, b'')
+
+    def _cached_read(self, of, fh, length, offset):
+        chunks = []
+        pos, end = offset, offset + length
+        sequential = self.readahead > 0 and of.is_sequential(offset)
+        while pos < end:
+            index = pos // BLOCK_SIZE
+            block = self.block_cache.get(of.full_path, index)
+            if block is None:
+                self._fetch_blocks(of, fh, index, end, sequential)
+                block = self.block_cache.get(of.full_path, index)
+                if block is None:
+                    # the budget is too small to hold it; read the rest directly
+                    chunks.append(self._read_data(self.stub.fileRead(self._read_request(end - pos, pos, fh))))
+                    break
+
+            piece = block[pos - index * BLOCK_SIZE:end - index * BLOCK_SIZE]
+            chunks.append(piece)
+            pos += len(piece)
+            if len(block) < BLOCK_SIZE:
+                break
+        return b''.join(chunks)
+
+    def _load_partial_blocks(self, of, fh, offset, length):
+        # write-back patches whole blocks, so the blocks a write only partly
+        # covers must be cached first
+        for pos in (offset, offset + length):
+            index = pos // BLOCK_SIZE
+            if pos % BLOCK_SIZE and self.block_cache.get(of.full_path, index) is None:
+                self._fetch_blocks(of, fh, index, pos, False)
+                if self.block_cache.get(of.full_path, index) is None:
+                    return False
+        return True
+
+    def _parent_mtime(self, full_path):
+        attrs = self.attr_cache.peek(os.path.dirname(full_path))
+        return attrs['st_mtime'] if attrs is not None else None
+
+    def _known_missing(self, full_path):
+        # whether a recent fsGetAttr said ENOENT and the parent has not changed
+        # since, as far as its cached attributes tell
+        entry = self.missing_cache.peek(full_path)
+        if entry is not None:
+            then, now = entry[0], self._parent_mtime(full_path)
+            if then is not None and now is not None and then != now:
+                self.missing_cache.invalidate(full_path)
+        return self.missing_cache.get(full_path) is not None
+
+    def _set_cache_ttl(self, ttl):
+        for cache in (self.attr_cache, self.dir_cache, self.access_cache):
+            cache.ttl = ttl
+
+    def _clear_caches(self):
+        # cached file contents are checked again on open, so only metadata goes
+        for cache in (self.attr_cache, self.dir_cache, self.access_cache, self.missing_cache):
+            cache.clear()
+
+    def _apply_change(self, event):
+        if event.overflow:
+            # sent first on every stream, and whenever events were lost
+            self._clear_caches()
+            self._set_cache_ttl(WATCHED_CACHE_TTL)
+            return
+
+        subtree = event.op in ("rename", "rmdir")
+        for path in filter(None, (event.path, event.newPath)):
+            self._invalidate(path, subtree=subtree)
+            if event.op in DATA_CHANGE_OPS:
+                self.block_cache.invalidate(path)
+
+    def _watch_changes(self):
+        while not self._stop_watching.is_set():
+            try:
+                self._watch_call = self.stub.watch(users_pb2.WatchRequest(path=self.root))
+                for event in self._watch_call:
+                    self._apply_change(event)
+            except grpc.RpcError as e:
+                if self._stop_watching.is_set():
+                    return
+                if e.code() in WATCH_REFUSED_CODES:
+                    log.warning("server refused the change stream (%s: %s), caching on %gs TTLs only", e.code(),
+                        e.details(), self.cache_ttl)
+                    self._set_cache_ttl(self.cache_ttl)
+                    self._clear_caches()
+                    return
+                log.warning("change stream lost (%s), retrying in %ds", e.code(), WATCH_RETRY_INTERVAL)
+            # changes made while we were not subscribed are unknown
+            self._set_cache_ttl(self.cache_ttl)
+            self._clear_caches()
+            self._stop_watching.wait(WATCH_RETRY_INTERVAL)
+
+    def _keep_session(self):
+        interval = SESSION_RETRY_INTERVAL
+        while True:
+            try:
+                ttl = self.stub.keepAlive(users_pb2.KeepAliveRequest()).ttl
+                interval = ttl / SESSION_REFRESHES_PER_TTL
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    return
+                log.warning("could not refresh the session (%s)", e.code())
+            if self._unmounted.wait(interval):
+                return
+
+    def start_watching(self):
+        threading.Thread(target=self._watch_changes, name="watch", daemon=True).start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watch_call is not None:
+            self._watch_call.cancel()
+
+    def cache_stats(self):
+        return {
+            "getattr": self.attr_cache.stats(),
+            "readdir": self.dir_cache.stats(),
+            "access": self.access_cache.stats(),
+            # hits are fsGetAttr calls saved
+            "missing": self.missing_cache.stats(),
+            "blocks": self.block_cache.stats(),
+        }
+
+    def init(self, path):
+        threading.Thread(target=self._keep_session, name="session", daemon=True).start()
+        if self.watch:
+            self.start_watching()
+
+    def destroy(self, path):
+        self._unmounted.set()
+        self.stop_watching()
+        log.info("cache stats: %s", json.dumps(self.cache_stats()))
+        log.info("operation stats: %s", json.dumps(self.metrics.snapshot()))
+        log.info("dedup stats: %s", json.dumps(self.dedup_stats))
+        log.info("compression stats: %s", json.dumps(self.compressor.stats()))
+
     # Filesystem methods
     # ==================
 
     def access(self, path, mode):
-        if IS_DEBUG: print("[access]", path, mode)
         path = self._full_path(path)
 
-        response = self.stub.fsAccess(users_pb2.AccessRequest(path=path, mode=mode))
+        # errno per mode, 0 meaning access is allowed
+        results = self.access_cache.get(path, {})
+        if mode not in results:
+            response = self.stub.fsAccess(users_pb2.AccessRequest(path=path, mode=mode))
+            results = dict(results)
+            results[mode] = response.err
+            self.access_cache.put(path, results)
 
-        if response.error:
-            raise FuseOSError(errno.EACCES)
+        if results[mode]:
+            raise FuseOSError(results[mode])
 
     def chmod(self, path, mode):
-        if IS_DEBUG: print("[chmod]")
-        response = self.stub.fsChmod(users_pb2.ChmodRequest(path=self._full_path(path), mode=mode))
-        return json.loads(response.data)
+        full_path = self._full_path(path)
+        self._check(self.stub.fsChmod(users_pb2.ChmodRequest(path=full_path, mode=mode)))
+        self._invalidate(full_path, parent=False)
 
     def chown(self, path, uid, gid):
-        if IS_DEBUG: print("[chown]")
-        response = self.stub.fsChown(users_pb2.ChownRequest(path=self._full_path(path), uid=uid, gid=gid))
-        return json.loads(response.data)
-        
+        full_path = self._full_path(path)
+        self._check(self.stub.fsChown(users_pb2.ChownRequest(path=full_path, uid=uid, gid=gid)))
+        self._invalidate(full_path, parent=False)
 
     def getattr(self, path, fh=None):
-        if IS_DEBUG: print("[getattr]", path, fh)
         path = self._full_path(path)
-        response = self.stub.fsGetAttr(users_pb2.GetAttrRequest(path=path, fh=fh))
-        
-        if response.error:
-            raise FuseOSError(2)
 
-        return json.loads(response.data)
+        attrs = self.attr_cache.get(path)
+        if attrs is None:
+            if fh is None and self._known_missing(path):
+                raise FuseOSError(errno.ENOENT)
+            self._flush_path(path)
+            if self._is_local(fh):
+                fh = None
+            response = self.stub.fsGetAttr(users_pb2.GetAttrRequest(path=path, fh=fh))
+            if response.err == errno.ENOENT and fh is None:
+                self.missing_cache.put(path, (self._parent_mtime(path),))
+            attrs = self._attrs(self._check(response).attr)
+            self.attr_cache.put(path, attrs)
+
+        attrs = dict(attrs)
+        size = self._rewrite_size(path)
+        if size is not None:
+            attrs['st_size'] = size
+        return attrs
 
     def readdir(self, path, fh):
-        if IS_DEBUG: print("[readdir]", path, fh)
         path = self._full_path(path)
-        response = self.stub.fsReadDir(users_pb2.ReadDirRequest(path=path))
-        dirents = json.loads(response.data)
 
-        for r in dirents:
-            yield r
+        dirents = self.dir_cache.get(path)
+        if dirents is None:
+            # one streamed call returns every name along with its attributes,
+            # which saves the kernel's follow-up getattr for each entry
+            dirents = ['.', '..']
+            for page in self.stub.fsReadDirPlus(users_pb2.ReadDirPlusRequest(path=path)):
+                self._check(page)
+                for entry in page.entries:
+                    dirents.append(entry.name)
+                    child = os.path.join(path, entry.name)
+                    # sizes of files with buffered writes are stale until flushed
+                    if not self._has_dirty(child):
+                        self.attr_cache.put(child, self._attrs(entry.attr))
+            self.dir_cache.put(path, dirents)
+
+        return list(dirents)
 
     def readlink(self, path):
-        if IS_DEBUG: print("[readlink]")
-        pathname = os.readlink(self._full_path(path))
+        request = users_pb2.ReadLinkRequest(path=self._full_path(path))
+        pathname = self._check(self.stub.fsReadLink(request)).target
         if pathname.startswith("/"):
             # Path name is absolute, sanitize it.
             return os.path.relpath(pathname, self.root)
@@ -79,106 +617,268 @@ class Passthrough(Operations):
             return pathname
 
     def mknod(self, path, mode, dev):
-        if IS_DEBUG: print("[mknod]")
-        return os.mknod(self._full_path(path), mode, dev)
+        full_path = self._full_path(path)
+        self._check(self.stub.fsMkNod(users_pb2.MkNodRequest(path=full_path, mode=mode, dev=dev)))
+        self._invalidate(full_path)
 
     def rmdir(self, path):
-        if IS_DEBUG: print("[rmdir]")
         full_path = self._full_path(path)
-        response = self.stub.fsRmDir(users_pb2.RmDirRequest(path=full_path))
-        return json.loads(response.data)
+        self._check(self.stub.fsRmDir(users_pb2.RmDirRequest(path=full_path)))
+        self._invalidate(full_path, subtree=True)
 
     def mkdir(self, path, mode):
-        if IS_DEBUG: print("[mkdir]")
         full_path = self._full_path(path)
-        response = self.stub.fsMkDir(users_pb2.MkDirRequest(path=full_path, mode=mode))
-        return json.loads(response.data)
+        self._check(self.stub.fsMkDir(users_pb2.MkDirRequest(path=full_path, mode=mode)))
+        self._invalidate(full_path)
 
     def statfs(self, path):
-        if IS_DEBUG: print("[statfs]", path)
         full_path = self._full_path(path)
-        response = self.stub.fsStat(users_pb2.StatRequest(path=full_path))
-        
-        print("STAT DATA", response.data)
-
-        return json.loads(response.data)
+        response = self._check(self.stub.fsStat(users_pb2.StatRequest(path=full_path)))
+        return dict((key, getattr(response, key)) for key in STATVFS_FIELDS)
 
 
     def unlink(self, path):
-        if IS_DEBUG: print("[unlink]")
-        self.stub.fsUnlink(users_pb2.UnlinkRequest(path=self._full_path(path)))
+        full_path = self._full_path(path)
+        self._check(self.stub.fsUnlink(users_pb2.UnlinkRequest(path=full_path)))
+        self._invalidate(full_path)
+        self.block_cache.invalidate(full_path, dirty=True)
 
     def utimens(self, path, times=None):
-        if IS_DEBUG: print("[utimens]", path, json.dumps(times))
+        full_path = self._full_path(path)
         if times != None:
             accessTime = times[0]
             modifiedTime = times[1]
-            self.stub.fsUtimens(users_pb2.UtimeNsRequest(path=self._full_path(path),aTime=accessTime,mTime=modifiedTime))
+            self._check(self.stub.fsUtimens(users_pb2.UtimeNsRequest(path=full_path,aTime=accessTime,mTime=modifiedTime)))
         else:
-            currentTime = datetime.now().timestamp()
-            self.stub.fsUtimens(users_pb2.UtimeNsRequest(path=self._full_path(path),aTime=currentTime,mTime=currentTime))
+            currentTime = datetime.datetime.now().timestamp()
+            self._check(self.stub.fsUtimens(users_pb2.UtimeNsRequest(path=full_path,aTime=currentTime,mTime=currentTime)))
+        self._invalidate(full_path, parent=False)
 
 
     def symlink(self, name, target):
-        if IS_DEBUG: print("[symlink]")
-        self.stub.fsSymlink(users_pb2.SymlinkRequest(target = target, name=self._full_path(name))) 
+        full_path = self._full_path(name)
+        self._check(self.stub.fsSymlink(users_pb2.SymlinkRequest(target = target, name=full_path)))
+        self._invalidate(full_path)
+        # paths below a link to a directory now resolve too
+        self.missing_cache.invalidate_prefix(full_path)
 
     def rename(self, old, new):
-        if IS_DEBUG: print("[rename]")
-        self.stub.fsRename(users_pb2.RenameRequest(oldPath = self._full_path(old), newPath=self._full_path(new)))
+        old_path, new_path = self._full_path(old), self._full_path(new)
+        self._flush_path(old_path)
+        self._check(self.stub.fsRename(users_pb2.RenameRequest(oldPath = old_path, newPath=new_path)))
+        self._invalidate(old_path, subtree=True)
+        self._invalidate(new_path, subtree=True)
+        self.block_cache.invalidate(old_path)
+        self.block_cache.invalidate(new_path)
 
     def link(self, target, name):
-        if IS_DEBUG: print("[link]")
-        self.stub.fsLink(users_pb2.LinkRequest(name = self._full_path(name), target=self._full_path(target)))
+        # `target` is the new link to the existing file `name`
+        full_path, new_path = self._full_path(name), self._full_path(target)
+        self._check(self.stub.fsLink(users_pb2.LinkRequest(name = full_path, target=new_path)))
+        self._invalidate(new_path)
+        # the existing file's link count changed too
+        self._invalidate(full_path, parent=False)
     
     def flock(self,fd, operation):
-        if IS_DEBUG: print("[flock]")
-        return self.stub.fsFlock(users_pb2.FlockRequest(fileDescriptor = fd, lockOperation= operation))
+        self._check(self.stub.fsFlock(users_pb2.FlockRequest(fileDescriptor = fd, lockOperation= operation)))
 
     # File methods
     # ============
 
+    def _open_small(self, full_path):
+        # fetches a small file whole in one round trip and hands FUSE a local
+        # handle; None if it has grown past small_file since it was cached
+        self._flush_path(full_path)
+        try:
+            fetched = readSmallFile(self.stub, full_path, self.small_file, self.compressor, self._payload_codec())
+        except OSError as e:
+            raise FuseOSError(e.errno)
+        if fetched is None:
+            return None
+
+        attr, data = fetched
+        self.attr_cache.put(full_path, self._attrs(attr))
+        fh = next(self._local_handles)
+        of = self.files[fh] = OpenFile(full_path)
+        of.data = data
+        return fh
+
     def open(self, path, flags):
-        if IS_DEBUG: print("[open]", path, flags)
         full_path = self._full_path(path)
-        response = self.stub.fileOpen(users_pb2.OpenRequest(path=full_path, flags=flags))
-        return json.loads(response.data)
+        if self.small_file > 0 and flags & os.O_ACCMODE == os.O_RDONLY:
+            attrs = self.attr_cache.get(full_path)
+            if attrs is not None and stat.S_ISREG(attrs['st_mode']) and attrs['st_size'] <= self.small_file:
+                fh = self._open_small(full_path)
+                if fh is not None:
+                    return fh
+
+        # close-to-open: cached blocks survive only if the file is unchanged,
+        # so the open brings back the file's attributes in the same call
+        ops = [users_pb2.CompoundOp(open=users_pb2.OpenRequest(path=full_path, flags=flags))]
+        if self.block_cache.max_bytes > 0:
+            self._flush_path(full_path)
+            ops.append(users_pb2.CompoundOp(getattr=users_pb2.GetAttrRequest(path=full_path)))
+        results = self._compound(*ops)
+        self.files[results[0].fh] = OpenFile(full_path)
+
+        if len(results) > 1:
+            attrs = self._attrs(results[1].attr)
+            self.attr_cache.put(full_path, attrs)
+            self.block_cache.validate(full_path, (attrs['st_mtime'], attrs['st_size']))
+        return results[0].fh
 
     def create(self, path, mode, fi=None):
-        if IS_DEBUG: print("[create]", path, mode, fi)
         full_path = self._full_path(path)
-        response = self.stub.fileCreate(users_pb2.CreateRequest(path=full_path, mode=mode, fi=fi))
-        
-        print("CREATE DATA:", response.data)
-        return json.loads(response.data)
+        # FUSE asks for the new file's attributes straight after creating it
+        created, attr = self._compound(
+            users_pb2.CompoundOp(create=users_pb2.CreateRequest(path=full_path, mode=mode, fi=fi)),
+            users_pb2.CompoundOp(getattr=users_pb2.GetAttrRequest(path=full_path)))
+        self._invalidate(full_path)
+        self.block_cache.invalidate(full_path)
+        self.attr_cache.put(full_path, self._attrs(attr.attr))
+        of = self.files[created.fh] = OpenFile(full_path)
+        if self.dedup_min > 0:
+            of.start_rewrite()
+        return created.fh
         
     def read(self, path, length, offset, fh):
-        if IS_DEBUG: print("[read]", path, length, offset, fh)
-        response = self.stub.fileRead(users_pb2.ReadRequest(length=length, offset=offset, fh=fh))
-        return response.data
+        of = self._open_file(fh)
+        if of.rewrite:
+            self._end_rewrite(of, fh)
+
+        if of.data is not None:
+            data = of.data[offset:offset + length]
+        elif of.full_path and self.block_cache.max_bytes > 0:
+            data = self._cached_read(of, fh, length, offset)
+        else:
+            self._flush_writes(fh)
+            data = self._read_data(self.stub.fileRead(self._read_request(length, offset, fh)))
+
+        of.consumed(offset, len(data))
+        return data
 
     def write(self, path, buf, offset, fh):
-        if IS_DEBUG: print("[write]", path, buf, offset, fh)
         full_path = self._full_path(path)
-        response = self.stub.fileWrite(users_pb2.WriteRequest(path=full_path, buf=buf, offset=offset, fh=fh))
-        return json.loads(response.data)
+        of = self._open_file(fh)
+        of.wrote = True
+
+        if of.rewrite:
+            if of.spool_write(offset, buf, DEDUP_MAX_SIZE):
+                return len(buf)
+            self._end_rewrite(of, fh)
+
+        if self.write_back and of.full_path:
+            # handles opened write-only can't load partial blocks; write through instead
+            try:
+                loaded = self._load_partial_blocks(of, fh, offset, len(buf))
+            except FuseOSError:
+                loaded = False
+            # another thread's eviction may have dropped a loaded block again
+            if loaded and self.block_cache.write(full_path, offset, buf, owner=fh):
+                self._invalidate(full_path, parent=False)
+                return len(buf)
+
+        self.block_cache.write(full_path, offset, buf)
+
+        # adjacent writes are held back and sent as one stream on flush/release
+        appended = of.append(offset, buf, self.write_buffer)
+        if not appended:
+            self._flush_writes(fh)
+            appended = of.append(offset, buf, self.write_buffer)
+        if appended:
+            self._invalidate(full_path, parent=False)
+            return len(buf)
+
+        response = self._check(self.stub.fileWrite(self._write_request(buf, offset, fh, path=full_path)))
+        self._invalidate(full_path, parent=False)
+        return response.size
 
     def truncate(self, path, length, fh=None):
-        if IS_DEBUG: print("[truncate]")
         full_path = self._full_path(path)
-        with open(full_path, 'r+') as f:
-            f.truncate(length)
+        of = self.files.get(fh) if fh is not None else None
+        if length == 0 and of is not None and of.full_path and not of.wrote and self.dedup_min > 0:
+            # opened with O_TRUNC: the old contents stay on the server until
+            # the rewrite is sent, so its chunks can be reused
+            of.start_rewrite(truncate_pending=True)
+            self._invalidate(full_path, parent=False)
+            self.block_cache.invalidate(full_path)
+            return
+        # writes buffered or spooled before the truncate reach the server first
+        self._flush_path(full_path)
+        for other, of in list(self.files.items()):
+            if of.rewrite and of.full_path == full_path:
+                self._flush_writes(other)
+        # local handles are read-only; by path is what the kernel would refuse
+        fh = 0 if fh is None or self._is_local(fh) else fh
+        self._check(self.stub.fileTruncate(users_pb2.TruncateRequest(path=full_path, length=length, fh=fh)))
+        self._invalidate(full_path, parent=False)
+        self.block_cache.invalidate(full_path)
+
+    def fallocate(self, path, mode, offset, length, fh):
+        if self._is_local(fh):
+            raise FuseOSError(errno.EBADF)
+        full_path = self._full_path(path)
+        self._flush_writes(fh)
+        request = users_pb2.FallocateRequest(fh=fh, mode=mode, offset=offset, length=length)
+        self._check(self.stub.fileFallocate(request))
+        self._invalidate(full_path, parent=False)
+        self.block_cache.invalidate(full_path)
+
+    def copy_file_range(self, path_in, fh_in, offset_in, path_out, fh_out, offset_out, length, flags):
+        # the data is copied on the server and never crosses the wire; for a
+        # small file read in full there is no server handle, and the kernel
+        # copies it through read and write instead
+        if self._is_local(fh_in) or self._is_local(fh_out):
+            raise FuseOSError(errno.EOPNOTSUPP)
+        full_path = self._full_path(path_out)
+        self._flush_path(self._full_path(path_in))
+        self._flush_writes(fh_in)
+        self._flush_writes(fh_out)
+        request = users_pb2.CopyRangeRequest(fhIn=fh_in, offsetIn=offset_in, fhOut=fh_out, offsetOut=offset_out,
+            length=length)
+        response = self._check(self.stub.fileCopyRange(request))
+        self._invalidate(full_path, parent=False)
+        self.block_cache.invalidate(full_path)
+        return response.size
 
     def flush(self, path, fh):
-        if IS_DEBUG: print("[flush]")
-        response = self.stub.fileFlush(users_pb2.FlushRequest(path=path, fh=fh))
-        return json.loads(response.data)
+        if self._is_local(fh):
+            return
+        # the last writes and the fsync share one compound call
+        self._flush_writes(fh, users_pb2.CompoundOp(flush=users_pb2.FlushRequest(path=path, fh=fh)))
 
     def release(self, path, fh):
-        if IS_DEBUG: print("[release]")
-        response = self.stub.fileRelease(users_pb2.ReleaseRequest(path=path, fh=fh))
-        return json.loads(response.data)
+        of = self._open_file(fh)
+        if self._is_local(fh):
+            self.files.pop(fh, None)
+            return
+
+        # our own writes are already in the block cache, so the file's new
+        # version is fetched along with the release to keep them valid for
+        # the next open
+        then = [users_pb2.CompoundOp(release=users_pb2.ReleaseRequest(path=path, fh=fh))]
+        versioned = of.wrote and of.full_path and self.block_cache.max_bytes > 0
+        if versioned:
+            then.append(users_pb2.CompoundOp(getattr=users_pb2.GetAttrRequest(path=of.full_path)))
+        try:
+            results = self._flush_writes(fh, *then)
+        except FuseOSError:
+            # a write failed before the release could run
+            self.stub.fileRelease(users_pb2.ReleaseRequest(path=path, fh=fh))
+            raise
+        finally:
+            self.files.pop(fh, None)
+
+        if versioned:
+            attrs = self._attrs(results[-1].attr)
+            self.attr_cache.put(of.full_path, attrs)
+            self.block_cache.set_version(of.full_path, (attrs['st_mtime'], attrs['st_size']))
 
     def fsync(self, path, fdatasync, fh):
-        if IS_DEBUG: print("[fsync]")
         return self.flush(path, fh)
+
+def _describe(arg):
+    # write buffers are logged by size only
+    if isinstance(arg, (bytes, bytearray, memoryview)):
+        return "<%d bytes>" % len(arg)
+    return repr(arg)
@@ -0,0 +1,58 @@
+from concurrent import futures
+import threading
+
+import bcrypt
+
+# bcrypt cost factor for new hashes (existing hashes keep their own)
+BCRYPT_ROUNDS = 12
+# hashes run on their own pool so a burst of logins cannot occupy every gRPC
+# worker; at most BCRYPT_WORKERS + BCRYPT_MAX_QUEUE requests wait on it at once
+BCRYPT_WORKERS = 2
+BCRYPT_MAX_QUEUE = 4
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _checkpw(password, stored_hash):
+    return bcrypt.checkpw(password, stored_hash)
+
+
+class PasswordHasher(object):
+    """Runs bcrypt on a bounded pool with admission control.
+
+    bcrypt releases the GIL, so threads are enough by default; `processes`
+    moves the work to separate processes instead. When `workers + max_queue`
+    operations are already in flight, new ones fail at once with HasherBusy
+    rather than queueing behind them.
+    """
+
+    def __init__(self, workers=BCRYPT_WORKERS, max_queue=BCRYPT_MAX_QUEUE, rounds=BCRYPT_ROUNDS, processes=False):
+        self.rounds = rounds
+        if processes:
+            self._pool = futures.ProcessPoolExecutor(workers)
+        else:
+            self._pool = futures.ThreadPoolExecutor(workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def hash(self, password):
+        hashed = self._run(_hashpw, password.encode(), self.rounds)
+        return hashed.decode(encoding="utf-8")
+
+    def check(self, password, stored_hash):
+        return self._run(_checkpw, password.encode(), stored_hash.encode())
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._pool.submit(func, *args).result()
+        finally:
+            self._slots.release()
@@ -0,0 +1,224 @@
+import secrets
+import threading
+import time
+
+import grpc
+
+# how long a session stays valid without being used, in seconds; every
+# authenticated call pushes the expiry forward
+SESSION_TTL = 300
+# how often expired sessions are swept out of the table
+SWEEP_INTERVAL = 30
+# 32 random bytes = 256-bit tokens
+TOKEN_BYTES = 32
+# gRPC metadata key the client sends its token under
+TOKEN_METADATA_KEY = "authorization"
+
+# methods callable without a session; account updates and deletes carry the
+# token in the request body and check it themselves
+PUBLIC_METHODS = ("createUserAccount", "loginUserAccount", "updateUserAccount", "deleteUserAccount",
+    "getShards")
+
+
+class Session(object):
+    def __init__(self, token, username, ttl):
+        self.token = token
+        self.username = username
+        self.created = time.time()
+        self.expires = self.created + ttl
+
+
+class SessionManager(object):
+    """In-memory table of login sessions keyed by token.
+
+    Validation is a dict lookup. Sessions expire after `ttl` idle seconds;
+    a background sweeper drops expired ones so the table does not grow
+    without bound. Callbacks registered with `on_end` are called with each
+    session that expires or is revoked, to free what it holds.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, sweep_interval=SWEEP_INTERVAL):
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._sessions = {}
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sweeper = None
+        self._listeners = []
+
+    def create(self, username):
+        session = Session(secrets.token_urlsafe(TOKEN_BYTES), username, self.ttl)
+        with self._lock:
+            self._sessions[session.token] = session
+            self._by_user.setdefault(username, set()).add(session.token)
+        return session.token
+
+    def validate(self, token):
+        # returns the live session for `token` and extends it, or None
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.expires >= now:
+                session.expires = now + self.ttl
+                return session
+            self._remove(session)
+        self._ended([session])
+        return None
+
+    def revoke(self, token):
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return
+            self._remove(session)
+        self._ended([session])
+
+    def revoke_user(self, username):
+        with self._lock:
+            sessions = [self._sessions[token] for token in self._by_user.get(username, ())]
+            for session in sessions:
+                self._remove(session)
+        self._ended(sessions)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [s for s in self._sessions.values() if s.expires < now]
+            for session in expired:
+                self._remove(session)
+        self._ended(expired)
+        return expired
+
+    def on_end(self, callback):
+        # callback(session) runs outside the table lock once a session is gone
+        self._listeners.append(callback)
+
+    def start(self):
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _sweep_loop(self):
+        while not self._stopped.wait(self.sweep_interval):
+            self.sweep()
+
+    def _ended(self, sessions):
+        for session in sessions:
+            for callback in self._listeners:
+                callback(session)
+
+    def _remove(self, session):
+        del self._sessions[session.token]
+        tokens = self._by_user[session.username]
+        tokens.discard(session.token)
+        if not tokens:
+            del self._by_user[session.username]
+
+
+def _abort_handler(handler, code, details, asynchronous=False):
+    # a handler of the same shape as `handler` that fails the call
+    if asynchronous:
+        async def abort(request, context):
+            await context.abort(code, details)
+    else:
+        def abort(request, context):
+            context.abort(code, details)
+
+    if handler is None:
+        return None
+    if handler.request_streaming and handler.response_streaming:
+        return grpc.stream_stream_rpc_method_handler(abort,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+    if handler.request_streaming:
+        return grpc.stream_unary_rpc_method_handler(abort,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+    if handler.response_streaming:
+        return grpc.unary_stream_rpc_method_handler(abort,
+            request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+    return grpc.unary_unary_rpc_method_handler(abort,
+        request_deserializer=handler.request_deserializer, response_serializer=handler.response_serializer)
+
+
+def sessionToken(context):
+    # the token the caller authenticated with, or None for in-process calls
+    if context is None:
+        return None
+    return dict(context.invocation_metadata() or ()).get(TOKEN_METADATA_KEY)
+
+
+class AuthInterceptor(grpc.ServerInterceptor):
+    # rejects calls to non-public methods that lack a live session token
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        if method in PUBLIC_METHODS:
+            return continuation(handler_call_details)
+
+        token = dict(handler_call_details.invocation_metadata or ()).get(TOKEN_METADATA_KEY)
+        if token and self.sessions.validate(token) is not None:
+            return continuation(handler_call_details)
+
+        return _abort_handler(continuation(handler_call_details),
+            grpc.StatusCode.UNAUTHENTICATED, "missing or expired session token")
+
+
+class AsyncAuthInterceptor(grpc.aio.ServerInterceptor):
+    # AuthInterceptor for grpc.aio servers
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        if method in PUBLIC_METHODS:
+            return await continuation(handler_call_details)
+
+        token = dict(handler_call_details.invocation_metadata or ()).get(TOKEN_METADATA_KEY)
+        if token and self.sessions.validate(token) is not None:
+            return await continuation(handler_call_details)
+
+        return _abort_handler(await continuation(handler_call_details),
+            grpc.StatusCode.UNAUTHENTICATED, "missing or expired session token", asynchronous=True)
+
+
+class _ClientCallDetails(grpc.ClientCallDetails):
+    def __init__(self, details, metadata):
+        self.method = details.method
+        self.timeout = details.timeout
+        self.metadata = metadata
+        self.credentials = details.credentials
+        self.wait_for_ready = details.wait_for_ready
+        self.compression = details.compression
+
+
+class TokenInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor,
+        grpc.StreamUnaryClientInterceptor, grpc.StreamStreamClientInterceptor):
+    # client side: attaches the session token to every call on the channel
+    def __init__(self, token):
+        self.token = token
+
+    def _with_token(self, details):
+        metadata = list(details.metadata or ())
+        metadata.append((TOKEN_METADATA_KEY, self.token))
+        return _ClientCallDetails(details, metadata)
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return continuation(self._with_token(client_call_details), request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return continuation(self._with_token(client_call_details), request)
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return continuation(self._with_token(client_call_details), request_iterator)
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        return continuation(self._with_token(client_call_details), request_iterator)
@@ -0,0 +1,440 @@
+import errno
+import heapq
+import itertools
+import queue
+import threading
+import zlib
+
+import grpc
+
+import users_pb2
+from channels import StubPool
+from handles import HANDLE_ID_BITS
+from sessions import TokenInterceptor
+
+# a sharded client's handle is the server's handle with the shard's number in
+# the bits above HANDLE_ID_BITS, which leaves room for this many shards below
+# the client's own local handles
+MAX_SHARDS = 1 << (63 - HANDLE_ID_BITS)
+HANDLE_MASK = (1 << HANDLE_ID_BITS) - 1
+# entries per reply of a displayTree listing merged from several shards
+TREE_PAGE_SIZE = 256
+# a sharded session token is the shards' own tokens joined by this
+TOKEN_SEPARATOR = ","
+
+# request fields holding absolute paths, which say which shard a request is
+# for and are rewritten to that shard's export root
+PATH_FIELDS = {
+    "AccessRequest": ("path",),
+    "ChmodRequest": ("path",),
+    "ChownRequest": ("path",),
+    "GetAttrRequest": ("path",),
+    "ReadDirRequest": ("path",),
+    "ReadDirPlusRequest": ("path",),
+    "RmDirRequest": ("path",),
+    "MkDirRequest": ("path",),
+    "StatRequest": ("path",),
+    "UnlinkRequest": ("path",),
+    "UtimeNsRequest": ("path",),
+    "SymlinkRequest": ("name",),
+    "RenameRequest": ("oldPath", "newPath"),
+    "LinkRequest": ("name", "target"),
+    "ReadLinkRequest": ("path",),
+    "MkNodRequest": ("path",),
+    "OpenRequest": ("path",),
+    "CreateRequest": ("path",),
+    "TruncateRequest": ("path",),
+    "ChunkQueryRequest": ("path",),
+    "WatchRequest": ("path",),
+}
+# request fields holding handles, which carry their shard
+HANDLE_FIELDS = {
+    "GetAttrRequest": ("fh",),
+    "ReadDirRequest": ("fh",),
+    "FlockRequest": ("fileDescriptor",),
+    "ReadRequest": ("fh",),
+    "WriteRequest": ("fh",),
+    "FlushRequest": ("fh",),
+    "ReleaseRequest": ("fh",),
+    "TruncateRequest": ("fh",),
+    "FallocateRequest": ("fh",),
+    "CopyRangeRequest": ("fhIn", "fhOut"),
+    "ChunkWriteRequest": ("fh",),
+}
+# statfs counts that add up across shards, in blocks or inodes
+STATVFS_BLOCK_FIELDS = ("f_blocks", "f_bfree", "f_bavail")
+STATVFS_FILE_FIELDS = ("f_files", "f_ffree", "f_favail")
+
+
+def shardOf(name, count):
+    # the shard owning the top-level entry `name`
+    return zlib.crc32(name.encode("utf-8", "surrogateescape")) % count
+
+
+class ShardedStub(object):
+    """A drop-in replacement for UsersStub over a namespace split across servers.
+
+    Every top-level entry of the namespace, and everything below it, lives on
+    the shard its name hashes to, so any path names its shard. Handles name
+    theirs too, in the bits above the server's own handle ID. Requests are
+    sent to their shard with paths moved from `root` to that server's export
+    root. Calls on the root directory itself go to every shard and their
+    replies are merged, as are displayTree listings of the whole export and
+    the watch stream. A rename or link between shards fails with EXDEV, which
+    `mv` and the kernel answer by copying.
+
+    Account calls go to every shard. After logging in on each, the session
+    token is their tokens joined by TOKEN_SEPARATOR, and update/delete calls
+    carrying it are sent to each shard with its own.
+    """
+
+    def __init__(self, stubs, roots, root, addresses=()):
+        if len(stubs) > MAX_SHARDS:
+            raise ValueError("at most %d shards are supported" % MAX_SHARDS)
+        self.stubs = stubs
+        self.roots = [r.rstrip("/") for r in roots]
+        self.root = root.rstrip("/")
+        self.addresses = list(addresses)
+        self._methods = dict((m.name, m) for m in users_pb2.DESCRIPTOR.services_by_name['Users'].methods)
+
+    @classmethod
+    def connect(cls, addresses, root, token=None, interceptors=()):
+        # pooled channels to every shard, each carrying that shard's token
+        tokens = token.split(TOKEN_SEPARATOR) if token else [None] * len(addresses)
+        if len(tokens) != len(addresses):
+            raise ValueError("the token has %d parts for %d shards" % (len(tokens), len(addresses)))
+        pools = []
+        for address, shard_token in zip(addresses, tokens):
+            extra = [TokenInterceptor(shard_token)] if shard_token else []
+            pools.append(StubPool(address, interceptors=list(interceptors) + extra))
+        roots = [pool.getShards(users_pb2.ShardsRequest()).root for pool in pools]
+        return cls(pools, roots, root, addresses)
+
+    def close(self):
+        for stub in self.stubs:
+            stub.close()
+
+    def __getattr__(self, name):
+        method = self.__dict__.get("_methods", {}).get(name)
+        if method is None:
+            raise AttributeError(name)
+        if method.client_streaming:
+            return lambda requests, **kwargs: self._streamed(name, requests, **kwargs)
+        return lambda request, **kwargs: self._routed(name, request, **kwargs)
+
+    # Routing
+    # =======
+
+    def shard_of(self, path):
+        # the shard owning an absolute path, None for the root and for paths
+        # outside it
+        if not path.startswith(self.root + "/"):
+            return None
+        return shardOf(path[len(self.root) + 1:].split("/", 1)[0], len(self.stubs))
+
+    def _owns(self, shard, name):
+        return shardOf(name, len(self.stubs)) == shard
+
+    def _move(self, path, old, new):
+        if path == old or path.startswith(old + "/"):
+            return new + path[len(old):]
+        return path
+
+    def _targets(self, message, shards):
+        name = message.DESCRIPTOR.name
+        for field in HANDLE_FIELDS.get(name, ()):
+            fh = getattr(message, field)
+            if fh:
+                shards.add(fh >> HANDLE_ID_BITS)
+        for field in PATH_FIELDS.get(name, ()):
+            shard = self.shard_of(getattr(message, field))
+            if shard is not None:
+                shards.add(shard)
+        return shards
+
+    def _request(self, message, shard):
+        # a copy of the request as `shard` expects it
+        out = type(message)()
+        out.CopyFrom(message)
+        name = message.DESCRIPTOR.name
+        for field in HANDLE_FIELDS.get(name, ()):
+            setattr(out, field, getattr(out, field) & HANDLE_MASK)
+        for field in PATH_FIELDS.get(name, ()):
+            setattr(out, field, self._move(getattr(out, field), self.root, self.roots[shard]))
+        return out
+
+    def _reply(self, reply, shard):
+        # translates a shard's reply back into the client's namespace, in place
+        name = reply.DESCRIPTOR.name
+        if name == "OpenReply" and reply.fh:
+            reply.fh |= shard << HANDLE_ID_BITS
+        elif name == "CompoundReply":
+            for result in reply.results:
+                if result.WhichOneof("result") == "open" and result.open.fh:
+                    result.open.fh |= shard << HANDLE_ID_BITS
+        elif name == "ReadLinkReply":
+            reply.target = self._move(reply.target, self.roots[shard], self.root)
+        elif name == "ChangeEvent":
+            reply.path = self._move(reply.path, self.roots[shard], self.root)
+            reply.newPath = self._move(reply.newPath, self.roots[shard], self.root)
+        return reply
+
+    def _error(self, name, err):
+        reply = getattr(users_pb2, self._methods[name].output_type.name)(err=err)
+        return iter([reply]) if self._methods[name].server_streaming else reply
+
+    def _routed(self, name, request, **kwargs):
+        special = getattr(self, "_" + name, None)
+        shards = self._targets(request, set())
+        if special is not None and (not shards or name == "watch"):
+            return special(request, **kwargs)
+        if len(shards) > 1:
+            return self._error(name, errno.EXDEV)
+        shard = shards.pop() if shards else 0
+
+        reply = getattr(self.stubs[shard], name)(self._request(request, shard), **kwargs)
+        if self._methods[name].server_streaming:
+            return (self._reply(r, shard) for r in reply)
+        return self._reply(reply, shard)
+
+    def _streamed(self, name, requests, **kwargs):
+        # client-streaming calls go where their first request's handle says
+        requests = iter(requests)
+        head = next(requests, None)
+        shards = self._targets(head, set()) if head is not None else set()
+        shard = shards.pop() if len(shards) == 1 else 0
+        stream = (self._request(r, shard) for r in itertools.chain([head] if head is not None else [], requests))
+        return self._reply(getattr(self.stubs[shard], name)(stream, **kwargs), shard)
+
+    def _broadcast(self, name, request, **kwargs):
+        return [getattr(stub, name)(self._request(request, shard), **kwargs)
+            for shard, stub in enumerate(self.stubs)]
+
+    # The root directory
+    # ==================
+
+    def _compound(self, request, **kwargs):
+        # every operation must be for the same shard
+        shards = set()
+        for op in request.ops:
+            self._targets(getattr(op, op.WhichOneof("op")), shards)
+        if len(shards) > 1:
+            return users_pb2.CompoundReply(err=errno.EXDEV)
+        shard = shards.pop() if shards else 0
+        ops = []
+        for op in request.ops:
+            name = op.WhichOneof("op")
+            ops.append(users_pb2.CompoundOp(**{name: self._request(getattr(op, name), shard)}))
+        reply = self.stubs[shard].compound(users_pb2.CompoundRequest(ops=ops), **kwargs)
+        return self._reply(reply, shard)
+
+    def _fsReadDir(self, request, **kwargs):
+        names = ['.', '..']
+        for shard, reply in enumerate(self._broadcast("fsReadDir", request, **kwargs)):
+            if reply.err:
+                return reply
+            # an entry some other shard owns was not made through the client
+            names.extend(n for n in reply.names if n not in ('.', '..') and self._owns(shard, n))
+        return users_pb2.ReadDirReply(names=names)
+
+    def _fsReadDirPlus(self, request, **kwargs):
+        # the shards are listed one after the other, so the cursors of a
+        # merged listing cannot resume it
+        for shard, stub in enumerate(self.stubs):
+            for page in stub.fsReadDirPlus(self._request(request, shard), **kwargs):
+                if page.err:
+                    yield page
+                    return
+                entries = [entry for entry in page.entries if self._owns(shard, entry.name)]
+                if entries:
+                    yield users_pb2.ReadDirPlusReply(entries=entries)
+
+    def _fsStat(self, request, **kwargs):
+        replies = self._broadcast("fsStat", request, **kwargs)
+        first = replies[0]
+        for reply in replies:
+            if reply.err:
+                return reply
+        for reply in replies[1:]:
+            for field in STATVFS_BLOCK_FIELDS:
+                setattr(first, field, getattr(first, field) + getattr(reply, field) * reply.f_frsize // first.f_frsize)
+            for field in STATVFS_FILE_FIELDS:
+                setattr(first, field, getattr(first, field) + getattr(reply, field))
+        return first
+
+    def _fsGetAttr(self, request, **kwargs):
+        # the root exists on every shard: its times are the latest of them,
+        # and its links are "." and ".." plus every shard's subdirectories
+        if request.path.rstrip("/") != self.root:
+            return self.stubs[0].fsGetAttr(self._request(request, 0), **kwargs)
+        replies = self._broadcast("fsGetAttr", request, **kwargs)
+        first = replies[0]
+        for reply in replies:
+            if reply.err:
+                return reply
+        for reply in replies[1:]:
+            for field in ("st_atime", "st_mtime", "st_ctime"):
+                setattr(first.attr, field, max(getattr(first.attr, field), getattr(reply.attr, field)))
+            first.attr.st_nlink += max(reply.attr.st_nlink - 2, 0)
+        return first
+
+    def _setattr(self, name, request, **kwargs):
+        # the root's attributes are kept the same on every shard
+        replies = self._broadcast(name, request, **kwargs)
+        return next((reply for reply in replies if reply.err), replies[0])
+
+    def _fsChmod(self, request, **kwargs):
+        return self._setattr("fsChmod", request, **kwargs)
+
+    def _fsChown(self, request, **kwargs):
+        return self._setattr("fsChown", request, **kwargs)
+
+    def _fsUtimens(self, request, **kwargs):
+        return self._setattr("fsUtimens", request, **kwargs)
+
+    def _watch(self, request, **kwargs):
+        # a stream that can be cancelled, like a plain call, even from one shard
+        shards = self._targets(request, set()) or range(len(self.stubs))
+        calls = [(shard, self.stubs[shard].watch(self._request(request, shard), **kwargs)) for shard in shards]
+        return MergedStream(calls, self._reply)
+
+    def _displayTree(self, request, **kwargs):
+        top = request.path.strip('/').split('/', 1)[0]
+        if top:
+            yield from self.stubs[shardOf(top, len(self.stubs))].displayTree(request, **kwargs)
+            return
+
+        # every shard lists its own part in order; where one stopped early,
+        # the merged listing stops too
+        listings, cut = [], None
+        for shard, stub in enumerate(self.stubs):
+            entries = []
+            for reply in stub.displayTree(request, **kwargs):
+                if reply.err:
+                    yield reply
+                    return
+                entries.extend((tuple(entry.path.split('/')), entry) for entry in reply.entries
+                    if self._owns(shard, entry.path.split('/', 1)[0]))
+                if reply.cursor:
+                    stop = tuple(reply.cursor.split('/'))
+                    cut = stop if cut is None else min(cut, stop)
+            listings.append(entries)
+
+        merged = [(parts, entry) for parts, entry in heapq.merge(*listings, key=lambda item: item[0])
+            if cut is None or parts <= cut]
+        for start in range(0, len(merged), TREE_PAGE_SIZE):
+            yield users_pb2.DisplayTreeReply(entries=[entry for _, entry in merged[start:start + TREE_PAGE_SIZE]])
+        if cut is not None:
+            yield users_pb2.DisplayTreeReply(cursor='/'.join(merged[-1][0] if merged else cut))
+        elif not merged:
+            yield users_pb2.DisplayTreeReply()
+
+    def _getStats(self, request, **kwargs):
+        replies = self._broadcast("getStats", request, **kwargs)
+        merged = users_pb2.StatsReply(bucketBounds=replies[0].bucketBounds, uptime=max(r.uptime for r in replies))
+        methods = {}
+        for reply in replies:
+            for method in reply.methods:
+                total = methods.get(method.name)
+                if total is None:
+                    total = methods[method.name] = merged.methods.add(name=method.name,
+                        buckets=[0] * len(method.buckets))
+                total.calls += method.calls
+                total.errors += method.errors
+                total.errnos += method.errnos
+                total.bytesIn += method.bytesIn
+                total.bytesOut += method.bytesOut
+                total.seconds += method.seconds
+                for i, count in enumerate(method.buckets):
+                    total.buckets[i] += count
+            for field, value in reply.compression.ListFields():
+                setattr(merged.compression, field.name, getattr(merged.compression, field.name) + value)
+        return merged
+
+    def _negotiateCodecs(self, request, **kwargs):
+        # only codecs every shard can use, as a handle may be on any of them
+        replies = self._broadcast("negotiateCodecs", request, **kwargs)
+        return users_pb2.CodecsReply(codecs=[codec for codec in request.codecs
+            if all(codec in reply.codecs for reply in replies)])
+
+    # Accounts
+    # ========
+
+    def _createUserAccount(self, request, **kwargs):
+        replies = self._broadcast("createUserAccount", request, **kwargs)
+        return next((reply for reply in replies if not reply.success), replies[0])
+
+    def _loginUserAccount(self, request, **kwargs):
+        replies = self._broadcast("loginUserAccount", request, **kwargs)
+        if not all(reply.success for reply in replies):
+            return users_pb2.LoginUserReply(success=False)
+        return users_pb2.LoginUserReply(success=True,
+            token=TOKEN_SEPARATOR.join(reply.token for reply in replies))
+
+    def _keepAlive(self, request, **kwargs):
+        # each shard keeps its own session
+        replies = self._broadcast("keepAlive", request, **kwargs)
+        return users_pb2.KeepAliveReply(ttl=min(reply.ttl for reply in replies))
+
+    def _perShardToken(self, name, request, **kwargs):
+        tokens = request.token.split(TOKEN_SEPARATOR)
+        replies = []
+        for shard, stub in enumerate(self.stubs):
+            shard_request = type(request)()
+            shard_request.CopyFrom(request)
+            shard_request.token = tokens[shard] if len(tokens) == len(self.stubs) else ''
+            replies.append(getattr(stub, name)(shard_request, **kwargs))
+        return replies
+
+    def _updateUserAccount(self, request, **kwargs):
+        replies = self._perShardToken("updateUserAccount", request, **kwargs)
+        return next((reply for reply in replies if reply.code != grpc.StatusCode.OK.value[0]), replies[0])
+
+    def _deleteUserAccount(self, request, **kwargs):
+        replies = self._perShardToken("deleteUserAccount", request, **kwargs)
+        return next((reply for reply in replies if not reply.success), replies[0])
+
+
+class MergedStream(object):
+    """The replies of several server-streaming calls, in the order they arrive.
+
+    Ends, or raises the first call's error, as soon as any one of the calls
+    does, after cancelling the rest. `cancel()` cancels them all.
+    """
+
+    def __init__(self, calls, translate):
+        # calls are (shard, call) pairs; replies pass through translate(reply, shard)
+        self.calls = [call for _, call in calls]
+        self.translate = translate
+        self._queue = queue.Queue()
+        self._done = False
+        for shard, call in calls:
+            threading.Thread(target=self._pump, args=(shard, call), name="watch-%d" % shard, daemon=True).start()
+
+    def _pump(self, shard, call):
+        try:
+            for reply in call:
+                self._queue.put((shard, reply, None))
+        except grpc.RpcError as e:
+            self._queue.put((shard, None, e))
+            return
+        self._queue.put((shard, None, None))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        shard, reply, error = self._queue.get()
+        if reply is not None:
+            return self.translate(reply, shard)
+        self._done = True
+        self.cancel()
+        if error is not None:
+            raise error
+        raise StopIteration
+
+    def cancel(self):
+        for call in self.calls:
+            call.cancel()
@@ -0,0 +1,73 @@
+# Servers and clients for the tests, all in this process.
+#
+# Run from the repository root after ./compile.sh:
+#   python -m unittest discover tests
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+
+import grpc
+
+import user_server
+import users_pb2_grpc
+from sessions import SessionManager, TokenInterceptor
+
+
+def startServer(aio=False, workers=None, sessions=None, handles=None, max_watchers=None):
+    # returns (address, export directory, sessions, stop function); the user
+    # store is created in a temporary working directory. max_watchers only
+    # applies to the thread-pool server
+    workdir = tempfile.mkdtemp()
+    export = os.path.join(workdir, 'export')
+    os.makedirs(export)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    sessions = sessions if sessions is not None else SessionManager()
+    if aio:
+        workers = workers or user_server.AIO_EXECUTOR_WORKERS
+        started = threading.Event()
+        state = {}
+
+        def run():
+            async def main():
+                state['loop'] = asyncio.get_running_loop()
+                state['stopping'] = asyncio.Event()
+                server, state['port'] = user_server.createAioServer('127.0.0.1:0', workers, sessions,
+                    handles=handles, root=export)
+                await server.start()
+                started.set()
+                # stopped from here, so asyncio.run cannot cancel the stop
+                await state['stopping'].wait()
+                await server.stop(None)
+            asyncio.run(main())
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        started.wait()
+        port = state['port']
+
+        def shutdown():
+            state['loop'].call_soon_threadsafe(state['stopping'].set)
+            thread.join()
+    else:
+        workers = workers or user_server.SERVER_WORKERS
+        server, port = user_server.createServer('127.0.0.1:0', workers, sessions, handles=handles, root=export,
+            max_watchers=max_watchers)
+        server.start()
+
+        def shutdown():
+            server.stop(None)
+    os.chdir(cwd)
+
+    def stop():
+        shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return '127.0.0.1:%d' % port, export, sessions, stop
+
+def connect(address, token):
+    # (stub sending `token` with every call, its channel)
+    channel = grpc.insecure_channel(address)
+    return users_pb2_grpc.UsersStub(grpc.intercept_channel(channel, TokenInterceptor(token))), channel
@@ -0,0 +1,108 @@
+import os
+import threading
+import unittest
+
+from cache import BlockCache
+from passthrough import BLOCK_SIZE, Passthrough
+from tests.support import connect, startServer
+
+BLOCK = 4
+
+
+class WriteBackTest(unittest.TestCase):
+    # dirty blocks evicted from the cache are written back without its lock
+
+    def setUp(self):
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.written = []
+        self.fail = False
+        self.cache = BlockCache(2 * BLOCK, BLOCK, writer=self.writer)
+
+    def writer(self, path, index, data, owner):
+        self.writing.set()
+        self.release.wait(5)
+        if self.fail:
+            raise OSError('server unreachable')
+        self.written.append((path, index, data, owner))
+
+    def evict_in_background(self):
+        # dirties a block, then pushes it out from another thread, whose
+        # write-back stays blocked until self.release is set
+        self.cache.write('/dirty', 0, b'abcd', owner=1)
+        thread = threading.Thread(target=self.cache.put, args=('/other', 0, b'x' * 2 * BLOCK))
+        thread.start()
+        self.assertTrue(self.writing.wait(5))
+        return thread
+
+    def test_other_threads_are_not_blocked(self):
+        thread = self.evict_in_background()
+        self.cache.put('/clean', 0, b'efgh')
+        self.assertEqual(bytes(self.cache.get('/clean', 0)), b'efgh')
+        # the block being written back is still readable
+        self.assertEqual(bytes(self.cache.get('/dirty', 0)), b'abcd')
+        self.release.set()
+        thread.join()
+        self.assertEqual(self.written, [('/dirty', 0, b'abcd', 1)])
+        self.assertEqual(self.cache.take_dirty(1), [])
+
+    def test_flush_waits_for_write_back(self):
+        thread = self.evict_in_background()
+        taken = []
+        flusher = threading.Thread(target=lambda: taken.append(self.cache.take_dirty(1)))
+        flusher.start()
+        flusher.join(0.2)
+        self.assertTrue(flusher.is_alive())
+        self.release.set()
+        flusher.join(5)
+        thread.join()
+        self.assertEqual(taken, [[]])
+        self.assertEqual(len(self.written), 1)
+
+    def test_failed_write_back_stays_dirty(self):
+        self.fail = True
+        thread = self.evict_in_background()
+        self.release.set()
+        thread.join()
+        self.assertEqual(self.written, [])
+        self.assertEqual(self.cache.take_dirty(1), [('/dirty', 0, b'abcd')])
+
+    def test_partly_covered_block_must_be_cached(self):
+        self.assertFalse(self.cache.write('/file', 2, b'xy', owner=1))
+        self.assertEqual(self.cache.take_dirty(1), [])
+        self.cache.put('/file', 0, b'abcd')
+        self.assertTrue(self.cache.write('/file', 2, b'xy', owner=1))
+        self.assertEqual(self.cache.take_dirty(1), [('/file', 0, b'abxy')])
+
+
+class EvictingWritersTest(unittest.TestCase):
+    # files written back through a block cache too small for all of them
+
+    def test_concurrent_writers(self):
+        address, export, sessions, stop = startServer()
+        self.addCleanup(stop)
+        stub, channel = connect(address, sessions.create('user'))
+        self.addCleanup(channel.close)
+        fs = Passthrough(export, stub, watch=False, write_back=True, block_cache=4 * BLOCK_SIZE, dedup=0)
+        written = {}
+
+        def writer(path):
+            data = os.urandom(8 * BLOCK_SIZE + 123)
+            with open(export + path, 'wb') as f:
+                f.write(bytes(len(data)))
+            fh = fs('open', path, os.O_RDWR)
+            # unaligned writes, each partly covering a block
+            for offset in range(0, len(data), 5000):
+                fs('write', path, data[offset:offset + 5000], offset, fh)
+            fs('release', path, fh)
+            written[path] = data
+
+        threads = [threading.Thread(target=writer, args=('/file%d' % i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(written), 4)
+        for path, data in written.items():
+            with open(export + path, 'rb') as f:
+                self.assertTrue(f.read() == data, path)
@@ -0,0 +1,37 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import users_pb2
+from chunks import chunkHash, iterChunks
+from tests.support import connect, startServer
+
+
+class ChunkQueryTest(unittest.TestCase):
+    # chunkQuery indexes files below the root only
+
+    def setUp(self):
+        address, self.export, sessions, stop = startServer()
+        self.addCleanup(stop)
+        self.stub, channel = connect(address, sessions.create('user'))
+        self.addCleanup(channel.close)
+        self.data = os.urandom(1024 * 1024)
+        self.hashes = [chunkHash(chunk) for chunk in iterChunks(io.BytesIO(self.data).read)]
+
+    def query(self, name):
+        return self.stub.chunkQuery(users_pb2.ChunkQueryRequest(path=self.export + '/' + name, hashes=self.hashes))
+
+    def test_file_in_export_is_indexed(self):
+        with open(self.export + '/inside', 'wb') as f:
+            f.write(self.data)
+        self.assertEqual(list(self.query('inside').missing), [])
+
+    def test_symlink_out_of_export_is_not_followed(self):
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside)
+        with open(outside + '/secret', 'wb') as f:
+            f.write(self.data)
+        os.symlink(outside + '/secret', self.export + '/link')
+        self.assertEqual(list(self.query('link').missing), list(range(len(self.hashes))))
@@ -0,0 +1,69 @@
+import errno
+import os
+import unittest
+
+from fuse import FuseOSError
+
+import users_pb2
+from passthrough import Passthrough
+from tests.support import connect, startServer
+
+
+class ListingErrorsTest(unittest.TestCase):
+    # directories that cannot be listed fail with their errno and are not
+    # cached as empty
+
+    def setUp(self):
+        address, self.export, sessions, stop = startServer()
+        self.addCleanup(stop)
+        stub, channel = connect(address, sessions.create('user'))
+        self.addCleanup(channel.close)
+        self.fs = Passthrough(self.export, stub, watch=False)
+        with open(self.export + '/file', 'w') as f:
+            f.write('data')
+
+    def assertFails(self, err, op, *args):
+        with self.assertRaises(FuseOSError) as raised:
+            self.fs(op, *args)
+        self.assertEqual(raised.exception.errno, err)
+
+    def test_missing_directory(self):
+        self.assertFails(errno.ENOENT, 'readdir', '/missing', 0)
+        os.mkdir(self.export + '/missing')
+        self.assertEqual(self.fs('readdir', '/missing', 0), ['.', '..'])
+
+    def test_not_a_directory(self):
+        self.assertFails(errno.ENOTDIR, 'readdir', '/file', 0)
+
+    @unittest.skipIf(os.geteuid() == 0, 'root can list any directory')
+    def test_unreadable_directory(self):
+        os.mkdir(self.export + '/locked', 0)
+        self.addCleanup(os.chmod, self.export + '/locked', 0o755)
+        self.assertFails(errno.EACCES, 'readdir', '/locked', 0)
+
+
+class ErrnoRepliesTest(unittest.TestCase):
+    # fsReadDir and fsAccess answer with the errno of what went wrong
+
+    def setUp(self):
+        address, self.export, sessions, stop = startServer()
+        self.addCleanup(stop)
+        self.stub, channel = connect(address, sessions.create('user'))
+        self.addCleanup(channel.close)
+
+    def test_readdir_of_missing_directory(self):
+        reply = self.stub.fsReadDir(users_pb2.ReadDirRequest(path=self.export + '/missing'))
+        self.assertEqual(reply.err, errno.ENOENT)
+        self.assertEqual(list(reply.names), [])
+
+    def test_access_of_missing_path(self):
+        reply = self.stub.fsAccess(users_pb2.AccessRequest(path=self.export + '/missing', mode=os.R_OK))
+        self.assertEqual(reply.err, errno.ENOENT)
+        fs = Passthrough(self.export, self.stub, watch=False)
+        with self.assertRaises(FuseOSError) as raised:
+            fs('access', '/missing', os.R_OK)
+        self.assertEqual(raised.exception.errno, errno.ENOENT)
+
+
+if __name__ == '__main__':
+    unittest.main()
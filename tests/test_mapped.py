@@ -0,0 +1,73 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import unittest
+
+# run in a child process, since the bug kills its process with SIGBUS: reads
+# of a mapped file whose replies are only serialized after the file has been
+# truncated, first one at a time and then from threads racing truncates
+CHILD = textwrap.dedent('''
+    import os, sys, tempfile, threading
+    sys.path.insert(0, sys.argv[1])
+    os.chdir(tempfile.mkdtemp())
+    import user_server, users_pb2
+    from mapped import MMAP_MIN_SIZE
+
+    root = os.getcwd()
+    path = root + '/big'
+    size = 2 * MMAP_MIN_SIZE
+    with open(path, 'wb') as f:
+        f.truncate(size)
+    users = user_server.Users(root=root)
+
+    def open_file():
+        return users.fileOpen(users_pb2.OpenRequest(path=path, flags=os.O_RDWR), None).fh
+
+    def read(fh):
+        return users.fileRead(users_pb2.ReadRequest(fh=fh, length=MMAP_MIN_SIZE, offset=MMAP_MIN_SIZE), None)
+
+    def truncate(fh, length):
+        users.fileTruncate(users_pb2.TruncateRequest(fh=fh, length=length), None)
+
+    fh = open_file()
+    reply = read(fh)
+    truncate(fh, 0)
+    assert len(reply.SerializeToString()) > MMAP_MIN_SIZE
+    truncate(fh, size)
+    reply = read(fh)
+    users._truncate(path, 0)
+    reply.SerializeToString()
+    os.truncate(path, size)
+    reply = read(fh)
+    users.fileRelease(users_pb2.ReleaseRequest(fh=open_file()), None)
+    truncating = users.fileOpen(users_pb2.OpenRequest(path=path, flags=os.O_WRONLY | os.O_TRUNC), None)
+    assert not truncating.err and os.path.getsize(path) == 0
+    reply.SerializeToString()
+
+    done = threading.Event()
+    def reader():
+        while not done.is_set():
+            read(fh).SerializeToString()
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(200):
+        truncate(fh, size)
+        truncate(fh, 0)
+    done.set()
+    for thread in threads:
+        thread.join()
+''')
+
+
+class MappedReadTest(unittest.TestCase):
+    # a file shrinking through the server while a read of its mapping is in
+    # flight does not crash the server
+
+    def test_truncate_during_read(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        child = subprocess.run([sys.executable, '-c', CHILD, root], capture_output=True, timeout=120)
+        self.assertNotEqual(child.returncode, -signal.SIGBUS, 'the server process died with SIGBUS')
+        self.assertEqual(child.returncode, 0, child.stderr.decode(errors='replace'))
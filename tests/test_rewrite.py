@@ -0,0 +1,46 @@
+import os
+import threading
+import unittest
+
+from fileio import OpenFile
+from passthrough import Passthrough
+from tests.support import connect, startServer
+
+FLUSHERS = 8
+
+
+class RewriteTest(unittest.TestCase):
+    # a file truncated on open and rewritten keeps what was written, however
+    # many threads flush its handle at once
+
+    def test_pending_truncate_is_taken_once(self):
+        of = OpenFile('/file')
+        of.start_rewrite(truncate_pending=True)
+        self.assertTrue(of.spool_write(0, b'data', 1024))
+        spool, size, truncate_pending = of.take_spool()
+        spool.close()
+        self.assertEqual((size, truncate_pending), (4, True))
+        self.assertEqual(of.take_spool(), (None, 0, False))
+
+    def test_concurrent_flushes(self):
+        address, export, sessions, stop = startServer()
+        self.addCleanup(stop)
+        stub, channel = connect(address, sessions.create('user'))
+        self.addCleanup(channel.close)
+        fs = Passthrough(export, stub, watch=False)
+        with open(export + '/file', 'wb') as f:
+            f.write(b'old' * 1000)
+
+        data = os.urandom(64 * 1024)
+        for _ in range(20):
+            fh = fs('open', '/file', os.O_WRONLY)
+            fs('truncate', '/file', 0, fh)
+            fs('write', '/file', data, 0, fh)
+            flushers = [threading.Thread(target=fs, args=('flush', '/file', fh)) for _ in range(FLUSHERS)]
+            for thread in flushers:
+                thread.start()
+            for thread in flushers:
+                thread.join()
+            fs('release', '/file', fh)
+            with open(export + '/file', 'rb') as f:
+                self.assertEqual(f.read(), data)
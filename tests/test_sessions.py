@@ -0,0 +1,68 @@
+import errno
+import os
+import time
+import unittest
+
+from fuse import FuseOSError
+
+from handles import HandleTable
+from passthrough import Passthrough
+from sessions import SessionManager
+from tests.support import connect, startServer
+
+TTL = 2
+
+
+class IdleMountTest(unittest.TestCase):
+    # a mount outlives the server's session TTL without calls
+
+    def setUp(self):
+        self.handles = HandleTable()
+        self.address, self.export, self.sessions, stop = startServer(sessions=SessionManager(ttl=TTL),
+            handles=self.handles)
+        self.addCleanup(stop)
+        with open(self.export + '/file', 'wb') as f:
+            f.write(b'contents')
+
+    def mount(self, mounted):
+        stub, channel = connect(self.address, self.sessions.create('user'))
+        self.addCleanup(channel.close)
+        fs = Passthrough(self.export, stub, cache_ttl=0, block_cache=0, small_file=0, watch=False)
+        if mounted:
+            fs.init('/')
+            self.addCleanup(fs.destroy, '/')
+        return fs
+
+    def test_idle_mount_keeps_working(self):
+        fs = self.mount(mounted=True)
+        fh = fs('open', '/file', os.O_RDONLY)
+        time.sleep(2 * TTL)
+        self.sessions.sweep()
+        self.assertEqual(fs('getattr', '/file')['st_size'], 8)
+        self.assertEqual(fs('read', '/file', 8, 0, fh), b'contents')
+        fs('release', '/file', fh)
+
+    def test_expired_session_is_eacces(self):
+        # without init() nothing refreshes the session
+        fs = self.mount(mounted=False)
+        fs('getattr', '/file')
+        time.sleep(TTL + 1)
+        with self.assertRaises(FuseOSError) as raised:
+            fs('getattr', '/file')
+        self.assertEqual(raised.exception.errno, errno.EACCES)
+
+    def test_expiry_releases_open_files(self):
+        # no refreshes: an open handle does not keep the session alive
+        fs = self.mount(mounted=False)
+        fh = fs('open', '/file', os.O_RDONLY)
+        self.assertEqual(len(self.handles), 1)
+        time.sleep(TTL + 1)
+        self.assertEqual(len(self.sessions.sweep()), 1)
+        self.assertEqual(len(self.handles), 0)
+        with self.assertRaises(FuseOSError) as raised:
+            fs('read', '/file', 8, 0, fh)
+        self.assertEqual(raised.exception.errno, errno.EACCES)
+
+
+if __name__ == '__main__':
+    unittest.main()
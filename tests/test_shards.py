@@ -0,0 +1,47 @@
+import os
+import time
+import unittest
+
+from passthrough import Passthrough
+from shards import TOKEN_SEPARATOR, ShardedStub, shardOf
+from tests.support import startServer
+
+SHARDS = 2
+# the client's name for the root the shards' exports make up
+ROOT = '/sharded'
+
+
+class ShardedRootTest(unittest.TestCase):
+    # the root's attributes are merged from every shard
+
+    def setUp(self):
+        addresses, tokens, self.exports = [], [], []
+        for _ in range(SHARDS):
+            address, export, sessions, stop = startServer()
+            self.addCleanup(stop)
+            addresses.append(address)
+            tokens.append(sessions.create('user'))
+            self.exports.append(export)
+        stub = ShardedStub.connect(addresses, ROOT, TOKEN_SEPARATOR.join(tokens))
+        self.addCleanup(stub.close)
+        self.fs = Passthrough(ROOT, stub, watch=False, cache_ttl=0)
+
+    def owned(self, shard):
+        # a top-level name that `shard` owns
+        return next(name for name in ('dir%d' % i for i in range(100)) if shardOf(name, SHARDS) == shard)
+
+    def test_links_count_every_shards_directories(self):
+        self.assertEqual(self.fs('getattr', '/')['st_nlink'], 2)
+        for shard in range(SHARDS):
+            self.fs('mkdir', '/' + self.owned(shard), 0o755)
+        self.assertEqual(self.fs('getattr', '/')['st_nlink'], 2 + SHARDS)
+
+    def test_times_are_the_latest_shards(self):
+        before = self.fs('getattr', '/')
+        time.sleep(0.05)
+        name = self.owned(SHARDS - 1)
+        self.fs('mkdir', '/' + name, 0o755)
+        self.assertTrue(os.path.isdir(os.path.join(self.exports[SHARDS - 1], name)))
+        after = self.fs('getattr', '/')
+        self.assertGreater(after['st_mtime'], before['st_mtime'])
+        self.assertGreater(after['st_ctime'], before['st_ctime'])
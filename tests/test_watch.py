@@ -0,0 +1,73 @@
+import time
+import unittest
+
+import grpc
+
+import users_pb2
+from passthrough import Passthrough
+from tests.support import connect, startServer
+
+WORKERS = 4
+
+
+class WatchersTest(unittest.TestCase):
+    # mounts watching for changes must not leave the server without threads
+    # for anything else
+
+    def check(self, aio):
+        address, export, sessions, stop = startServer(aio, WORKERS)
+        self.addCleanup(stop)
+        with open(export + '/file', 'w') as f:
+            f.write('data')
+
+        mounts = []
+        for n in range(WORKERS + 2):
+            stub, channel = connect(address, sessions.create('user%d' % n))
+            self.addCleanup(channel.close)
+            fs = Passthrough(export, stub)
+            fs.init('/')
+            self.addCleanup(fs.destroy, '/')
+            mounts.append(fs)
+        # give every watch time to reach the server
+        time.sleep(1)
+
+        stub, channel = connect(address, sessions.create('other'))
+        self.addCleanup(channel.close)
+        reply = stub.fsGetAttr(users_pb2.GetAttrRequest(path=export + '/file'), timeout=5)
+        self.assertEqual(reply.attr.st_size, 4)
+        for fs in mounts:
+            self.assertEqual(fs('getattr', '/file')['st_size'], 4)
+
+    def test_thread_pool_server(self):
+        self.check(aio=False)
+
+    def test_asyncio_server(self):
+        self.check(aio=True)
+
+    def test_configured_limit(self):
+        address, export, sessions, stop = startServer(workers=WORKERS, max_watchers=WORKERS - 1)
+        self.addCleanup(stop)
+        streams = []
+        for n in range(WORKERS - 1):
+            stub, channel = connect(address, sessions.create('user%d' % n))
+            self.addCleanup(channel.close)
+            stream = stub.watch(users_pb2.WatchRequest(path=export))
+            self.addCleanup(stream.cancel)
+            self.assertTrue(next(stream).overflow)
+
+        stub, channel = connect(address, sessions.create('refused'))
+        self.addCleanup(channel.close)
+        fs = Passthrough(export, stub)
+        with self.assertLogs('passthrough', 'WARNING') as logged:
+            fs.init('/')
+            self.addCleanup(fs.destroy, '/')
+            for _ in range(50):
+                if logged.output:
+                    break
+                time.sleep(0.1)
+        self.assertIn(grpc.StatusCode.RESOURCE_EXHAUSTED.name, logged.output[0])
+        self.assertIn('max-watchers', logged.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
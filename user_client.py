@@ -2,6 +2,7 @@ from __future__ import print_function
 
 import getpass
 import logging
+import os
 import sys
 import grpc
 from fuse import FUSE, FuseOSError, Operations
@@ -9,8 +10,25 @@ from fuse import FUSE, FuseOSError, Operations
 import users_pb2
 import users_pb2_grpc
 from passthrough import Passthrough
+from sessions import TokenInterceptor
+from channels import StubPool, openChannel
+from shards import ShardedStub
+from metrics import ClientMetricsInterceptor, Metrics, dumpMetrics, estimatePercentile, startDumping
 
 REMOTE_DIRECTORY = "/home/student/fuse"
+PORT = 10001
+# let FUSE serve the kernel's requests from several threads at once
+MULTITHREADED = True
+# while mounted, per-RPC and per-FUSE-operation metrics are rewritten to this
+# JSON file every metrics.DUMP_INTERVAL seconds; None only logs them at unmount
+METRICS_FILE = None
+
+log = logging.getLogger(__name__)
+
+# the server turns password requests away with RESOURCE_EXHAUSTED when its
+# bcrypt pool is saturated
+def isServerBusy(error):
+    return error.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
 
 # This method registers a new user 
 def registerUser(stub):
@@ -26,7 +44,13 @@ def registerUser(stub):
             continue
 
         # send request
-        response = stub.createUserAccount(users_pb2.CreateUserRequest(username=new_username, password=new_password, confirmation=confirm_password))
+        try:
+            response = stub.createUserAccount(users_pb2.CreateUserRequest(username=new_username, password=new_password, confirmation=confirm_password))
+        except grpc.RpcError as e:
+            if not isServerBusy(e):
+                raise
+            print("\nError: the server is busy, please try again.")
+            continue
         
         if not response.success: 
             print("\nError: the username you have chosen already exists, please choose a different one.")
@@ -56,7 +80,13 @@ def updateUser(stub, username, token):
             print("\nError: your passwords don't match, please try again")
             continue
 
-        response = stub.updateUserAccount(users_pb2.UpdateUserRequest(password=new_password, token=token, username=username))
+        try:
+            response = stub.updateUserAccount(users_pb2.UpdateUserRequest(password=new_password, token=token, username=username))
+        except grpc.RpcError as e:
+            if not isServerBusy(e):
+                raise
+            print("\nError: the server is busy, please try again.")
+            continue
 
         if response.code == grpc.StatusCode.OK.value[0]:
             print("\nPassword updated!")
@@ -75,14 +105,47 @@ def updateUser(stub, username, token):
         # return to userSelection
         return
 
+# prints the export as the server streams it, offering to continue when the
+# listing was cut short
+def showTree(stub, path=''):
+    print(os.path.join(REMOTE_DIRECTORY, path))
+    cursor = ''
+    while True:
+        for reply in stub.displayTree(users_pb2.DisplayTreeRequest(path=path, cursor=cursor)):
+            if reply.err:
+                print('Error:', os.strerror(reply.err))
+                return
+            for entry in reply.entries:
+                name = entry.path.rsplit('/', 1)[-1] + ('/' if entry.isDir else '')
+                print('    ' * entry.path.count('/') + '|-- ' + name)
+            cursor = reply.cursor
+        if not cursor or input('More entries follow, show them? [y/N] ') != 'y':
+            return
+
+# busiest server methods first, with latencies estimated from the histograms
+def showServerStats(stub):
+    reply = stub.getStats(users_pb2.StatsRequest())
+    print('\n- SERVER STATISTICS (last %d seconds) -' % reply.uptime)
+    print('%-20s %10s %8s %8s %10s %10s' % ('method', 'calls', 'errors', 'errnos', 'mean ms', 'p99 ms'))
+    for method in reply.methods:
+        p99 = estimatePercentile(method.buckets, 0.99, reply.bucketBounds) * 1000
+        print('%-20s %10d %8d %8d %10.3f %10.3f' % (method.name, method.calls, method.errors, method.errnos,
+            method.seconds / method.calls * 1000, p99))
+    c = reply.compression
+    print('\npayloads compressed %d, decompressed %d, sent as is %d (small) %d (incompressible)' % (c.compressed,
+        c.decompressed, c.small, c.incompressible))
+    print('%d bytes saved of %d, %.3fs compressing, %.3fs decompressing' % (c.rawBytes - c.wireBytes, c.rawBytes,
+        c.compressSeconds, c.decompressSeconds))
+
 # menu once the user has logged in
-def userSelection(stub, username, token):
+def userSelection(stub, username, token, metrics=None):
     while True:
         operation = input("""
 - YOU ARE LOGGED IN -
     [1] Update Password
     [2] Delete Account
     [3] Mount remote filesystem
+    [4] Show server statistics
     [q] Logout
 
 Please choose an operation: """)
@@ -93,17 +156,27 @@ Please choose an operation: """)
         elif operation == '3':
             # display file structure
             print('\n- FILE STRUCTURE -')
-            reply = stub.displayTree(users_pb2.DisplayTreeRequest())
-            print(reply.tree)
+            showTree(stub)
             
             # input mountpoint
             mountpoint = input('Enter the mountpoint: ')
             print("[ctrl+c] to unmount...")
             
             # mount remote fs
-            FUSE(Passthrough(REMOTE_DIRECTORY, stub), mountpoint, nothreads=True, foreground=True)
+            fs = Passthrough(REMOTE_DIRECTORY, stub)
+            groups = dict(fuse=fs.metrics, rpc=metrics or Metrics())
+            stop_dumping = startDumping(METRICS_FILE, **groups) if METRICS_FILE else None
+            try:
+                FUSE(fs, mountpoint, nothreads=not MULTITHREADED, foreground=True)
+            finally:
+                if stop_dumping is not None:
+                    stop_dumping.set()
+                    dumpMetrics(METRICS_FILE, **groups)
+                log.info("rpc stats: %s", groups["rpc"].snapshot())
             print('\nFilesystem was unmounted...\n')
             continue
+        elif operation == '4':
+            showServerStats(stub)
         elif operation != 'q':
             print('Error: invalid input.')
             continue
@@ -113,12 +186,12 @@ Please choose an operation: """)
         return
 
 # Client sends credentials to server via RPC call 
-# Server compares received credentials with locally stored credentials, and replies with authentication token to client if credentials match. The token must be a 
-# random 64 bit string"
-# Server stores authentication token assigned to user and assigns expiry (arbitrary time)
+# Server compares received credentials with locally stored credentials, and replies with authentication token to client if credentials match. The token is a
+# random 256 bit string
+# Server keeps the token in its session table; it expires after a period without use
 # Server responds with authentication failure if username does not exist, ​or password is invalid
 # the login screen
-def menuSelect(stub):
+def menuSelect(stub, address):
     # User Menu:
     while True:
         operation = input("""
@@ -131,9 +204,27 @@ Please choose an operation: """)
         if operation == "1" :
             username = input("Enter your username: ")
             password = getpass.getpass("Enter your password: ")
-            response = stub.loginUserAccount(users_pb2.LoginUserRequest(username=username, password=password))
+            try:
+                response = stub.loginUserAccount(users_pb2.LoginUserRequest(username=username, password=password))
+            except grpc.RpcError as e:
+                if not isServerBusy(e):
+                    raise
+                print('Error: the server is busy, please try again.')
+                continue
             if response.success:
-                userSelection(stub, username, response.token)
+                # every call made while logged in carries the session token, is
+                # measured, and is spread over a pool of channels
+                metrics = Metrics()
+                if isinstance(stub, ShardedStub):
+                    pool = ShardedStub.connect(stub.addresses, REMOTE_DIRECTORY, response.token,
+                        [ClientMetricsInterceptor(metrics)])
+                else:
+                    interceptors = [ClientMetricsInterceptor(metrics), TokenInterceptor(response.token)]
+                    pool = StubPool(address, interceptors=interceptors)
+                try:
+                    userSelection(pool, username, response.token, metrics)
+                finally:
+                    pool.close()
             else:
                 print('Error: incorrect username/password combo.')
             
@@ -148,9 +239,15 @@ def run():
     ip_address = "localhost"
     if(len(sys.argv) > 1):
         ip_address = sys.argv[1]
-    with grpc.insecure_channel(ip_address+':10001') as channel:
+    address = '%s:%d' % (ip_address, PORT)
+    with openChannel(address) as channel:
         stub = users_pb2_grpc.UsersStub(channel)
-        menuSelect(stub)
+        # a server that shares the namespace with others names them all, and
+        # accounts and files are then reached through every one of them
+        addresses = list(stub.getShards(users_pb2.ShardsRequest()).addresses)
+        if len(addresses) > 1:
+            stub = ShardedStub.connect(addresses, REMOTE_DIRECTORY)
+        menuSelect(stub, address)
         quit()
 
 if __name__ == "__main__":
@@ -1,271 +1,1114 @@
 from concurrent import futures
-from fuse import FuseOSError
+import argparse
+import asyncio
+import bisect
+import contextlib
+import ctypes
+import ctypes.util
+import errno
+import fcntl
 import logging
 import grpc
 import os
+import stat
+import tempfile
 import threading
 
 import users_pb2
 import users_pb2_grpc
+from userstore import openUserStore
+from passwords import HasherBusy, PasswordHasher
+from channels import SERVER_OPTIONS
+from sessions import AsyncAuthInterceptor, AuthInterceptor, SessionManager, sessionToken
+from handles import HandleTable
+from dirfds import DIR_CACHE_SIZE, DIR_FLAGS, DirectoryCache
+from cache import TTLCache
+from events import ChangeFeed, InotifyWatcher
+from chunks import ChunkIndex, chunkHash, fileVersion
+from compress import COMPRESS_MIN_SIZE, Compressor
+from mapped import MMAP_BUDGET, MappedFiles, ReadChunk, serializeReadReply
+from metrics import LATENCY_BUCKETS, AsyncMetricsInterceptor, Metrics, MetricsInterceptor, startDumping
 
-import json
-import bcrypt
 import random
 import string
 import time
-import secrets
 import threading
 
-# how long the token will remain valid in seconds
+# how long after login a token may still be used to change or delete the
+# account, in seconds (sessions themselves expire after sessions.SESSION_TTL idle)
 TOKEN_LIFETIME = 30
-lock = threading.Lock()
+# where user records are persisted: "journal" or "sqlite"
+USER_STORE = "journal"
+PORT = 10001
+# gRPC worker threads in the default mode; in asyncio mode (--aio) handlers
+# run on an executor of AIO_EXECUTOR_WORKERS threads instead
+SERVER_WORKERS = 10
+AIO_EXECUTOR_WORKERS = 32
+# default number of entries per fsReadDirPlus reply
+READDIR_PAGE_SIZE = 1024
+# size of each ReadReply sent by fileReadStream
+READ_STREAM_CHUNK_SIZE = 256 * 1024
+# the directory served (clients send absolute paths below it, and are refused
+# anything outside it); displayTree lists directories below it, and one call
+# returns at most TREE_MAX_ENTRIES entries (plus a cursor to continue) in
+# replies of TREE_PAGE_SIZE entries
+EXPORT_ROOT = "/home/student/fuse"
+TREE_MAX_ENTRIES = 10000
+TREE_PAGE_SIZE = 256
+# complete listings of up to TREE_SNAPSHOT_ENTRIES entries are kept for
+# TREE_SNAPSHOT_TTL seconds, or until an RPC changes the namespace
+TREE_SNAPSHOT_TTL = 5.0
+TREE_SNAPSHOT_ENTRIES = 100000
+TREE_SNAPSHOTS = 16
+# how often an idle watch stream checks that its client is still there
+WATCH_POLL_INTERVAL = 5.0
+# in the thread-pool server a watch stream holds a worker for as long as it
+# is open, so unless --max-watchers says otherwise at most one worker in
+# WATCH_WORKER_SHARE serves watches; more watchers are refused with
+# RESOURCE_EXHAUSTED and their clients cache on short TTLs alone. The asyncio
+# server runs watches on its event loop, unlimited.
+WATCH_WORKER_SHARE = 4
+# operations that add, remove or move names
+NAMESPACE_OPS = ("create", "mknod", "mkdir", "rmdir", "unlink", "symlink", "rename", "link")
+# fileCopyRange falls back to pread/pwrite in pieces this large when the
+# filesystem cannot copy_file_range between the two files
+COPY_CHUNK_SIZE = 1024 * 1024
+# errnos of copy_file_range that mean "not between these files", not failure
+COPY_FALLBACK_ERRNOS = (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP)
+# most operations one compound call may carry
+COMPOUND_MAX_OPS = 64
+# compound operation -> (handler, CompoundResult field of its reply)
+COMPOUND_OPS = {
+    "open": ("fileOpen", "open"),
+    "create": ("fileCreate", "open"),
+    "read": ("fileRead", "read"),
+    "write": ("fileWrite", "write"),
+    "flush": ("fileFlush", "status"),
+    "release": ("fileRelease", "status"),
+    "getattr": ("fsGetAttr", "stat"),
+    "unlink": ("fsUnlink", "status"),
+    "mkdir": ("fsMkDir", "status"),
+    "chmod": ("fsChmod", "status"),
+    "utimens": ("fsUtimens", "status"),
+}
+# compound operations whose fh of 0 means the handle of the last open/create
+COMPOUND_HANDLE_OPS = ("read", "write", "flush", "release")
+
+log = logging.getLogger(__name__)
+
+class LockTable(object):
+    # one lock per key, created on first use and dropped once nobody holds or
+    # waits for it, so the table only grows with the number of busy keys
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def acquire(self, key):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        entry[0].acquire()
+
+    def release(self, key):
+        with self._guard:
+            entry = self._locks[key]
+            entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+# writes to the same file are serialized per inode so unrelated files proceed in
+# parallel, and nothing shrinks a file while a read copies out of its mapping;
+# operations that remove or move names take the namespace lock
+inode_locks = LockTable()
+namespace_lock = threading.Lock()
+
+libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+@contextlib.contextmanager
+def inodeLocked(key):
+    # `key` is a file's (st_dev, st_ino), as in Handle.key
+    inode_locks.acquire(key)
+    try:
+        yield
+    finally:
+        inode_locks.release(key)
+
+def fileKey(fd):
+    st = os.fstat(fd)
+    return (st.st_dev, st.st_ino)
+
+def pwriteLocked(handle, buf, offset):
+    with inodeLocked(handle.key):
+        return os.pwrite(handle.fd, buf, offset)
 
 class Users(users_pb2_grpc.UsersServicer):
+    def __init__(self, store=None, hasher=None, sessions=None, metrics=None, handles=None, changes=None,
+            mapped=None, chunks=None, root=EXPORT_ROOT, shards=(), dirs=None, compressor=None, max_watchers=0):
+        # user records are indexed in memory; the store persists mutations
+        self.store = store if store is not None else openUserStore(USER_STORE)
+        # bcrypt runs on its own bounded pool, away from the gRPC workers
+        self.hasher = hasher if hasher is not None else PasswordHasher()
+        # login tokens live only in memory
+        self.sessions = sessions if sessions is not None else SessionManager()
+        # filled in by the metrics interceptor, read by getStats
+        self.metrics = metrics if metrics is not None else Metrics()
+        # open files are handed out as opaque handles owned by the session
+        self.handles = handles if handles is not None else HandleTable()
+        # large files are read through shared memory mappings
+        self.mapped = mapped if mapped is not None else MappedFiles()
+        # where chunks of recently written files are, for deduplicated writes
+        self.chunks = chunks if chunks is not None else ChunkIndex()
+        self.sessions.on_end(self._sessionEnded)
+        # (directory, depth) -> sorted [(path parts, is_dir)] for displayTree
+        self.tree_snapshots = TTLCache(TREE_SNAPSHOTS, TREE_SNAPSHOT_TTL)
+        self.tree_generation = 0
+        # bumping the generation and clearing the snapshots happen together,
+        # and a listing is only stored if no bump came in between
+        self.tree_lock = threading.Lock()
+        # change events for watching clients
+        self.changes = changes if changes is not None else ChangeFeed()
+        # free watch slots, or None for no limit
+        self.max_watchers = max_watchers
+        self.watch_slots = threading.BoundedSemaphore(max_watchers) if max_watchers else None
+        self.root = root
+        # addresses of every server sharing the namespace, this one included
+        self.shards = list(shards)
+        # paths are resolved relative to cached descriptors of their parent
+        # directories, and only below the root
+        self.dirs = dirs if dirs is not None else DirectoryCache(root)
+        self.handles.opener = self.dirs.open
+        self.chunks.opener = self.dirs.open
+        self.changes.on_publish(self._changed)
+        # fileRead and fileWrite payloads, with the codec each client negotiated
+        self.compressor = compressor if compressor is not None else Compressor()
+
+    def _sessionEnded(self, session):
+        # a live mount's keepAlive stops its session expiring, so one that
+        # did belonged to a client that is gone, and its files are closed
+        self.handles.close_owner(session.token)
+        self.changes.close_owner(session.token)
+
+    def _mutated(self, context, reply, op, path, new_path=""):
+        # called with the reply of every RPC that changes the export; returns
+        # the reply so handlers can end with `return self._mutated(...)`
+        if reply.err:
+            return reply
+        if op in NAMESPACE_OPS:
+            with self.tree_lock:
+                self.tree_generation += 1
+                self.tree_snapshots.clear()
+        if op == "rename":
+            self.chunks.renamed(path, new_path)
+        elif op in ("unlink", "rmdir"):
+            self.chunks.forget(path, subtree=op == "rmdir")
+        self.changes.publish(op, path, new_path, sessionToken(context))
+        return reply
+
+    def _changed(self, op, path, new_path):
+        # also sees changes made behind the server's back, with --inotify
+        if op in ("rename", "rmdir"):
+            self.dirs.forget(path)
+            if new_path:
+                self.dirs.forget(new_path)
+
+    def _hashing(self, context, func, *args):
+        # refuses the request instead of letting it queue when the pool is full
+        try:
+            return func(*args)
+        except HasherBusy:
+            log.warning("password hashing pool full, rejecting %s", func.__name__)
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "too many password operations in progress")
     
     def loginUserAccount(self, request, context):
         username, password = request.username, request.password
 
         # get user from DB
-        try:
-            user = self.fetchUserFromDB(username)
-        except:
+        user = self.store.get(username)
+        if user is None:
             return users_pb2.LoginUserReply(success=False)
 
         stored_hash = user["password"]
-        is_valid_creditials = bcrypt.checkpw(password.encode(), stored_hash.encode())
+        is_valid_creditials = self._hashing(context, self.hasher.check, password, stored_hash)
         
         # invalid password
         if not is_valid_creditials:
             return users_pb2.LoginUserReply(success=False)
 
         # logging in
-        print("valid creds")
-        if not user.get("login_time", False):
-            user["token"] = secrets.token_urlsafe(8)
-            print("first token issued")
-        elif user["login_time"] + TOKEN_LIFETIME < time.time():
-            user["token"] = secrets.token_urlsafe(8)
-            print("token expired, new one issued")
-        
-        user["login_time"] = time.time() + TOKEN_LIFETIME
-        print("login time updated")
-
-        self.saveUserToDB(user, username)
-        
-        return users_pb2.LoginUserReply(success=True, token=user["token"])
+        token = self.sessions.create(username)
+        return users_pb2.LoginUserReply(success=True, token=token)
 
     def updateUserAccount(self, request, context):
         username = request.username
 
-        # checks if db exists and if its empty, returns 404 if not found/empty
-        try:
-            user = self.fetchUserFromDB(username)
-        except:
+        # returns 404 if the user is not found
+        user = self.store.get(username)
+        if user is None:
             return users_pb2.UpdateUserReply(code=grpc.StatusCode.NOT_FOUND.value[0])
 
         # check that token is valid
-        if user.get("token") != request.token:
+        session = self.sessions.validate(request.token)
+        if session is None or session.username != username:
             return users_pb2.UpdateUserReply(code=grpc.StatusCode.UNAUTHENTICATED.value[0])
 
-        # check if token has expired
-        if user.get("login_time", 0) + TOKEN_LIFETIME < time.time():
+        # check if token is too old to change the account
+        if session.created + TOKEN_LIFETIME < time.time():
             return users_pb2.UpdateUserReply(code=grpc.StatusCode.DEADLINE_EXCEEDED.value[0])
         
         # checks to see if new password is the same as old password
         stored_hash = user.get("password")
-        is_same_password = bcrypt.checkpw(request.password.encode(), stored_hash.encode())
+        is_same_password = self._hashing(context, self.hasher.check, request.password, stored_hash)
         if is_same_password:
             return users_pb2.UpdateUserReply(code=grpc.StatusCode.ALREADY_EXISTS.value[0])
 
-        # hashes the new password and invalidates existing token by setting login_time to 0
-        hashed_binary = bcrypt.hashpw(request.password.encode(), bcrypt.gensalt())
-        password = hashed_binary.decode(encoding="utf-8")
-        updatedUser = {"password": password, "login_time": 0}
-
-        #throw the updated account into the temp dictionary
-        self.saveUserToDB(updatedUser, username)
+        # hashes the new password and logs out every session of the user
+        password = self._hashing(context, self.hasher.hash, request.password)
+        self.store.put(username, {"password": password})
+        self.sessions.revoke_user(username)
 
         return users_pb2.UpdateUserReply(code=grpc.StatusCode.OK.value[0])
                 
     def createUserAccount(self, request, context):  
-        # Create a salt and using bcrypt, hash the user's credentials
-        hashed_binary = bcrypt.hashpw(request.password.encode(), bcrypt.gensalt())
-        password = hashed_binary.decode(encoding="utf-8")
         username = request.username
-
-        try:
-            self.fetchUserFromDB(username)
+        # skip the expensive hash when the name is obviously taken
+        if self.store.get(username) is not None:
             return users_pb2.CreateUserReply(success=False)
-        except:
-            # creating account
-            self.saveUserToDB({'password': password}, username)
-            return users_pb2.CreateUserReply(success=True) 
+
+        # Create a salt and using bcrypt, hash the user's credentials
+        password = self._hashing(context, self.hasher.hash, request.password)
+
+        # fails if the username is taken
+        created = self.store.add(username, {'password': password})
+        return users_pb2.CreateUserReply(success=created)
 
     def deleteUserAccount(self, request, context):
         username = request.username
-        try:
-            user = self.fetchUserFromDB(username)
-        except:
-            return users_pb2.DeleteUserReply(success=False)
+        session = self.sessions.validate(request.token)
 
-        if user and user.get("token") == request.token and time.time() < user.get("login_time", 0) + TOKEN_LIFETIME:
-            self.saveUserToDB(None, username)
+        if session and session.username == username and time.time() < session.created + TOKEN_LIFETIME:
+            self.store.delete(username)
+            self.sessions.revoke_user(username)
             return users_pb2.DeleteUserReply(success=True)
         
         return users_pb2.DeleteUserReply(success=False)
 
     def displayTree(self, request, context):
-        
-        tree = os.popen('tree /home/student/fuse').read()
-        return users_pb2.DisplayTreeReply(tree=tree)
+        return compressListing(context, self._displayTree(request, context))
+
+    def _displayTree(self, request, context):
+        root = os.path.realpath(self.root)
+        top = os.path.realpath(os.path.join(root, request.path.lstrip('/')))
+        if top != root and not top.startswith(root + os.sep):
+            yield users_pb2.DisplayTreeReply(err=errno.EACCES)
+            return
+        if not os.path.isdir(top):
+            yield users_pb2.DisplayTreeReply(err=errno.ENOTDIR if os.path.exists(top) else errno.ENOENT)
+            return
+
+        limit = request.maxEntries or TREE_MAX_ENTRIES
+        after = tuple(request.cursor.split('/')) if request.cursor else ()
+        key = (top, request.depth)
+        snapshot = self.tree_snapshots.get(key)
+        building = None
+        if snapshot is not None:
+            entries = iter(snapshot[bisect.bisect_right(snapshot, (after, True)):])
+        else:
+            entries = walkTree(top, request.depth, after)
+            # only a full listing taken while nothing changed is worth keeping
+            if not after:
+                building, generation = [], self.tree_generation
+
+        page, sent, last = [], 0, None
+        for parts, is_dir in entries:
+            if sent == limit:
+                # more entries remain; the client can continue after the last one
+                yield users_pb2.DisplayTreeReply(entries=page, cursor='/'.join(last))
+                return
+            if building is not None and len(building) <= TREE_SNAPSHOT_ENTRIES:
+                building.append((parts, is_dir))
+            page.append(users_pb2.TreeEntry(path='/'.join(parts), isDir=is_dir))
+            sent, last = sent + 1, parts
+            if len(page) >= TREE_PAGE_SIZE:
+                yield users_pb2.DisplayTreeReply(entries=page)
+                page = []
+
+        if building is not None and len(building) <= TREE_SNAPSHOT_ENTRIES:
+            with self.tree_lock:
+                if generation == self.tree_generation:
+                    self.tree_snapshots.put(key, building)
+        if page or not sent:
+            yield users_pb2.DisplayTreeReply(entries=page)
 
     # Filesystem methods
     # ==================
     def fsAccess(self, request, context):
-        if not os.access(request.path, request.mode):
-            return users_pb2.JsonReply(error=True)
-        return users_pb2.JsonReply(error=False)
+        try:
+            allowed = self.dirs.call(os.access, request.path, request.mode, follow_symlinks=False)
+        except OSError as e:
+            return users_pb2.ErrnoReply(err=e.errno)
+        if not allowed:
+            # access() answers False for a missing path too
+            try:
+                self.dirs.call(os.stat, request.path, follow_symlinks=False)
+            except OSError as e:
+                return users_pb2.ErrnoReply(err=e.errno)
+            return users_pb2.ErrnoReply(err=errno.EACCES)
+        return users_pb2.ErrnoReply()
 
     def fsChmod(self, request, context):
-        data = os.chmod(request.path, request.mode)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        reply = errnoReply(self.dirs.call, chmodAt, request.path, request.mode)
+        return self._mutated(context, reply, "setattr", request.path)
     
     def fsChown(self, request, context):
-        data = os.chown(request.path, request.uid, request.gid)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        reply = errnoReply(self.dirs.call, os.chown, request.path, request.uid, request.gid, follow_symlinks=False)
+        return self._mutated(context, reply, "setattr", request.path)
 
     def fsGetAttr(self, request, context):
-        error = False
-        data = {}
         try:
-            st = os.lstat(request.path)
-            data = dict((key, getattr(st, key)) for key in ('st_atime', 'st_ctime',
-                     'st_gid', 'st_mode', 'st_mtime', 'st_nlink', 'st_size', 'st_uid'))
-        except:
-            error = True
-        return users_pb2.JsonReply(data=json.dumps(data), error=error)
+            st = self.dirs.call(os.stat, request.path, follow_symlinks=False)
+        except OSError as e:
+            return users_pb2.StatReply(err=e.errno)
+        return users_pb2.StatReply(attr=statToAttr(st))
 
     def fsReadDir(self, request, context):
         dirents = ['.', '..']
         
-        if os.path.isdir(request.path):
-            dirents.extend(os.listdir(request.path))
+        try:
+            fd = self.dirs.open(request.path, DIR_FLAGS)
+        except OSError as e:
+            return users_pb2.ReadDirReply(err=e.errno)
+        try:
+            dirents.extend(os.listdir(fd))
+        finally:
+            os.close(fd)
         
-        return users_pb2.JsonReply(data=json.dumps(dirents))
+        reply = users_pb2.ReadDirReply(names=dirents)
+        if reply.ByteSize() >= COMPRESS_MIN_SIZE:
+            context.set_compression(grpc.Compression.Gzip)
+        return reply
+
+    def fsReadDirPlus(self, request, context):
+        return compressListing(context, self._readDirPlus(request, context))
+
+    def _readDirPlus(self, request, context):
+        page_size = request.pageSize or READDIR_PAGE_SIZE
+        try:
+            fd = self.dirs.open(request.path, DIR_FLAGS)
+        except OSError as e:
+            yield users_pb2.ReadDirPlusReply(err=e.errno)
+            return
+
+        # the cursor is a position in scandir order, so skip that many entries
+        cursor = 0
+        page = []
+        # entries are stat-ed through the descriptor, so it stays open throughout
+        try:
+            with os.scandir(fd) as it:
+                for entry in it:
+                    cursor += 1
+                    if cursor <= request.cursor:
+                        continue
+
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        # removed while we were listing
+                        continue
+                    page.append(users_pb2.DirEntry(name=entry.name, attr=statToAttr(st)))
+
+                    if len(page) >= page_size:
+                        yield users_pb2.ReadDirPlusReply(entries=page, cursor=cursor)
+                        page = []
+        finally:
+            os.close(fd)
+
+        if page:
+            yield users_pb2.ReadDirPlusReply(entries=page, cursor=cursor)
     
     def fsRmDir(self, request, context):
-        data = os.rmdir(request.path)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        with namespace_lock:
+            reply = errnoReply(self.dirs.call, os.rmdir, request.path)
+            return self._mutated(context, reply, "rmdir", request.path)
 
     def fsMkDir(self, request, context):
-        data = os.mkdir(request.path, request.mode)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        reply = errnoReply(self.dirs.call, os.mkdir, request.path, request.mode)
+        return self._mutated(context, reply, "mkdir", request.path)
 
     def fsStat(self, request, context):
-        stv = os.statvfs(request.path)
-        data = dict((key, getattr(stv, key)) for key in ('f_bavail', 'f_bfree',
-            'f_blocks', 'f_bsize', 'f_favail', 'f_ffree', 'f_files', 'f_flag',
-            'f_frsize', 'f_namemax'))
-        return users_pb2.JsonReply(data=json.dumps(data))
+        try:
+            fd = self.dirs.open(request.path, os.O_PATH)
+            try:
+                stv = os.statvfs(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            return users_pb2.StatVfsReply(err=e.errno)
+        return users_pb2.StatVfsReply(f_bavail=stv.f_bavail, f_bfree=stv.f_bfree,
+            f_blocks=stv.f_blocks, f_bsize=stv.f_bsize, f_favail=stv.f_favail,
+            f_ffree=stv.f_ffree, f_files=stv.f_files, f_flag=stv.f_flag,
+            f_frsize=stv.f_frsize, f_namemax=stv.f_namemax)
 
     def fsUtimens(self, request, context):
-        data = os.utime(request.path,(request.aTime, request.mTime))
-        return users_pb2.JsonReply(data=json.dumps(data))
+        reply = errnoReply(self.dirs.call, os.utime, request.path, (request.aTime, request.mTime),
+            follow_symlinks=False)
+        return self._mutated(context, reply, "setattr", request.path)
 
     def fsUnlink(self, request, context):
-        global lock 
-        lock.acquire()
-        data = os.unlink(request.path)
-        lock.release()
-        return users_pb2.JsonReply(data=json.dumps(data))
+        with namespace_lock:
+            reply = errnoReply(self.dirs.call, os.unlink, request.path)
+            return self._mutated(context, reply, "unlink", request.path)
 
     def fsSymlink(self, request, context):
-        data = os.symlink(request.target, request.name)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        # the link is made by name; its target is stored as given
+        reply = errnoReply(self.dirs.call, symlinkAt, request.name, request.target)
+        return self._mutated(context, reply, "symlink", request.name)
     
     def fsRename(self, request, context):
-        data = os.rename(request.oldPath, request.newPath)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        with namespace_lock:
+            reply = errnoReply(self.dirs.call_pair, os.rename, request.oldPath, request.newPath)
+            return self._mutated(context, reply, "rename", request.oldPath, request.newPath)
     
     def fsLink(self, request, context):
-        data = os.link(request.name, request.target)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        # `name` is the existing file and `target` the new link
+        with namespace_lock:
+            reply = errnoReply(self.dirs.call_pair, os.link, request.name, request.target, follow_symlinks=False)
+            return self._mutated(context, reply, "link", request.target)
 
     def fsFlock(self, request, context):
-        data = os.flock(request.fileDescriptor, request.lockOperation)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        try:
+            with self.handles.use(request.fileDescriptor, sessionToken(context)) as handle:
+                fcntl.flock(handle.fd, request.lockOperation)
+                # a locked descriptor is never closed behind the client's back
+                self.handles.set_locked(handle, not request.lockOperation & fcntl.LOCK_UN)
+        except OSError as e:
+            return users_pb2.ErrnoReply(err=e.errno)
+        return users_pb2.ErrnoReply()
+
+    def fsReadLink(self, request, context):
+        try:
+            target = self.dirs.call(os.readlink, request.path)
+        except OSError as e:
+            return users_pb2.ReadLinkReply(err=e.errno)
+        return users_pb2.ReadLinkReply(target=target)
+
+    def fsMkNod(self, request, context):
+        reply = errnoReply(self.dirs.call, os.mknod, request.path, request.mode, request.dev)
+        return self._mutated(context, reply, "mknod", request.path)
 
     # File methods
     # ============
     def fileOpen(self, request, context):
-        data = os.open(request.path, request.flags)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        owner = sessionToken(context)
+        flags = request.flags
+        # a truncating open for writing empties the file under its inode
+        # lock, like fileTruncate
+        truncate = flags & os.O_TRUNC and flags & os.O_ACCMODE != os.O_RDONLY
+        try:
+            fh = self.handles.open(request.path, flags & ~os.O_TRUNC if truncate else flags, owner=owner)
+        except OSError as e:
+            return users_pb2.OpenReply(err=e.errno)
+        if truncate:
+            try:
+                with self.handles.use(fh, owner) as handle:
+                    with inodeLocked(handle.key):
+                        os.ftruncate(handle.fd, 0)
+            except OSError as e:
+                self.handles.close(fh, owner)
+                return users_pb2.OpenReply(err=e.errno)
+        return users_pb2.OpenReply(fh=fh)
 
     def fileCreate(self, request, context):
-        data = os.open(request.path, os.O_RDWR | os.O_CREAT, request.mode)
-        return users_pb2.JsonReply(data=json.dumps(data))
+        try:
+            fh = self.handles.open(request.path, os.O_RDWR | os.O_CREAT, request.mode, sessionToken(context))
+        except OSError as e:
+            return users_pb2.OpenReply(err=e.errno)
+        return self._mutated(context, users_pb2.OpenReply(fh=fh), "create", request.path)
 
     def fileRead(self, request, context):
-        os.lseek(request.fh, request.offset, os.SEEK_SET)
-        data = os.read(request.fh, request.length)
-        return users_pb2.ReadReply(data=data)
+        try:
+            with self.handles.use(request.fh, sessionToken(context)) as handle:
+                codec, data = self.compressor.compress(self._read(handle, request.length, request.offset),
+                    request.codec)
+                return ReadChunk(data, codec)
+        except OSError as e:
+            return users_pb2.ReadReply(err=e.errno)
+
+    def _read(self, handle, length, offset):
+        # a copy out of the file's mapping if it is large, else a pread; the
+        # copy is made under the inode lock, as touching a mapping past the
+        # end of a file that shrank kills the process with SIGBUS
+        with inodeLocked(handle.key):
+            data = self.mapped.read(handle, length, offset)
+        if data is None:
+            data = os.pread(handle.fd, length, offset)
+        return data
 
     def fileWrite(self, request, context):  
-        global lock 
-        lock.acquire()
-        os.lseek(request.fh, request.offset, os.SEEK_SET)
-        reply = users_pb2.JsonReply(data=json.dumps(os.write(request.fh, request.buf)))
-        lock.release()
-        return reply
+        try:
+            buf = self.compressor.decompress(request.codec, request.buf)
+            with self.handles.use(request.fh, sessionToken(context)) as handle:
+                size = pwriteLocked(handle, buf, request.offset)
+        except OSError as e:
+            return users_pb2.WriteReply(err=e.errno)
+        return self._mutated(context, users_pb2.WriteReply(size=size), "write", handle.path)
+
+    def fileReadStream(self, request, context):
+        offset, end = request.offset, request.offset + request.length
+        try:
+            handle = self.handles.acquire(request.fh, sessionToken(context))
+        except OSError as e:
+            yield users_pb2.ReadReply(err=e.errno)
+            return
+
+        try:
+            while offset < end:
+                try:
+                    data = self._read(handle, min(READ_STREAM_CHUNK_SIZE, end - offset), offset)
+                except OSError as e:
+                    yield users_pb2.ReadReply(err=e.errno)
+                    return
+                if not data:
+                    # end of file
+                    return
+                offset += len(data)
+                codec, data = self.compressor.compress(data, request.codec)
+                yield ReadChunk(data, codec)
+        finally:
+            self.handles.release(handle)
+
+    def fileWriteStream(self, request_iterator, context):
+        total, err, path = 0, 0, None
+        owner = sessionToken(context)
+        for request in request_iterator:
+            try:
+                buf = self.compressor.decompress(request.codec, request.buf)
+                with self.handles.use(request.fh, owner) as handle:
+                    total += pwriteLocked(handle, buf, request.offset)
+                    path = handle.path
+            except OSError as e:
+                err = e.errno
+                break
+        # one event for the whole stream, even if it failed part way
+        if path is not None:
+            self._mutated(context, users_pb2.WriteReply(), "write", path)
+        return users_pb2.WriteReply(size=total, err=err)
+
+    def chunkQuery(self, request, context):
+        try:
+            self.dirs.check(request.path)
+        except OSError as e:
+            return users_pb2.ChunkQueryReply(err=e.errno)
+        self.chunks.index(request.path)
+        missing = [i for i, digest in enumerate(request.hashes) if not self.chunks.has(digest)]
+        return users_pb2.ChunkQueryReply(missing=missing)
+
+    def chunkWrite(self, request_iterator, context):
+        head = next(request_iterator, None)
+        if head is None or len(head.hashes) != len(head.sizes):
+            return users_pb2.WriteReply(err=errno.EINVAL)
+        try:
+            with self.handles.use(head.fh, sessionToken(context)) as handle:
+                size = self._assemble(handle, head, request_iterator)
+        except OSError as e:
+            return users_pb2.WriteReply(err=e.errno)
+        return self._mutated(context, users_pb2.WriteReply(size=size), "write", handle.path)
+
+    def _assemble(self, handle, head, uploads):
+        # builds the new contents next to the handle's file from indexed and
+        # uploaded chunks, then renames it into place, so readers see either
+        # the old file or the new one
+        directory, name = os.path.split(handle.path)
+        fd, temp = tempfile.mkstemp(prefix="." + name + ".", dir=directory)
+        try:
+            upload = next(uploads, None)
+            chunks, offset = [], 0
+            for index, (digest, size) in enumerate(zip(head.hashes, head.sizes)):
+                if upload is not None and upload.index == index:
+                    data = upload.data
+                    if len(data) != size or chunkHash(data) != digest:
+                        raise OSError(errno.EIO, "chunk %d does not match its hash" % index)
+                    upload = next(uploads, None)
+                else:
+                    data = self.chunks.read(digest, size)
+                    if data is None:
+                        # gone since chunkQuery; the client sends it all again
+                        raise OSError(errno.ESTALE, os.strerror(errno.ESTALE))
+                writeAll(fd, data, offset)
+                chunks.append((digest, offset, size))
+                offset += size
+            if upload is not None:
+                raise OSError(errno.EINVAL, "chunk %d was not asked for" % upload.index)
+
+            st = os.fstat(handle.fd)
+            os.fchmod(fd, stat.S_IMODE(st.st_mode))
+            try:
+                os.fchown(fd, st.st_uid, st.st_gid)
+            except PermissionError:
+                pass
+            with namespace_lock:
+                self.handles.replace(handle, temp)
+            self.chunks.add(handle.path, fileVersion(os.fstat(fd)), chunks)
+            return offset
+        finally:
+            os.close(fd)
+            if os.path.exists(temp):
+                os.unlink(temp)
 
     def fileFlush(self, request, context):
-        return users_pb2.JsonReply(data=json.dumps(os.fsync(request.fh)))
+        try:
+            with self.handles.use(request.fh, sessionToken(context)) as handle:
+                os.fsync(handle.fd)
+        except OSError as e:
+            return users_pb2.ErrnoReply(err=e.errno)
+        return users_pb2.ErrnoReply()
 
     def fileRelease(self, request, context):
-        return users_pb2.JsonReply(data=json.dumps(os.close(request.fh)))        
+        return errnoReply(self.handles.close, request.fh, sessionToken(context))
+
+    def _truncate(self, path, length):
+        fd = self.dirs.open(path, os.O_WRONLY | os.O_CLOEXEC)
+        try:
+            with inodeLocked(fileKey(fd)):
+                os.ftruncate(fd, length)
+        finally:
+            os.close(fd)
+
+    def fileTruncate(self, request, context):
+        if not request.fh:
+            reply = errnoReply(self._truncate, request.path, request.length)
+            return self._mutated(context, reply, "write", request.path)
+        try:
+            with self.handles.use(request.fh, sessionToken(context)) as handle:
+                with inodeLocked(handle.key):
+                    os.ftruncate(handle.fd, request.length)
+        except OSError as e:
+            return users_pb2.ErrnoReply(err=e.errno)
+        return self._mutated(context, users_pb2.ErrnoReply(), "write", handle.path)
+
+    def fileFallocate(self, request, context):
+        try:
+            with self.handles.use(request.fh, sessionToken(context)) as handle:
+                with inodeLocked(handle.key):
+                    fallocate(handle.fd, request.mode, request.offset, request.length)
+        except OSError as e:
+            return users_pb2.ErrnoReply(err=e.errno)
+        return self._mutated(context, users_pb2.ErrnoReply(), "write", handle.path)
+
+    def fileCopyRange(self, request, context):
+        owner = sessionToken(context)
+        try:
+            with self.handles.use(request.fhIn, owner) as source, self.handles.use(request.fhOut, owner) as handle:
+                with inodeLocked(handle.key):
+                    size = copyRange(source.fd, request.offsetIn, handle.fd, request.offsetOut, request.length)
+        except OSError as e:
+            return users_pb2.WriteReply(err=e.errno)
+        return self._mutated(context, users_pb2.WriteReply(size=size), "write", handle.path)
+
+    def compound(self, request, context):
+        reply = users_pb2.CompoundReply()
+        if len(request.ops) > COMPOUND_MAX_OPS:
+            reply.err = errno.E2BIG
+            return reply
+
+        fh = 0
+        for op in request.ops:
+            name = op.WhichOneof("op")
+            if name is None:
+                reply.err = errno.EINVAL
+                break
+            handler, field = COMPOUND_OPS[name]
+            args = getattr(op, name)
+            if name in COMPOUND_HANDLE_OPS and not args.fh:
+                args.fh = fh
+            result = getattr(self, handler)(args, context)
+            if isinstance(result, ReadChunk):
+                result = result.message()
+            getattr(reply.results.add(), field).CopyFrom(result)
+            if result.err:
+                break
+            if field == "open":
+                fh = result.fh
+        return reply
+
+    def watch(self, request, context):
+        if self.watch_slots is not None and not self.watch_slots.acquire(blocking=False):
+            log.warning("refused a watch stream: all %d are in use (see --max-watchers)", self.max_watchers)
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                "all %d watch streams allowed by --max-watchers are in use" % self.max_watchers)
+        try:
+            yield from self._watch(request, context)
+        finally:
+            if self.watch_slots is not None:
+                self.watch_slots.release()
+
+    def _watch(self, request, context):
+        subscription = self.changes.subscribe(request.path, sessionToken(context))
+        try:
+            # whatever the client cached before now may be stale
+            yield users_pb2.ChangeEvent(overflow=True)
+            while not subscription.closed and context.is_active():
+                event = subscription.next(WATCH_POLL_INTERVAL)
+                if event is not None:
+                    yield event
+        finally:
+            self.changes.unsubscribe(subscription)
+
+    def keepAlive(self, request, context):
+        # the session was extended when the call was let in
+        return users_pb2.KeepAliveReply(ttl=self.sessions.ttl)
+
+    def getShards(self, request, context):
+        return users_pb2.ShardsReply(addresses=self.shards, root=self.root)
 
-    def saveUserToDB(self, user, username):
-        # initialize db if its empty
-        if not os.path.exists("userDB.json") or os.stat("userDB.json").st_size == 0:
-            user_entries = {}
+    def negotiateCodecs(self, request, context):
+        return users_pb2.CodecsReply(codecs=[codec for codec in request.codecs if codec in self.compressor.codecs])
+
+    def getStats(self, request, context):
+        reply = users_pb2.StatsReply(bucketBounds=LATENCY_BUCKETS, uptime=time.time() - self.metrics.started)
+        for name, stats in self.metrics.methods():
+            reply.methods.add(name=name, calls=stats.calls, errors=stats.errors, errnos=stats.errnos,
+                bytesIn=stats.bytes_in, bytesOut=stats.bytes_out, seconds=stats.seconds, buckets=stats.buckets)
+        stats = self.compressor.stats()
+        reply.compression.CopyFrom(users_pb2.CompressionStats(compressed=stats["compressed"],
+            decompressed=stats["decompressed"], small=stats["small"], incompressible=stats["incompressible"],
+            rawBytes=stats["raw_bytes"], wireBytes=stats["wire_bytes"], compressSeconds=stats["compress_seconds"],
+            decompressSeconds=stats["decompress_seconds"]))
+        return reply
+
+def walkTree(top, depth=0, after=()):
+    # yields (path parts, is_dir) for everything below `top`, depth first with
+    # each directory sorted by name, which is the order of the parts tuples;
+    # entries up to and including `after` are skipped without listing them
+    def walk(directory, prefix):
+        try:
+            with os.scandir(directory) as it:
+                children = sorted((entry.name, entry.is_dir(follow_symlinks=False)) for entry in it)
+        except OSError:
+            # unreadable, or removed while we were listing
+            return
+        for name, is_dir in children:
+            parts = prefix + (name,)
+            if parts > after:
+                yield parts, is_dir
+            elif parts != after[:len(parts)]:
+                # this whole subtree comes before the cursor
+                continue
+            if is_dir and (not depth or len(parts) < depth):
+                yield from walk(os.path.join(directory, name), parts)
+    return walk(top, ())
+
+def compressListing(context, replies):
+    # tree and readdir listings repeat names and attributes, so gRPC gzips
+    # them; replies too small to gain from it go out as they are
+    context.set_compression(grpc.Compression.Gzip)
+    for reply in replies:
+        if reply.ByteSize() < COMPRESS_MIN_SIZE:
+            context.disable_next_message_compression()
+        yield reply
+
+def writeAll(fd, data, offset):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view, offset = view[written:], offset + written
+
+def copyRange(fd_in, offset_in, fd_out, offset_out, length):
+    # copies up to `length` bytes on the server, stopping early at the end of
+    # the source; returns the number of bytes copied
+    copied = 0
+    use_syscall = hasattr(os, "copy_file_range")
+    while copied < length:
+        count = length - copied
+        if use_syscall:
+            try:
+                done = os.copy_file_range(fd_in, fd_out, count, offset_in + copied, offset_out + copied)
+            except OSError as e:
+                if e.errno not in COPY_FALLBACK_ERRNOS:
+                    raise
+                use_syscall = False
+                continue
         else:
-            read_file = open("userDB.json", "r+")
-            user_entries = json.load(read_file)
-            read_file.close()
+            data = os.pread(fd_in, min(count, COPY_CHUNK_SIZE), offset_in + copied)
+            writeAll(fd_out, data, offset_out + copied)
+            done = len(data)
+        if not done:
+            break
+        copied += done
+    return copied
+
+def fallocate(fd, mode, offset, length):
+    # plain preallocation is portable; FUSE's other modes (keep size, punch
+    # hole, ...) need the Linux call
+    if not mode:
+        os.posix_fallocate(fd, offset, length)
+        return
+    func = getattr(libc, "fallocate", None)
+    if func is None:
+        raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+    if func(fd, mode, ctypes.c_int64(offset), ctypes.c_int64(length)):
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+def chmodAt(name, mode, dir_fd=None):
+    # chmod without following a symlink, which has no mode of its own on Linux
+    try:
+        os.chmod(name, mode, dir_fd=dir_fd, follow_symlinks=False)
+    except (NotImplementedError, ValueError):
+        raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+
+def symlinkAt(name, target, dir_fd=None):
+    os.symlink(target, name, dir_fd=dir_fd)
+
+def errnoReply(func, *args, **kwargs):
+    # runs a syscall that returns nothing and reports its errno, if any
+    try:
+        func(*args, **kwargs)
+    except OSError as e:
+        return users_pb2.ErrnoReply(err=e.errno)
+    return users_pb2.ErrnoReply()
+
+def statToAttr(st):
+    return users_pb2.Attr(st_atime=st.st_atime, st_ctime=st.st_ctime, st_gid=st.st_gid,
+        st_mode=st.st_mode, st_mtime=st.st_mtime, st_nlink=st.st_nlink,
+        st_size=st.st_size, st_uid=st.st_uid)
+
+class AbortCall(Exception):
+    def __init__(self, code, details):
+        Exception.__init__(self, details)
+        self.code = code
+        self.details = details
+
+class SyncContext(object):
+    # hands the synchronous Users handlers a context whose abort() raises, since
+    # the grpc.aio one is a coroutine; everything else goes to the real context
+    def __init__(self, context):
+        self._context = context
+        self.compressed = False
+
+    def abort(self, code, details=""):
+        raise AbortCall(code, details)
+
+    def set_compression(self, compression):
+        # grpc.aio only compresses a unary reply if the initial metadata goes
+        # out on its own first, which the servicer does when this is set
+        self._context.set_compression(compression)
+        self.compressed = True
+
+    def is_active(self):
+        return not self._context.done()
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+class SyncRequestIterator(object):
+    # lets a synchronous client-streaming handler, running on the executor,
+    # pull requests from the event loop's async iterator
+    def __init__(self, request_iterator, loop):
+        self._requests = request_iterator.__aiter__()
+        self._loop = loop
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return asyncio.run_coroutine_threadsafe(self._requests.__anext__(), self._loop).result()
+        except StopAsyncIteration:
+            raise StopIteration
+
+class AsyncUsers(users_pb2_grpc.UsersServicer):
+    # grpc.aio servicer that runs every Users handler on `executor`, so fsync,
+    # bcrypt and other blocking calls never stall the event loop
+    def __init__(self, users, executor):
+        self.users = users
+        self.executor = executor
+        for method in users_pb2.DESCRIPTOR.services_by_name['Users'].methods:
+            if method.name == "watch":
+                # waits on the event loop itself, holding no executor thread
+                continue
+            handler = getattr(users, method.name)
+            if method.client_streaming:
+                wrapper = self._clientStream(handler)
+            elif method.server_streaming:
+                wrapper = self._serverStream(handler)
+            else:
+                wrapper = self._unary(handler)
+            setattr(self, method.name, wrapper)
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def watch(self, request, context):
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        subscription = self.users.changes.subscribe(request.path, sessionToken(context),
+            notify=lambda: loop.call_soon_threadsafe(ready.set))
+        try:
+            # whatever the client cached before now may be stale
+            yield users_pb2.ChangeEvent(overflow=True)
+            while not subscription.closed:
+                # cleared before looking, so a push in between sets it again
+                ready.clear()
+                event = subscription.pop()
+                if event is None:
+                    # cancelled here when the client goes away
+                    await ready.wait()
+                    continue
+                yield event
+        finally:
+            self.users.changes.unsubscribe(subscription)
+
+    def _unary(self, handler):
+        async def call(request, context):
+            sync = SyncContext(context)
+            try:
+                reply = await self._run(handler, request, sync)
+                if sync.compressed:
+                    await context.send_initial_metadata(())
+                return reply
+            except AbortCall as e:
+                await context.abort(e.code, e.details)
+        return call
+
+    def _serverStream(self, handler):
+        async def call(request, context):
+            done = object()
+            try:
+                replies = await self._run(handler, request, SyncContext(context))
+                while True:
+                    reply = await self._run(next, replies, done)
+                    if reply is done:
+                        return
+                    yield reply
+            except AbortCall as e:
+                await context.abort(e.code, e.details)
+        return call
+
+    def _clientStream(self, handler):
+        async def call(request_iterator, context):
+            requests = SyncRequestIterator(request_iterator, asyncio.get_running_loop())
+            try:
+                return await self._run(handler, requests, SyncContext(context))
+            except AbortCall as e:
+                await context.abort(e.code, e.details)
+        return call
 
-        if user:
-            user_entries[username] = user
+def addUsersServicer(servicer, server):
+    # users_pb2_grpc.add_UsersServicer_to_server, except that replies of type
+    # ReadReply may also be ReadChunks, which are serialized without protobuf
+    service = users_pb2.DESCRIPTOR.services_by_name['Users']
+    handlers = {}
+    for method in service.methods:
+        request = getattr(users_pb2, method.input_type.name)
+        reply = getattr(users_pb2, method.output_type.name)
+        serializer = serializeReadReply if reply is users_pb2.ReadReply else reply.SerializeToString
+        if method.client_streaming and method.server_streaming:
+            make = grpc.stream_stream_rpc_method_handler
+        elif method.client_streaming:
+            make = grpc.stream_unary_rpc_method_handler
+        elif method.server_streaming:
+            make = grpc.unary_stream_rpc_method_handler
         else:
-            user_entries.pop(username, None)
+            make = grpc.unary_unary_rpc_method_handler
+        handlers[method.name] = make(getattr(servicer, method.name), request_deserializer=request.FromString,
+            response_serializer=serializer)
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(service.full_name, handlers),))
+    server.add_registered_method_handlers(service.full_name, handlers)
 
-        write_file = open("userDB.json", 'w+')
-        json.dump(user_entries, write_file)
-        write_file.close()
+def createServer(address, workers=SERVER_WORKERS, sessions=None, metrics=None, handles=None, changes=None,
+        mapped=None, root=EXPORT_ROOT, shards=(), dirs=None, max_watchers=None):
+    # returns the (unstarted) thread-pool server and the port it bound;
+    # max_watchers defaults to a WATCH_WORKER_SHARE of the workers
+    if max_watchers is None:
+        max_watchers = max(1, workers // WATCH_WORKER_SHARE)
+    elif max_watchers >= workers:
+        log.warning("%d watch streams can hold all %d workers", max_watchers, workers)
+    sessions = sessions if sessions is not None else SessionManager()
+    metrics = metrics if metrics is not None else Metrics()
+    # every call is measured, and every call except account management needs
+    # a live session token
+    interceptors = [MetricsInterceptor(metrics), AuthInterceptor(sessions)]
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers), interceptors=interceptors,
+        options=SERVER_OPTIONS)
+    users = Users(sessions=sessions, metrics=metrics, handles=handles, changes=changes, mapped=mapped, root=root,
+        shards=shards, dirs=dirs, max_watchers=max_watchers)
+    addUsersServicer(users, server)
+    port = server.add_insecure_port(address)
+    return server, port
 
-    def fetchUserFromDB(self, username):
-        # error if db doesn't exist or is empty
-        if not os.path.exists("userDB.json") or os.stat("userDB.json").st_size == 0:
-            raise Exception()
+def createAioServer(address, workers=AIO_EXECUTOR_WORKERS, sessions=None, metrics=None, handles=None,
+        changes=None, mapped=None, root=EXPORT_ROOT, shards=(), dirs=None):
+    # same as createServer for grpc.aio; call it from inside the event loop
+    sessions = sessions if sessions is not None else SessionManager()
+    metrics = metrics if metrics is not None else Metrics()
+    executor = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rpc")
+    interceptors = [AsyncMetricsInterceptor(metrics), AsyncAuthInterceptor(sessions)]
+    server = grpc.aio.server(interceptors=interceptors, options=SERVER_OPTIONS)
+    users = Users(sessions=sessions, metrics=metrics, handles=handles, changes=changes, mapped=mapped, root=root,
+        shards=shards, dirs=dirs)
+    addUsersServicer(AsyncUsers(users, executor), server)
+    port = server.add_insecure_port(address)
+    return server, port
 
-        # check if there is matching user
-        db_file = open("userDB.json", "r+")
-        user_entries = json.load(db_file)
-        user = user_entries.get(username)
-        db_file.close()
+async def serveAio(address, workers, sessions, metrics, handles, changes, mapped, root, shards, dirs):
+    server, _ = createAioServer(address, workers, sessions, metrics, handles, changes, mapped, root, shards, dirs)
+    await server.start()
+    log.info("serving on %s (asyncio, %d executor threads)", address, workers)
+    await server.wait_for_termination()
 
-        # error if user doesn't exist
-        if not user:
-            raise Exception()
+def serve(address='[::]:%d' % PORT, aio=False, workers=None, metrics_file=None, inotify=False,
+        mmap_budget=MMAP_BUDGET, root=EXPORT_ROOT, shards=(), dir_cache_size=DIR_CACHE_SIZE, max_watchers=None):
+    sessions = SessionManager()
+    sessions.start()
+    metrics = Metrics()
+    # closes descriptors of handles left idle, e.g. by crashed clients
+    handles = HandleTable()
+    handles.start()
+    changes = ChangeFeed()
+    mapped = MappedFiles(mmap_budget)
+    dirs = DirectoryCache(root, dir_cache_size)
+    if inotify:
+        # changes made on the server itself, outside any RPC
+        InotifyWatcher(root, changes).start()
+    if metrics_file:
+        startDumping(metrics_file, rpc=metrics)
 
-        return user
+    if aio:
+        asyncio.run(serveAio(address, workers or AIO_EXECUTOR_WORKERS, sessions, metrics, handles, changes,
+            mapped, root, shards, dirs))
+        return
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    users_pb2_grpc.add_UsersServicer_to_server(Users(), server)
-    server.add_insecure_port('[::]:10001')
+    server, _ = createServer(address, workers or SERVER_WORKERS, sessions, metrics, handles, changes, mapped,
+        root, shards, dirs, max_watchers)
     server.start()
+    log.info("serving on %s (%d worker threads)", address, workers or SERVER_WORKERS)
     server.wait_for_termination()
 
 if __name__ == '__main__':
-    logging.basicConfig()
-    serve()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('ip', nargs='?', default='[::]', help='address to listen on')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--aio', action='store_true', help='serve with grpc.aio instead of a thread pool')
+    parser.add_argument('--workers', type=int, help='gRPC worker threads, or executor threads with --aio')
+    parser.add_argument('--metrics-file', help='rewrite per-RPC metrics to this JSON file every minute')
+    parser.add_argument('--inotify', action='store_true', help='also tell watching clients about changes made outside the server')
+    parser.add_argument('--mmap-budget', type=int, default=MMAP_BUDGET // (1024 * 1024),
+        help='MiB of large files kept memory-mapped for reads, 0 to always pread')
+    parser.add_argument('--export', default=EXPORT_ROOT, help='directory to serve')
+    parser.add_argument('--shards', default='',
+        help='comma-separated addresses of every server the namespace is split across, this one included, '
+        'in the same order on each')
+    parser.add_argument('--dir-cache-size', type=int, default=DIR_CACHE_SIZE,
+        help='directory descriptors kept open for resolving paths, 0 to hand the kernel whole paths')
+    parser.add_argument('--max-watchers', type=int,
+        help='watch streams the thread-pool server serves at once, each holding a worker '
+            '(default: a quarter of --workers); ignored with --aio')
+    parser.add_argument('--log-level', default='INFO', help='DEBUG also logs every call with its latency')
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    serve('%s:%d' % (args.ip, args.port), args.aio, args.workers, args.metrics_file, args.inotify,
+        args.mmap_budget * 1024 * 1024, args.export, [a for a in args.shards.split(',') if a], args.dir_cache_size,
+        args.max_watchers)
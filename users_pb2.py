@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: users.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'users.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0busers.proto\x12\x05users\"M\n\x11\x43reateUserRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x14\n\x0c\x63onfirmation\x18\x03 \x01(\t\"\"\n\x0f\x43reateUserReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\"6\n\x10LoginUserRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"0\n\x0eLoginUserReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05token\x18\x02 \x01(\t\"4\n\x11\x44\x65leteUserRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\"\"\n\x0f\x44\x65leteUserReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\"F\n\x11UpdateUserRequest\x12\x10\n\x08password\x18\x01 \x01(\t\x12\r\n\x05token\x18\x02 \x01(\t\x12\x10\n\x08username\x18\x03 \x01(\t\"\x1f\n\x0fUpdateUserReply\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\"\x12\n\x10KeepAliveRequest\"\x1d\n\x0eKeepAliveReply\x12\x0b\n\x03ttl\x18\x01 \x01(\x01\"U\n\x12\x44isplayTreeRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05\x64\x65pth\x18\x02 \x01(\r\x12\x12\n\nmaxEntries\x18\x03 \x01(\r\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t\"(\n\tTreeEntry\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05isDir\x18\x02 \x01(\x08\"R\n\x10\x44isplayTreeReply\x12!\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x10.users.TreeEntry\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\x0b\n\x03\x65rr\x18\x03 \x01(\x05\"(\n\tJsonReply\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\x08\"\x19\n\nErrnoReply\x12\x0b\n\x03\x65rr\x18\x01 \x01(\x05\"3\n\tStatReply\x12\x19\n\x04\x61ttr\x18\x01 \x01(\x0b\x32\x0b.users.Attr\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"\xca\x01\n\x0cStatVfsReply\x12\x10\n\x08\x66_bavail\x18\x01 \x01(\x04\x12\x0f\n\x07\x66_bfree\x18\x02 \x01(\x04\x12\x10\n\x08\x66_blocks\x18\x03 \x01(\x04\x12\x0f\n\x07\x66_bsize\x18\x04 \x01(\x04\x12\x10\n\x08\x66_favail\x18\x05 \x01(\x04\x12\x0f\n\x07\x66_ffree\x18\x06 \x01(\x04\x12\x0f\n\x07\x66_files\x18\x07 \x01(\x04\x12\x0e\n\x06\x66_flag\x18\x08 \x01(\x04\x12\x10\n\x08\x66_frsize\x18\t \x01(\x04\x12\x11\n\tf_namemax\x18\n \x01(\x04\x12\x0b\n\x03\x65rr\x18\x0b \x01(\x05\"*\n\x0cReadDirReply\x12\r\n\x05names\x18\x01 \x03(\t\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"$\n\tOpenReply\x12\n\n\x02\x66h\x18\x01 \x01(\x03\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"\'\n\nWriteReply\x12\x0c\n\x04size\x18\x01 \x01(\x03\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"+\n\rAccessRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x05\"*\n\x0c\x43hmodRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x05\"6\n\x0c\x43hownRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0b\n\x03uid\x18\x02 \x01(\x05\x12\x0b\n\x03gid\x18\x03 \x01(\x05\"*\n\x0eGetAttrRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\n\n\x02\x66h\x18\x02 \x01(\x03\"*\n\x0eReadDirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\n\n\x02\x66h\x18\x02 \x01(\x03\"\x90\x01\n\x04\x41ttr\x12\x10\n\x08st_atime\x18\x01 \x01(\x01\x12\x10\n\x08st_ctime\x18\x02 \x01(\x01\x12\x0e\n\x06st_gid\x18\x03 \x01(\r\x12\x0f\n\x07st_mode\x18\x04 \x01(\r\x12\x10\n\x08st_mtime\x18\x05 \x01(\x01\x12\x10\n\x08st_nlink\x18\x06 \x01(\x04\x12\x0f\n\x07st_size\x18\x07 \x01(\x03\x12\x0e\n\x06st_uid\x18\x08 \x01(\r\"3\n\x08\x44irEntry\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x19\n\x04\x61ttr\x18\x02 \x01(\x0b\x32\x0b.users.Attr\"D\n\x12ReadDirPlusRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\x04\x12\x10\n\x08pageSize\x18\x03 \x01(\r\"Q\n\x10ReadDirPlusReply\x12 \n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x0f.users.DirEntry\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\x04\x12\x0b\n\x03\x65rr\x18\x03 \x01(\x05\"\x1c\n\x0cRmDirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\"*\n\x0cMkDirRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x05\"\x1b\n\x0bStatRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\"\x1d\n\rUnlinkRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\"<\n\x0eUtimeNsRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05\x61Time\x18\x02 \x01(\x02\x12\r\n\x05mTime\x18\x03 \x01(\x02\".\n\x0eSymlinkRequest\x12\x0e\n\x06target\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"1\n\rRenameRequest\x12\x0f\n\x07oldPath\x18\x01 \x01(\t\x12\x0f\n\x07newPath\x18\x02 \x01(\t\"+\n\x0bLinkRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06target\x18\x02 \x01(\t\"=\n\x0c\x46lockRequest\x12\x16\n\x0e\x66ileDescriptor\x18\x01 \x01(\x03\x12\x15\n\rlockOperation\x18\x02 \x01(\x05\"\x1f\n\x0fReadLinkRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\",\n\rReadLinkReply\x12\x0e\n\x06target\x18\x01 \x01(\t\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"7\n\x0cMkNodRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\r\x12\x0b\n\x03\x64\x65v\x18\x03 \x01(\x04\"*\n\x0bOpenRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\r\n\x05\x66lags\x18\x02 \x01(\x05\"7\n\rCreateRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\x05\x12\n\n\x02\x66i\x18\x03 \x01(\t\"V\n\x0bReadRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06length\x18\x02 \x01(\x03\x12\x0e\n\x06offset\x18\x03 \x01(\x03\x12\n\n\x02\x66h\x18\x04 \x01(\x03\x12\r\n\x05\x63odec\x18\x05 \x01(\r\"5\n\tReadReply\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\x12\r\n\x05\x63odec\x18\x03 \x01(\r\"T\n\x0cWriteRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0b\n\x03\x62uf\x18\x02 \x01(\x0c\x12\x0e\n\x06offset\x18\x03 \x01(\x03\x12\n\n\x02\x66h\x18\x04 \x01(\x03\x12\r\n\x05\x63odec\x18\x05 \x01(\r\"(\n\x0c\x46lushRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\n\n\x02\x66h\x18\x02 \x01(\x03\"*\n\x0eReleaseRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\n\n\x02\x66h\x18\x02 \x01(\x03\";\n\x0fTruncateRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06length\x18\x02 \x01(\x03\x12\n\n\x02\x66h\x18\x03 \x01(\x03\"L\n\x10\x46\x61llocateRequest\x12\n\n\x02\x66h\x18\x01 \x01(\x03\x12\x0c\n\x04mode\x18\x02 \x01(\x05\x12\x0e\n\x06offset\x18\x03 \x01(\x03\x12\x0e\n\x06length\x18\x04 \x01(\x03\"d\n\x10\x43opyRangeRequest\x12\x0c\n\x04\x66hIn\x18\x01 \x01(\x03\x12\x10\n\x08offsetIn\x18\x02 \x01(\x03\x12\r\n\x05\x66hOut\x18\x03 \x01(\x03\x12\x11\n\toffsetOut\x18\x04 \x01(\x03\x12\x0e\n\x06length\x18\x05 \x01(\x03\"\xc0\x03\n\nCompoundOp\x12\"\n\x04open\x18\x01 \x01(\x0b\x32\x12.users.OpenRequestH\x00\x12&\n\x06\x63reate\x18\x02 \x01(\x0b\x32\x14.users.CreateRequestH\x00\x12\"\n\x04read\x18\x03 \x01(\x0b\x32\x12.users.ReadRequestH\x00\x12$\n\x05write\x18\x04 \x01(\x0b\x32\x13.users.WriteRequestH\x00\x12$\n\x05\x66lush\x18\x05 \x01(\x0b\x32\x13.users.FlushRequestH\x00\x12(\n\x07release\x18\x06 \x01(\x0b\x32\x15.users.ReleaseRequestH\x00\x12(\n\x07getattr\x18\x07 \x01(\x0b\x32\x15.users.GetAttrRequestH\x00\x12&\n\x06unlink\x18\x08 \x01(\x0b\x32\x14.users.UnlinkRequestH\x00\x12$\n\x05mkdir\x18\t \x01(\x0b\x32\x13.users.MkDirRequestH\x00\x12$\n\x05\x63hmod\x18\n \x01(\x0b\x32\x13.users.ChmodRequestH\x00\x12(\n\x07utimens\x18\x0b \x01(\x0b\x32\x15.users.UtimeNsRequestH\x00\x42\x04\n\x02op\"\xc9\x01\n\x0e\x43ompoundResult\x12 \n\x04open\x18\x01 \x01(\x0b\x32\x10.users.OpenReplyH\x00\x12 \n\x04read\x18\x02 \x01(\x0b\x32\x10.users.ReadReplyH\x00\x12\"\n\x05write\x18\x03 \x01(\x0b\x32\x11.users.WriteReplyH\x00\x12 \n\x04stat\x18\x04 \x01(\x0b\x32\x10.users.StatReplyH\x00\x12#\n\x06status\x18\x05 \x01(\x0b\x32\x11.users.ErrnoReplyH\x00\x42\x08\n\x06result\"1\n\x0f\x43ompoundRequest\x12\x1e\n\x03ops\x18\x01 \x03(\x0b\x32\x11.users.CompoundOp\"D\n\rCompoundReply\x12&\n\x07results\x18\x01 \x03(\x0b\x32\x15.users.CompoundResult\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"1\n\x11\x43hunkQueryRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06hashes\x18\x02 \x03(\x0c\"/\n\x0f\x43hunkQueryReply\x12\x0f\n\x07missing\x18\x01 \x03(\r\x12\x0b\n\x03\x65rr\x18\x02 \x01(\x05\"[\n\x11\x43hunkWriteRequest\x12\n\n\x02\x66h\x18\x01 \x01(\x03\x12\x0e\n\x06hashes\x18\x02 \x03(\x0c\x12\r\n\x05sizes\x18\x03 \x03(\r\x12\r\n\x05index\x18\x04 \x01(\r\x12\x0c\n\x04\x64\x61ta\x18\x05 \x01(\x0c\"\x0e\n\x0cStatsRequest\"\x8f\x01\n\x0bMethodStats\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x63\x61lls\x18\x02 \x01(\x04\x12\x0e\n\x06\x65rrors\x18\x03 \x01(\x04\x12\x0e\n\x06\x65rrnos\x18\x04 \x01(\x04\x12\x0f\n\x07\x62ytesIn\x18\x05 \x01(\x04\x12\x10\n\x08\x62ytesOut\x18\x06 \x01(\x04\x12\x0f\n\x07seconds\x18\x07 \x01(\x01\x12\x0f\n\x07\x62uckets\x18\x08 \x03(\x04\"\x85\x01\n\nStatsReply\x12#\n\x07methods\x18\x01 \x03(\x0b\x32\x12.users.MethodStats\x12\x14\n\x0c\x62ucketBounds\x18\x02 \x03(\x01\x12\x0e\n\x06uptime\x18\x03 \x01(\x01\x12,\n\x0b\x63ompression\x18\x04 \x01(\x0b\x32\x17.users.CompressionStats\"\xbc\x01\n\x10\x43ompressionStats\x12\x12\n\ncompressed\x18\x01 \x01(\x04\x12\x14\n\x0c\x64\x65\x63ompressed\x18\x02 \x01(\x04\x12\r\n\x05small\x18\x03 \x01(\x04\x12\x16\n\x0eincompressible\x18\x04 \x01(\x04\x12\x10\n\x08rawBytes\x18\x05 \x01(\x04\x12\x11\n\twireBytes\x18\x06 \x01(\x04\x12\x17\n\x0f\x63ompressSeconds\x18\x07 \x01(\x01\x12\x19\n\x11\x64\x65\x63ompressSeconds\x18\x08 \x01(\x01\"\x0f\n\rShardsRequest\".\n\x0bShardsReply\x12\x11\n\taddresses\x18\x01 \x03(\t\x12\x0c\n\x04root\x18\x02 \x01(\t\"\x1f\n\rCodecsRequest\x12\x0e\n\x06\x63odecs\x18\x01 \x03(\r\"\x1d\n\x0b\x43odecsReply\x12\x0e\n\x06\x63odecs\x18\x01 \x03(\r\"\x1c\n\x0cWatchRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\"g\n\x0b\x43hangeEvent\x12\n\n\x02op\x18\x01 \x01(\t\x12\x0c\n\x04path\x18\x02 \x01(\t\x12\x0f\n\x07newPath\x18\x03 \x01(\t\x12\r\n\x05mtime\x18\x04 \x01(\x01\x12\x0c\n\x04size\x18\x05 \x01(\x03\x12\x10\n\x08overflow\x18\x06 \x01(\x08\x32\x85\x13\n\x05Users\x12G\n\x11\x63reateUserAccount\x12\x18.users.CreateUserRequest\x1a\x16.users.CreateUserReply\"\x00\x12\x44\n\x10loginUserAccount\x12\x17.users.LoginUserRequest\x1a\x15.users.LoginUserReply\"\x00\x12G\n\x11\x64\x65leteUserAccount\x12\x18.users.DeleteUserRequest\x1a\x16.users.DeleteUserReply\"\x00\x12G\n\x11updateUserAccount\x12\x18.users.UpdateUserRequest\x1a\x16.users.UpdateUserReply\"\x00\x12\x45\n\x0b\x64isplayTree\x12\x19.users.DisplayTreeRequest\x1a\x17.users.DisplayTreeReply\"\x00\x30\x01\x12\x35\n\x08\x66sAccess\x12\x14.users.AccessRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x33\n\x07\x66sChmod\x12\x13.users.ChmodRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x33\n\x07\x66sChown\x12\x13.users.ChownRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x36\n\tfsGetAttr\x12\x15.users.GetAttrRequest\x1a\x10.users.StatReply\"\x00\x12\x39\n\tfsReadDir\x12\x15.users.ReadDirRequest\x1a\x13.users.ReadDirReply\"\x00\x12G\n\rfsReadDirPlus\x12\x19.users.ReadDirPlusRequest\x1a\x17.users.ReadDirPlusReply\"\x00\x30\x01\x12\x33\n\x07\x66sRmDir\x12\x13.users.RmDirRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x33\n\x07\x66sMkDir\x12\x13.users.MkDirRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x33\n\x06\x66sStat\x12\x12.users.StatRequest\x1a\x13.users.StatVfsReply\"\x00\x12\x35\n\x08\x66sUnlink\x12\x14.users.UnlinkRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x37\n\tfsUtimens\x12\x15.users.UtimeNsRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x37\n\tfsSymlink\x12\x15.users.SymlinkRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x35\n\x08\x66sRename\x12\x14.users.RenameRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x31\n\x06\x66sLink\x12\x12.users.LinkRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x33\n\x07\x66sFlock\x12\x13.users.FlockRequest\x1a\x11.users.ErrnoReply\"\x00\x12<\n\nfsReadLink\x12\x16.users.ReadLinkRequest\x1a\x14.users.ReadLinkReply\"\x00\x12\x33\n\x07\x66sMkNod\x12\x13.users.MkNodRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x32\n\x08\x66ileOpen\x12\x12.users.OpenRequest\x1a\x10.users.OpenReply\"\x00\x12\x36\n\nfileCreate\x12\x14.users.CreateRequest\x1a\x10.users.OpenReply\"\x00\x12\x32\n\x08\x66ileRead\x12\x12.users.ReadRequest\x1a\x10.users.ReadReply\"\x00\x12\x35\n\tfileWrite\x12\x13.users.WriteRequest\x1a\x11.users.WriteReply\"\x00\x12:\n\x0e\x66ileReadStream\x12\x12.users.ReadRequest\x1a\x10.users.ReadReply\"\x00\x30\x01\x12=\n\x0f\x66ileWriteStream\x12\x13.users.WriteRequest\x1a\x11.users.WriteReply\"\x00(\x01\x12\x35\n\tfileFlush\x12\x13.users.FlushRequest\x1a\x11.users.ErrnoReply\"\x00\x12\x39\n\x0b\x66ileRelease\x12\x15.users.ReleaseRequest\x1a\x11.users.ErrnoReply\"\x00\x12;\n\x0c\x66ileTruncate\x12\x16.users.TruncateRequest\x1a\x11.users.ErrnoReply\"\x00\x12=\n\rfileFallocate\x12\x17.users.FallocateRequest\x1a\x11.users.ErrnoReply\"\x00\x12=\n\rfileCopyRange\x12\x17.users.CopyRangeRequest\x1a\x11.users.WriteReply\"\x00\x12:\n\x08\x63ompound\x12\x16.users.CompoundRequest\x1a\x14.users.CompoundReply\"\x00\x12@\n\nchunkQuery\x12\x18.users.ChunkQueryRequest\x1a\x16.users.ChunkQueryReply\"\x00\x12=\n\nchunkWrite\x12\x18.users.ChunkWriteRequest\x1a\x11.users.WriteReply\"\x00(\x01\x12\x34\n\x05watch\x12\x13.users.WatchRequest\x1a\x12.users.ChangeEvent\"\x00\x30\x01\x12\x34\n\x08getStats\x12\x13.users.StatsRequest\x1a\x11.users.StatsReply\"\x00\x12=\n\tkeepAlive\x12\x17.users.KeepAliveRequest\x1a\x15.users.KeepAliveReply\"\x00\x12\x37\n\tgetShards\x12\x14.users.ShardsRequest\x1a\x12.users.ShardsReply\"\x00\x12=\n\x0fnegotiateCodecs\x12\x14.users.CodecsRequest\x1a\x12.users.CodecsReply\"\x00\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'users_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_CREATEUSERREQUEST']._serialized_start=22
+  _globals['_CREATEUSERREQUEST']._serialized_end=99
+  _globals['_CREATEUSERREPLY']._serialized_start=101
+  _globals['_CREATEUSERREPLY']._serialized_end=135
+  _globals['_LOGINUSERREQUEST']._serialized_start=137
+  _globals['_LOGINUSERREQUEST']._serialized_end=191
+  _globals['_LOGINUSERREPLY']._serialized_start=193
+  _globals['_LOGINUSERREPLY']._serialized_end=241
+  _globals['_DELETEUSERREQUEST']._serialized_start=243
+  _globals['_DELETEUSERREQUEST']._serialized_end=295
+  _globals['_DELETEUSERREPLY']._serialized_start=297
+  _globals['_DELETEUSERREPLY']._serialized_end=331
+  _globals['_UPDATEUSERREQUEST']._serialized_start=333
+  _globals['_UPDATEUSERREQUEST']._serialized_end=403
+  _globals['_UPDATEUSERREPLY']._serialized_start=405
+  _globals['_UPDATEUSERREPLY']._serialized_end=436
+  _globals['_KEEPALIVEREQUEST']._serialized_start=438
+  _globals['_KEEPALIVEREQUEST']._serialized_end=456
+  _globals['_KEEPALIVEREPLY']._serialized_start=458
+  _globals['_KEEPALIVEREPLY']._serialized_end=487
+  _globals['_DISPLAYTREEREQUEST']._serialized_start=489
+  _globals['_DISPLAYTREEREQUEST']._serialized_end=574
+  _globals['_TREEENTRY']._serialized_start=576
+  _globals['_TREEENTRY']._serialized_end=616
+  _globals['_DISPLAYTREEREPLY']._serialized_start=618
+  _globals['_DISPLAYTREEREPLY']._serialized_end=700
+  _globals['_JSONREPLY']._serialized_start=702
+  _globals['_JSONREPLY']._serialized_end=742
+  _globals['_ERRNOREPLY']._serialized_start=744
+  _globals['_ERRNOREPLY']._serialized_end=769
+  _globals['_STATREPLY']._serialized_start=771
+  _globals['_STATREPLY']._serialized_end=822
+  _globals['_STATVFSREPLY']._serialized_start=825
+  _globals['_STATVFSREPLY']._serialized_end=1027
+  _globals['_READDIRREPLY']._serialized_start=1029
+  _globals['_READDIRREPLY']._serialized_end=1071
+  _globals['_OPENREPLY']._serialized_start=1073
+  _globals['_OPENREPLY']._serialized_end=1109
+  _globals['_WRITEREPLY']._serialized_start=1111
+  _globals['_WRITEREPLY']._serialized_end=1150
+  _globals['_ACCESSREQUEST']._serialized_start=1152
+  _globals['_ACCESSREQUEST']._serialized_end=1195
+  _globals['_CHMODREQUEST']._serialized_start=1197
+  _globals['_CHMODREQUEST']._serialized_end=1239
+  _globals['_CHOWNREQUEST']._serialized_start=1241
+  _globals['_CHOWNREQUEST']._serialized_end=1295
+  _globals['_GETATTRREQUEST']._serialized_start=1297
+  _globals['_GETATTRREQUEST']._serialized_end=1339
+  _globals['_READDIRREQUEST']._serialized_start=1341
+  _globals['_READDIRREQUEST']._serialized_end=1383
+  _globals['_ATTR']._serialized_start=1386
+  _globals['_ATTR']._serialized_end=1530
+  _globals['_DIRENTRY']._serialized_start=1532
+  _globals['_DIRENTRY']._serialized_end=1583
+  _globals['_READDIRPLUSREQUEST']._serialized_start=1585
+  _globals['_READDIRPLUSREQUEST']._serialized_end=1653
+  _globals['_READDIRPLUSREPLY']._serialized_start=1655
+  _globals['_READDIRPLUSREPLY']._serialized_end=1736
+  _globals['_RMDIRREQUEST']._serialized_start=1738
+  _globals['_RMDIRREQUEST']._serialized_end=1766
+  _globals['_MKDIRREQUEST']._serialized_start=1768
+  _globals['_MKDIRREQUEST']._serialized_end=1810
+  _globals['_STATREQUEST']._serialized_start=1812
+  _globals['_STATREQUEST']._serialized_end=1839
+  _globals['_UNLINKREQUEST']._serialized_start=1841
+  _globals['_UNLINKREQUEST']._serialized_end=1870
+  _globals['_UTIMENSREQUEST']._serialized_start=1872
+  _globals['_UTIMENSREQUEST']._serialized_end=1932
+  _globals['_SYMLINKREQUEST']._serialized_start=1934
+  _globals['_SYMLINKREQUEST']._serialized_end=1980
+  _globals['_RENAMEREQUEST']._serialized_start=1982
+  _globals['_RENAMEREQUEST']._serialized_end=2031
+  _globals['_LINKREQUEST']._serialized_start=2033
+  _globals['_LINKREQUEST']._serialized_end=2076
+  _globals['_FLOCKREQUEST']._serialized_start=2078
+  _globals['_FLOCKREQUEST']._serialized_end=2139
+  _globals['_READLINKREQUEST']._serialized_start=2141
+  _globals['_READLINKREQUEST']._serialized_end=2172
+  _globals['_READLINKREPLY']._serialized_start=2174
+  _globals['_READLINKREPLY']._serialized_end=2218
+  _globals['_MKNODREQUEST']._serialized_start=2220
+  _globals['_MKNODREQUEST']._serialized_end=2275
+  _globals['_OPENREQUEST']._serialized_start=2277
+  _globals['_OPENREQUEST']._serialized_end=2319
+  _globals['_CREATEREQUEST']._serialized_start=2321
+  _globals['_CREATEREQUEST']._serialized_end=2376
+  _globals['_READREQUEST']._serialized_start=2378
+  _globals['_READREQUEST']._serialized_end=2464
+  _globals['_READREPLY']._serialized_start=2466
+  _globals['_READREPLY']._serialized_end=2519
+  _globals['_WRITEREQUEST']._serialized_start=2521
+  _globals['_WRITEREQUEST']._serialized_end=2605
+  _globals['_FLUSHREQUEST']._serialized_start=2607
+  _globals['_FLUSHREQUEST']._serialized_end=2647
+  _globals['_RELEASEREQUEST']._serialized_start=2649
+  _globals['_RELEASEREQUEST']._serialized_end=2691
+  _globals['_TRUNCATEREQUEST']._serialized_start=2693
+  _globals['_TRUNCATEREQUEST']._serialized_end=2752
+  _globals['_FALLOCATEREQUEST']._serialized_start=2754
+  _globals['_FALLOCATEREQUEST']._serialized_end=2830
+  _globals['_COPYRANGEREQUEST']._serialized_start=2832
+  _globals['_COPYRANGEREQUEST']._serialized_end=2932
+  _globals['_COMPOUNDOP']._serialized_start=2935
+  _globals['_COMPOUNDOP']._serialized_end=3383
+  _globals['_COMPOUNDRESULT']._serialized_start=3386
+  _globals['_COMPOUNDRESULT']._serialized_end=3587
+  _globals['_COMPOUNDREQUEST']._serialized_start=3589
+  _globals['_COMPOUNDREQUEST']._serialized_end=3638
+  _globals['_COMPOUNDREPLY']._serialized_start=3640
+  _globals['_COMPOUNDREPLY']._serialized_end=3708
+  _globals['_CHUNKQUERYREQUEST']._serialized_start=3710
+  _globals['_CHUNKQUERYREQUEST']._serialized_end=3759
+  _globals['_CHUNKQUERYREPLY']._serialized_start=3761
+  _globals['_CHUNKQUERYREPLY']._serialized_end=3808
+  _globals['_CHUNKWRITEREQUEST']._serialized_start=3810
+  _globals['_CHUNKWRITEREQUEST']._serialized_end=3901
+  _globals['_STATSREQUEST']._serialized_start=3903
+  _globals['_STATSREQUEST']._serialized_end=3917
+  _globals['_METHODSTATS']._serialized_start=3920
+  _globals['_METHODSTATS']._serialized_end=4063
+  _globals['_STATSREPLY']._serialized_start=4066
+  _globals['_STATSREPLY']._serialized_end=4199
+  _globals['_COMPRESSIONSTATS']._serialized_start=4202
+  _globals['_COMPRESSIONSTATS']._serialized_end=4390
+  _globals['_SHARDSREQUEST']._serialized_start=4392
+  _globals['_SHARDSREQUEST']._serialized_end=4407
+  _globals['_SHARDSREPLY']._serialized_start=4409
+  _globals['_SHARDSREPLY']._serialized_end=4455
+  _globals['_CODECSREQUEST']._serialized_start=4457
+  _globals['_CODECSREQUEST']._serialized_end=4488
+  _globals['_CODECSREPLY']._serialized_start=4490
+  _globals['_CODECSREPLY']._serialized_end=4519
+  _globals['_WATCHREQUEST']._serialized_start=4521
+  _globals['_WATCHREQUEST']._serialized_end=4549
+  _globals['_CHANGEEVENT']._serialized_start=4551
+  _globals['_CHANGEEVENT']._serialized_end=4654
+  _globals['_USERS']._serialized_start=4657
+  _globals['_USERS']._serialized_end=7094
+# @@protoc_insertion_point(module_scope)
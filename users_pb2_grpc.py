@@ -0,0 +1,1848 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import users_pb2 as users__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in users_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class UsersStub:
+    """The users service definition.
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.createUserAccount = channel.unary_unary(
+                '/users.Users/createUserAccount',
+                request_serializer=users__pb2.CreateUserRequest.SerializeToString,
+                response_deserializer=users__pb2.CreateUserReply.FromString,
+                _registered_method=True)
+        self.loginUserAccount = channel.unary_unary(
+                '/users.Users/loginUserAccount',
+                request_serializer=users__pb2.LoginUserRequest.SerializeToString,
+                response_deserializer=users__pb2.LoginUserReply.FromString,
+                _registered_method=True)
+        self.deleteUserAccount = channel.unary_unary(
+                '/users.Users/deleteUserAccount',
+                request_serializer=users__pb2.DeleteUserRequest.SerializeToString,
+                response_deserializer=users__pb2.DeleteUserReply.FromString,
+                _registered_method=True)
+        self.updateUserAccount = channel.unary_unary(
+                '/users.Users/updateUserAccount',
+                request_serializer=users__pb2.UpdateUserRequest.SerializeToString,
+                response_deserializer=users__pb2.UpdateUserReply.FromString,
+                _registered_method=True)
+        self.displayTree = channel.unary_stream(
+                '/users.Users/displayTree',
+                request_serializer=users__pb2.DisplayTreeRequest.SerializeToString,
+                response_deserializer=users__pb2.DisplayTreeReply.FromString,
+                _registered_method=True)
+        self.fsAccess = channel.unary_unary(
+                '/users.Users/fsAccess',
+                request_serializer=users__pb2.AccessRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsChmod = channel.unary_unary(
+                '/users.Users/fsChmod',
+                request_serializer=users__pb2.ChmodRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsChown = channel.unary_unary(
+                '/users.Users/fsChown',
+                request_serializer=users__pb2.ChownRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsGetAttr = channel.unary_unary(
+                '/users.Users/fsGetAttr',
+                request_serializer=users__pb2.GetAttrRequest.SerializeToString,
+                response_deserializer=users__pb2.StatReply.FromString,
+                _registered_method=True)
+        self.fsReadDir = channel.unary_unary(
+                '/users.Users/fsReadDir',
+                request_serializer=users__pb2.ReadDirRequest.SerializeToString,
+                response_deserializer=users__pb2.ReadDirReply.FromString,
+                _registered_method=True)
+        self.fsReadDirPlus = channel.unary_stream(
+                '/users.Users/fsReadDirPlus',
+                request_serializer=users__pb2.ReadDirPlusRequest.SerializeToString,
+                response_deserializer=users__pb2.ReadDirPlusReply.FromString,
+                _registered_method=True)
+        self.fsRmDir = channel.unary_unary(
+                '/users.Users/fsRmDir',
+                request_serializer=users__pb2.RmDirRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsMkDir = channel.unary_unary(
+                '/users.Users/fsMkDir',
+                request_serializer=users__pb2.MkDirRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsStat = channel.unary_unary(
+                '/users.Users/fsStat',
+                request_serializer=users__pb2.StatRequest.SerializeToString,
+                response_deserializer=users__pb2.StatVfsReply.FromString,
+                _registered_method=True)
+        self.fsUnlink = channel.unary_unary(
+                '/users.Users/fsUnlink',
+                request_serializer=users__pb2.UnlinkRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsUtimens = channel.unary_unary(
+                '/users.Users/fsUtimens',
+                request_serializer=users__pb2.UtimeNsRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsSymlink = channel.unary_unary(
+                '/users.Users/fsSymlink',
+                request_serializer=users__pb2.SymlinkRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsRename = channel.unary_unary(
+                '/users.Users/fsRename',
+                request_serializer=users__pb2.RenameRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsLink = channel.unary_unary(
+                '/users.Users/fsLink',
+                request_serializer=users__pb2.LinkRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsFlock = channel.unary_unary(
+                '/users.Users/fsFlock',
+                request_serializer=users__pb2.FlockRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fsReadLink = channel.unary_unary(
+                '/users.Users/fsReadLink',
+                request_serializer=users__pb2.ReadLinkRequest.SerializeToString,
+                response_deserializer=users__pb2.ReadLinkReply.FromString,
+                _registered_method=True)
+        self.fsMkNod = channel.unary_unary(
+                '/users.Users/fsMkNod',
+                request_serializer=users__pb2.MkNodRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fileOpen = channel.unary_unary(
+                '/users.Users/fileOpen',
+                request_serializer=users__pb2.OpenRequest.SerializeToString,
+                response_deserializer=users__pb2.OpenReply.FromString,
+                _registered_method=True)
+        self.fileCreate = channel.unary_unary(
+                '/users.Users/fileCreate',
+                request_serializer=users__pb2.CreateRequest.SerializeToString,
+                response_deserializer=users__pb2.OpenReply.FromString,
+                _registered_method=True)
+        self.fileRead = channel.unary_unary(
+                '/users.Users/fileRead',
+                request_serializer=users__pb2.ReadRequest.SerializeToString,
+                response_deserializer=users__pb2.ReadReply.FromString,
+                _registered_method=True)
+        self.fileWrite = channel.unary_unary(
+                '/users.Users/fileWrite',
+                request_serializer=users__pb2.WriteRequest.SerializeToString,
+                response_deserializer=users__pb2.WriteReply.FromString,
+                _registered_method=True)
+        self.fileReadStream = channel.unary_stream(
+                '/users.Users/fileReadStream',
+                request_serializer=users__pb2.ReadRequest.SerializeToString,
+                response_deserializer=users__pb2.ReadReply.FromString,
+                _registered_method=True)
+        self.fileWriteStream = channel.stream_unary(
+                '/users.Users/fileWriteStream',
+                request_serializer=users__pb2.WriteRequest.SerializeToString,
+                response_deserializer=users__pb2.WriteReply.FromString,
+                _registered_method=True)
+        self.fileFlush = channel.unary_unary(
+                '/users.Users/fileFlush',
+                request_serializer=users__pb2.FlushRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fileRelease = channel.unary_unary(
+                '/users.Users/fileRelease',
+                request_serializer=users__pb2.ReleaseRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fileTruncate = channel.unary_unary(
+                '/users.Users/fileTruncate',
+                request_serializer=users__pb2.TruncateRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fileFallocate = channel.unary_unary(
+                '/users.Users/fileFallocate',
+                request_serializer=users__pb2.FallocateRequest.SerializeToString,
+                response_deserializer=users__pb2.ErrnoReply.FromString,
+                _registered_method=True)
+        self.fileCopyRange = channel.unary_unary(
+                '/users.Users/fileCopyRange',
+                request_serializer=users__pb2.CopyRangeRequest.SerializeToString,
+                response_deserializer=users__pb2.WriteReply.FromString,
+                _registered_method=True)
+        self.compound = channel.unary_unary(
+                '/users.Users/compound',
+                request_serializer=users__pb2.CompoundRequest.SerializeToString,
+                response_deserializer=users__pb2.CompoundReply.FromString,
+                _registered_method=True)
+        self.chunkQuery = channel.unary_unary(
+                '/users.Users/chunkQuery',
+                request_serializer=users__pb2.ChunkQueryRequest.SerializeToString,
+                response_deserializer=users__pb2.ChunkQueryReply.FromString,
+                _registered_method=True)
+        self.chunkWrite = channel.stream_unary(
+                '/users.Users/chunkWrite',
+                request_serializer=users__pb2.ChunkWriteRequest.SerializeToString,
+                response_deserializer=users__pb2.WriteReply.FromString,
+                _registered_method=True)
+        self.watch = channel.unary_stream(
+                '/users.Users/watch',
+                request_serializer=users__pb2.WatchRequest.SerializeToString,
+                response_deserializer=users__pb2.ChangeEvent.FromString,
+                _registered_method=True)
+        self.getStats = channel.unary_unary(
+                '/users.Users/getStats',
+                request_serializer=users__pb2.StatsRequest.SerializeToString,
+                response_deserializer=users__pb2.StatsReply.FromString,
+                _registered_method=True)
+        self.keepAlive = channel.unary_unary(
+                '/users.Users/keepAlive',
+                request_serializer=users__pb2.KeepAliveRequest.SerializeToString,
+                response_deserializer=users__pb2.KeepAliveReply.FromString,
+                _registered_method=True)
+        self.getShards = channel.unary_unary(
+                '/users.Users/getShards',
+                request_serializer=users__pb2.ShardsRequest.SerializeToString,
+                response_deserializer=users__pb2.ShardsReply.FromString,
+                _registered_method=True)
+        self.negotiateCodecs = channel.unary_unary(
+                '/users.Users/negotiateCodecs',
+                request_serializer=users__pb2.CodecsRequest.SerializeToString,
+                response_deserializer=users__pb2.CodecsReply.FromString,
+                _registered_method=True)
+
+
+class UsersServicer:
+    """The users service definition.
+    """
+
+    def createUserAccount(self, request, context):
+        """This function will create a new user account for the user.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def loginUserAccount(self, request, context):
+        """This function will allow a user to login to their account.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def deleteUserAccount(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def updateUserAccount(self, request, context):
+        """This function will allow a user to update their password.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def displayTree(self, request, context):
+        """returns file structure, streamed in pages of entries in depth-first order
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsAccess(self, request, context):
+        """filesystem methods
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsChmod(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsChown(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsGetAttr(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsReadDir(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsReadDirPlus(self, request, context):
+        """directory entries together with their attributes, streamed in pages
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsRmDir(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsMkDir(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsStat(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsUnlink(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsUtimens(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsSymlink(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsRename(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsLink(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsFlock(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsReadLink(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fsMkNod(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileOpen(self, request, context):
+        """file methods
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileCreate(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileRead(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileWrite(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileReadStream(self, request, context):
+        """large sequential transfers: `length` bytes from `offset` come back in chunks,
+        and a stream of writes is applied in order with one reply at the end
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileWriteStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileFlush(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileRelease(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileTruncate(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileFallocate(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fileCopyRange(self, request, context):
+        """copies between two open files on the server, sharing extents where the
+        filesystem can; the reply's size is the number of bytes copied
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def compound(self, request, context):
+        """runs a list of operations in order in one round trip, stopping at the
+        first that fails; a handle of 0 means the one the last open/create returned
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def chunkQuery(self, request, context):
+        """deduplicated rewrites: the client asks which of the new contents' chunks
+        the server already has, then streams the rest to chunkWrite, which builds
+        the file aside and renames it over the handle's file
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def chunkWrite(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def watch(self, request, context):
+        """changes made to the export by other clients (and, with --inotify, by
+        anything else), for invalidating client caches; the first event is
+        always an overflow, since anything cached before it may be stale
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getStats(self, request, context):
+        """per-method call counts, errors, bytes and latency histograms since the
+        server started
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def keepAlive(self, request, context):
+        """extends the caller's session, which otherwise ends after the returned
+        ttl without calls; mounts call it so that they survive being idle
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getShards(self, request, context):
+        """the servers the namespace is split across, so a client connected to any
+        of them can reach the others; callable without logging in
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def negotiateCodecs(self, request, context):
+        """the payload codecs of the client's list the server can also use, in the
+        client's order of preference; fileRead and fileWrite data may then be
+        sent compressed with the first
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_UsersServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'createUserAccount': grpc.unary_unary_rpc_method_handler(
+                    servicer.createUserAccount,
+                    request_deserializer=users__pb2.CreateUserRequest.FromString,
+                    response_serializer=users__pb2.CreateUserReply.SerializeToString,
+            ),
+            'loginUserAccount': grpc.unary_unary_rpc_method_handler(
+                    servicer.loginUserAccount,
+                    request_deserializer=users__pb2.LoginUserRequest.FromString,
+                    response_serializer=users__pb2.LoginUserReply.SerializeToString,
+            ),
+            'deleteUserAccount': grpc.unary_unary_rpc_method_handler(
+                    servicer.deleteUserAccount,
+                    request_deserializer=users__pb2.DeleteUserRequest.FromString,
+                    response_serializer=users__pb2.DeleteUserReply.SerializeToString,
+            ),
+            'updateUserAccount': grpc.unary_unary_rpc_method_handler(
+                    servicer.updateUserAccount,
+                    request_deserializer=users__pb2.UpdateUserRequest.FromString,
+                    response_serializer=users__pb2.UpdateUserReply.SerializeToString,
+            ),
+            'displayTree': grpc.unary_stream_rpc_method_handler(
+                    servicer.displayTree,
+                    request_deserializer=users__pb2.DisplayTreeRequest.FromString,
+                    response_serializer=users__pb2.DisplayTreeReply.SerializeToString,
+            ),
+            'fsAccess': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsAccess,
+                    request_deserializer=users__pb2.AccessRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsChmod': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsChmod,
+                    request_deserializer=users__pb2.ChmodRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsChown': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsChown,
+                    request_deserializer=users__pb2.ChownRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsGetAttr': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsGetAttr,
+                    request_deserializer=users__pb2.GetAttrRequest.FromString,
+                    response_serializer=users__pb2.StatReply.SerializeToString,
+            ),
+            'fsReadDir': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsReadDir,
+                    request_deserializer=users__pb2.ReadDirRequest.FromString,
+                    response_serializer=users__pb2.ReadDirReply.SerializeToString,
+            ),
+            'fsReadDirPlus': grpc.unary_stream_rpc_method_handler(
+                    servicer.fsReadDirPlus,
+                    request_deserializer=users__pb2.ReadDirPlusRequest.FromString,
+                    response_serializer=users__pb2.ReadDirPlusReply.SerializeToString,
+            ),
+            'fsRmDir': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsRmDir,
+                    request_deserializer=users__pb2.RmDirRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsMkDir': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsMkDir,
+                    request_deserializer=users__pb2.MkDirRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsStat': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsStat,
+                    request_deserializer=users__pb2.StatRequest.FromString,
+                    response_serializer=users__pb2.StatVfsReply.SerializeToString,
+            ),
+            'fsUnlink': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsUnlink,
+                    request_deserializer=users__pb2.UnlinkRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsUtimens': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsUtimens,
+                    request_deserializer=users__pb2.UtimeNsRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsSymlink': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsSymlink,
+                    request_deserializer=users__pb2.SymlinkRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsRename': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsRename,
+                    request_deserializer=users__pb2.RenameRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsLink': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsLink,
+                    request_deserializer=users__pb2.LinkRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsFlock': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsFlock,
+                    request_deserializer=users__pb2.FlockRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fsReadLink': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsReadLink,
+                    request_deserializer=users__pb2.ReadLinkRequest.FromString,
+                    response_serializer=users__pb2.ReadLinkReply.SerializeToString,
+            ),
+            'fsMkNod': grpc.unary_unary_rpc_method_handler(
+                    servicer.fsMkNod,
+                    request_deserializer=users__pb2.MkNodRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fileOpen': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileOpen,
+                    request_deserializer=users__pb2.OpenRequest.FromString,
+                    response_serializer=users__pb2.OpenReply.SerializeToString,
+            ),
+            'fileCreate': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileCreate,
+                    request_deserializer=users__pb2.CreateRequest.FromString,
+                    response_serializer=users__pb2.OpenReply.SerializeToString,
+            ),
+            'fileRead': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileRead,
+                    request_deserializer=users__pb2.ReadRequest.FromString,
+                    response_serializer=users__pb2.ReadReply.SerializeToString,
+            ),
+            'fileWrite': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileWrite,
+                    request_deserializer=users__pb2.WriteRequest.FromString,
+                    response_serializer=users__pb2.WriteReply.SerializeToString,
+            ),
+            'fileReadStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.fileReadStream,
+                    request_deserializer=users__pb2.ReadRequest.FromString,
+                    response_serializer=users__pb2.ReadReply.SerializeToString,
+            ),
+            'fileWriteStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.fileWriteStream,
+                    request_deserializer=users__pb2.WriteRequest.FromString,
+                    response_serializer=users__pb2.WriteReply.SerializeToString,
+            ),
+            'fileFlush': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileFlush,
+                    request_deserializer=users__pb2.FlushRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fileRelease': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileRelease,
+                    request_deserializer=users__pb2.ReleaseRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fileTruncate': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileTruncate,
+                    request_deserializer=users__pb2.TruncateRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fileFallocate': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileFallocate,
+                    request_deserializer=users__pb2.FallocateRequest.FromString,
+                    response_serializer=users__pb2.ErrnoReply.SerializeToString,
+            ),
+            'fileCopyRange': grpc.unary_unary_rpc_method_handler(
+                    servicer.fileCopyRange,
+                    request_deserializer=users__pb2.CopyRangeRequest.FromString,
+                    response_serializer=users__pb2.WriteReply.SerializeToString,
+            ),
+            'compound': grpc.unary_unary_rpc_method_handler(
+                    servicer.compound,
+                    request_deserializer=users__pb2.CompoundRequest.FromString,
+                    response_serializer=users__pb2.CompoundReply.SerializeToString,
+            ),
+            'chunkQuery': grpc.unary_unary_rpc_method_handler(
+                    servicer.chunkQuery,
+                    request_deserializer=users__pb2.ChunkQueryRequest.FromString,
+                    response_serializer=users__pb2.ChunkQueryReply.SerializeToString,
+            ),
+            'chunkWrite': grpc.stream_unary_rpc_method_handler(
+                    servicer.chunkWrite,
+                    request_deserializer=users__pb2.ChunkWriteRequest.FromString,
+                    response_serializer=users__pb2.WriteReply.SerializeToString,
+            ),
+            'watch': grpc.unary_stream_rpc_method_handler(
+                    servicer.watch,
+                    request_deserializer=users__pb2.WatchRequest.FromString,
+                    response_serializer=users__pb2.ChangeEvent.SerializeToString,
+            ),
+            'getStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.getStats,
+                    request_deserializer=users__pb2.StatsRequest.FromString,
+                    response_serializer=users__pb2.StatsReply.SerializeToString,
+            ),
+            'keepAlive': grpc.unary_unary_rpc_method_handler(
+                    servicer.keepAlive,
+                    request_deserializer=users__pb2.KeepAliveRequest.FromString,
+                    response_serializer=users__pb2.KeepAliveReply.SerializeToString,
+            ),
+            'getShards': grpc.unary_unary_rpc_method_handler(
+                    servicer.getShards,
+                    request_deserializer=users__pb2.ShardsRequest.FromString,
+                    response_serializer=users__pb2.ShardsReply.SerializeToString,
+            ),
+            'negotiateCodecs': grpc.unary_unary_rpc_method_handler(
+                    servicer.negotiateCodecs,
+                    request_deserializer=users__pb2.CodecsRequest.FromString,
+                    response_serializer=users__pb2.CodecsReply.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'users.Users', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('users.Users', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Users:
+    """The users service definition.
+    """
+
+    @staticmethod
+    def createUserAccount(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/createUserAccount',
+            users__pb2.CreateUserRequest.SerializeToString,
+            users__pb2.CreateUserReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def loginUserAccount(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/loginUserAccount',
+            users__pb2.LoginUserRequest.SerializeToString,
+            users__pb2.LoginUserReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def deleteUserAccount(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/deleteUserAccount',
+            users__pb2.DeleteUserRequest.SerializeToString,
+            users__pb2.DeleteUserReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def updateUserAccount(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/updateUserAccount',
+            users__pb2.UpdateUserRequest.SerializeToString,
+            users__pb2.UpdateUserReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def displayTree(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/users.Users/displayTree',
+            users__pb2.DisplayTreeRequest.SerializeToString,
+            users__pb2.DisplayTreeReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsAccess(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsAccess',
+            users__pb2.AccessRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsChmod(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsChmod',
+            users__pb2.ChmodRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsChown(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsChown',
+            users__pb2.ChownRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsGetAttr(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsGetAttr',
+            users__pb2.GetAttrRequest.SerializeToString,
+            users__pb2.StatReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsReadDir(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsReadDir',
+            users__pb2.ReadDirRequest.SerializeToString,
+            users__pb2.ReadDirReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsReadDirPlus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/users.Users/fsReadDirPlus',
+            users__pb2.ReadDirPlusRequest.SerializeToString,
+            users__pb2.ReadDirPlusReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsRmDir(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsRmDir',
+            users__pb2.RmDirRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsMkDir(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsMkDir',
+            users__pb2.MkDirRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsStat(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsStat',
+            users__pb2.StatRequest.SerializeToString,
+            users__pb2.StatVfsReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsUnlink(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsUnlink',
+            users__pb2.UnlinkRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsUtimens(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsUtimens',
+            users__pb2.UtimeNsRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsSymlink(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsSymlink',
+            users__pb2.SymlinkRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsRename(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsRename',
+            users__pb2.RenameRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsLink(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsLink',
+            users__pb2.LinkRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsFlock(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsFlock',
+            users__pb2.FlockRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsReadLink(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsReadLink',
+            users__pb2.ReadLinkRequest.SerializeToString,
+            users__pb2.ReadLinkReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fsMkNod(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fsMkNod',
+            users__pb2.MkNodRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileOpen(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileOpen',
+            users__pb2.OpenRequest.SerializeToString,
+            users__pb2.OpenReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileCreate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileCreate',
+            users__pb2.CreateRequest.SerializeToString,
+            users__pb2.OpenReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileRead(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileRead',
+            users__pb2.ReadRequest.SerializeToString,
+            users__pb2.ReadReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileWrite(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileWrite',
+            users__pb2.WriteRequest.SerializeToString,
+            users__pb2.WriteReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileReadStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/users.Users/fileReadStream',
+            users__pb2.ReadRequest.SerializeToString,
+            users__pb2.ReadReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileWriteStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/users.Users/fileWriteStream',
+            users__pb2.WriteRequest.SerializeToString,
+            users__pb2.WriteReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileFlush(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileFlush',
+            users__pb2.FlushRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileRelease(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileRelease',
+            users__pb2.ReleaseRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileTruncate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileTruncate',
+            users__pb2.TruncateRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileFallocate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileFallocate',
+            users__pb2.FallocateRequest.SerializeToString,
+            users__pb2.ErrnoReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fileCopyRange(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/fileCopyRange',
+            users__pb2.CopyRangeRequest.SerializeToString,
+            users__pb2.WriteReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def compound(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/compound',
+            users__pb2.CompoundRequest.SerializeToString,
+            users__pb2.CompoundReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def chunkQuery(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/chunkQuery',
+            users__pb2.ChunkQueryRequest.SerializeToString,
+            users__pb2.ChunkQueryReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def chunkWrite(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/users.Users/chunkWrite',
+            users__pb2.ChunkWriteRequest.SerializeToString,
+            users__pb2.WriteReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def watch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/users.Users/watch',
+            users__pb2.WatchRequest.SerializeToString,
+            users__pb2.ChangeEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/getStats',
+            users__pb2.StatsRequest.SerializeToString,
+            users__pb2.StatsReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def keepAlive(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/keepAlive',
+            users__pb2.KeepAliveRequest.SerializeToString,
+            users__pb2.KeepAliveReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getShards(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/getShards',
+            users__pb2.ShardsRequest.SerializeToString,
+            users__pb2.ShardsReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def negotiateCodecs(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/users.Users/negotiateCodecs',
+            users__pb2.CodecsRequest.SerializeToString,
+            users__pb2.CodecsReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+
+# the journal is rewritten once it holds this many times more records than
+# there are users (and at least COMPACT_MIN_RECORDS records)
+COMPACT_RATIO = 2
+COMPACT_MIN_RECORDS = 1000
+
+
+class UserStore(object):
+    """In-memory index of user records, keyed by username.
+
+    The whole store is loaded once at startup; lookups never touch the disk.
+    Subclasses persist each mutation through `_persist_put`/`_persist_delete`
+    while the store lock is held, so concurrent workers see a consistent view.
+    Records are plain dicts and callers always get a copy.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        with self._lock:
+            user = self._users.get(username)
+            return dict(user) if user is not None else None
+
+    def add(self, username, user):
+        # stores a new user; returns False if the name is already taken
+        with self._lock:
+            if username in self._users:
+                return False
+            self._put(username, user)
+            return True
+
+    def put(self, username, user):
+        with self._lock:
+            self._put(username, user)
+
+    def delete(self, username):
+        with self._lock:
+            if username not in self._users:
+                return False
+            user = self._users.pop(username)
+            try:
+                self._persist_delete(username)
+            except:
+                self._users[username] = user
+                raise
+            return True
+
+    def __len__(self):
+        return len(self._users)
+
+    def close(self):
+        pass
+
+    def _put(self, username, user):
+        # the index is updated first so persistence sees the new state, and
+        # rolled back if persisting fails
+        previous = self._users.get(username)
+        self._users[username] = user = dict(user)
+        try:
+            self._persist_put(username, user)
+        except:
+            if previous is None:
+                del self._users[username]
+            else:
+                self._users[username] = previous
+            raise
+
+    def _persist_put(self, username, user):
+        raise NotImplementedError()
+
+    def _persist_delete(self, username):
+        raise NotImplementedError()
+
+
+class JournalUserStore(UserStore):
+    """User store persisted as an append-only journal of JSON lines.
+
+    Each mutation appends one record. When the journal grows well past the
+    number of users it is compacted: the current state is written to a
+    temporary file, fsynced and renamed over the journal, so a crash leaves
+    either the old or the new file. An existing `legacy` userDB.json is
+    imported the first time the journal is created.
+    """
+
+    def __init__(self, path="userDB.journal", legacy="userDB.json", sync=False):
+        UserStore.__init__(self)
+        # compaction reopens the journal by name, wherever the process has
+        # moved to since
+        self.path = os.path.abspath(path)
+        self.sync = sync
+        self._records = 0
+
+        if os.path.exists(path):
+            if not self._replay():
+                self._compact()
+        elif legacy and os.path.exists(legacy) and os.stat(legacy).st_size > 0:
+            with open(legacy) as f:
+                self._users = json.load(f)
+            self._compact()
+
+        self._journal = open(path, "a")
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+
+    def compact(self):
+        with self._lock:
+            self._journal.close()
+            self._compact()
+            self._journal = open(self.path, "a")
+
+    def _replay(self):
+        # returns False if the journal ends in a torn record from a crash
+        # mid-append, in which case it must be rewritten before appending
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    return False
+                if "user" in record:
+                    self._users[record["name"]] = record["user"]
+                else:
+                    self._users.pop(record["name"], None)
+                self._records += 1
+        return True
+
+    def _compact(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            for name, user in self._users.items():
+                f.write(json.dumps({"name": name, "user": user}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._records = len(self._users)
+
+    def _append(self, record):
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        if self.sync:
+            os.fsync(self._journal.fileno())
+        self._records += 1
+
+        if self._records > max(COMPACT_MIN_RECORDS, COMPACT_RATIO * len(self._users)):
+            self._journal.close()
+            self._compact()
+            self._journal = open(self.path, "a")
+
+    def _persist_put(self, username, user):
+        self._append({"name": username, "user": user})
+
+    def _persist_delete(self, username):
+        self._append({"name": username})
+
+
+class SqliteUserStore(UserStore):
+    """User store persisted in a SQLite table of (username, JSON record)."""
+
+    def __init__(self, path="userDB.sqlite"):
+        UserStore.__init__(self)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        for username, data in self._db.execute("SELECT username, data FROM users"):
+            self._users[username] = json.loads(data)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _persist_put(self, username, user):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO users (username, data) VALUES (?, ?)",
+                (username, json.dumps(user)))
+
+    def _persist_delete(self, username):
+        with self._db:
+            self._db.execute("DELETE FROM users WHERE username = ?", (username,))
+
+
+def openUserStore(kind="journal"):
+    if kind == "journal":
+        return JournalUserStore()
+    if kind == "sqlite":
+        return SqliteUserStore()
+    raise ValueError("unknown user store: %s" % kind)